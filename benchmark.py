@@ -0,0 +1,209 @@
+"""Бенчмарк горячего пути генерации сертификатов.
+
+Строит синтетическую когорту и отдельно замеряет стадии CertificateGenerator:
+хеширование ID, генерацию QR-кода, рендеринг Jinja и запись PDF. Результаты
+(пропускная способность, p50/p95, пиковый RSS) сохраняются в JSON, чтобы
+сравнивать прогоны и ловить регрессии.
+
+Примеры:
+    python benchmark.py --size 200
+    python benchmark.py --size 200 --compare benchmark_results/baseline.json
+"""
+import argparse
+import base64
+import datetime
+import io
+import json
+import logging
+import platform
+import sys
+import time
+from importlib import metadata
+from pathlib import Path
+
+from config import Config
+from participants_handler import ParticipantsHandler
+from certificate_generator import CertificateGenerator, QR_MIME_TYPES
+from qr_store import QRCodeStore
+from weasyprint import HTML
+
+logger = logging.getLogger(__name__)
+
+RESULTS_DIR = Path("benchmark_results")
+PACKAGES = ['weasyprint', 'jinja2', 'qrcode', 'pandas', 'Pillow', 'pypdf', 'reportlab']
+
+
+def percentile(values: list, pct: float) -> float:
+    """Перцентиль по отсортированной выборке (ближайший ранг)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def peak_rss_mb():
+    """Пиковый RSS процесса в МБ (None, если платформа не поддерживает)"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux возвращает КБ, macOS — байты
+        return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+    except ImportError:
+        pass
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return round(getattr(info, 'peak_wset', info.rss) / (1024 * 1024), 1)
+    except ImportError:
+        return None
+
+
+def summarize(latencies: list) -> dict:
+    """Сводка по стадии: пропускная способность и задержки в мс"""
+    total = sum(latencies)
+    return {
+        'count': len(latencies),
+        'total_s': round(total, 4),
+        'throughput_per_s': round(len(latencies) / total, 2) if total else None,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+    }
+
+
+def timed(func, *args, **kwargs):
+    """Вызов функции с замером времени"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def run_benchmark(size: int, include_pdf: bool = True) -> dict:
+    """Замер стадий генерации для синтетической когорты из size участников"""
+    ParticipantsHandler.create_directories()
+    participants = ParticipantsHandler.generate_random_participants(size)
+    generator = CertificateGenerator()
+    # Без кэша и записи на диск, чтобы замерять именно генерацию QR-кода
+    generator.qr_store = QRCodeStore(cache_size=0, persist=False)
+    qr_format = 'png' if generator.overlay is not None else Config.QR_FORMAT
+
+    latencies = {'certificate_id': [], 'qr_code': [], 'jinja_render': [], 'pdf_write': []}
+    wall_start = time.perf_counter()
+
+    for participant in participants:
+        certificate_id, elapsed = timed(generator.prepare_participant, participant)
+        latencies['certificate_id'].append(elapsed)
+
+        template_data = generator.certificate_fields(participant, certificate_id)
+        (_, qr_base64), elapsed = timed(
+            generator.generate_qr_code, template_data['verification_url'], participant['full_name'],
+            save_file=False, qr_format=qr_format
+        )
+        latencies['qr_code'].append(elapsed)
+        template_data['qr_code_base64'] = qr_base64
+        template_data['qr_code_mime'] = QR_MIME_TYPES[qr_format]
+
+        html_content, elapsed = timed(generator.template.render, **template_data)
+        latencies['jinja_render'].append(elapsed)
+
+        if include_pdf:
+            start = time.perf_counter()
+            if generator.overlay is not None:
+                generator.overlay.render(template_data, base64.b64decode(qr_base64), io.BytesIO())
+            else:
+                HTML(string=html_content).write_pdf(
+                    stylesheets=generator.stylesheets,
+                    font_config=generator.font_config
+                )
+            latencies['pdf_write'].append(time.perf_counter() - start)
+
+    wall_time = time.perf_counter() - wall_start
+
+    return {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'cohort_size': size,
+        'engine': 'overlay' if generator.overlay is not None else 'html',
+        'qr_format': qr_format,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'packages': package_versions(),
+        'wall_time_s': round(wall_time, 3),
+        'certificates_per_s': round(size / wall_time, 2) if wall_time else None,
+        'peak_rss_mb': peak_rss_mb(),
+        'stages': {name: summarize(values) for name, values in latencies.items() if values},
+    }
+
+
+def package_versions() -> dict:
+    """Версии библиотек, влияющих на производительность"""
+    versions = {}
+    for package in PACKAGES:
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return versions
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """Поиск регрессий: рост p50/p95 стадии больше чем на threshold процентов"""
+    regressions = []
+    for stage, stats in current['stages'].items():
+        base = baseline.get('stages', {}).get(stage)
+        if not base:
+            continue
+        for metric in ('p50_ms', 'p95_ms'):
+            if base[metric] and stats[metric] > base[metric] * (1 + threshold / 100):
+                change = (stats[metric] / base[metric] - 1) * 100
+                regressions.append(f"{stage}.{metric}: {base[metric]} → {stats[metric]} мс (+{change:.1f}%)")
+    return regressions
+
+
+def print_report(results: dict):
+    """Вывод результатов в консоль"""
+    print("=" * 72)
+    print(f"БЕНЧМАРК: {results['cohort_size']} участников, движок {results['engine']}, QR {results['qr_format']}")
+    print("=" * 72)
+    print(f"{'Стадия':<16}{'шт/с':>12}{'p50, мс':>12}{'p95, мс':>12}{'всего, с':>12}")
+    for stage, stats in results['stages'].items():
+        print(f"{stage:<16}{stats['throughput_per_s'] or 0:>12}{stats['p50_ms']:>12}"
+              f"{stats['p95_ms']:>12}{stats['total_s']:>12}")
+    print("-" * 72)
+    print(f"Сертификатов в секунду: {results['certificates_per_s']}")
+    print(f"Пиковый RSS: {results['peak_rss_mb']} МБ")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк генерации сертификатов")
+    parser.add_argument('--size', type=int, default=100, help="размер синтетической когорты")
+    parser.add_argument('--no-pdf', action='store_true', help="не замерять запись PDF")
+    parser.add_argument('--output', type=Path, help="файл для сохранения результатов (JSON)")
+    parser.add_argument('--compare', type=Path, help="JSON предыдущего прогона для сравнения")
+    parser.add_argument('--threshold', type=float, default=10.0, help="допустимый рост задержки, %%")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    results = run_benchmark(args.size, include_pdf=not args.no_pdf)
+    print_report(results)
+
+    output = args.output
+    if output is None:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        output = RESULTS_DIR / f"bench_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding='utf-8')
+    print(f"Результаты сохранены: {output}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding='utf-8'))
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print("\n⚠️  Обнаружены регрессии:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("\n✓ Регрессий не обнаружено")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class BuildManifest:
+    """Манифест инкрементальной сборки сертификатов.
+
+    Для каждого certificate_id хранит хеш входных данных участника, хеш
+    шаблона и путь к PDF. При повторном запуске перерисовываются только
+    новые или изменившиеся сертификаты.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: Path = None):
+        self.path = Path(path) if path is not None else Config.MANIFEST_PATH
+        self.entries = {}
+        self.load()
+
+    def load(self):
+        """Загрузка манифеста с диска (отсутствующий или поврежденный файл — пустой манифест)"""
+        if not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding='utf-8'))
+            if data.get('version') == self.VERSION:
+                self.entries = data.get('certificates', {})
+        except Exception as e:
+            logger.warning(f"Не удалось прочитать манифест {self.path}, выполняется полная сборка: {e}")
+            self.entries = {}
+
+    def save(self):
+        """Атомарное сохранение манифеста"""
+        data = {'version': self.VERSION, 'certificates': self.entries}
+        tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+        tmp_path.write_text(json.dumps(data, ensure_ascii=False, indent=1), encoding='utf-8')
+        os.replace(tmp_path, self.path)
+        logger.info(f"Манифест сохранен: {self.path} ({len(self.entries)} сертификатов)")
+
+    @staticmethod
+    def hash_inputs(fields: dict) -> str:
+        """Хеш входных данных сертификата"""
+        payload = json.dumps(fields, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def is_current(self, certificate_id: str, inputs_hash: str, template_hash: str, pdf_path: Path) -> bool:
+        """Проверка, что сертификат собран из тех же данных и PDF на месте"""
+        entry = self.entries.get(certificate_id)
+        if entry is None:
+            return False
+        return (entry.get('inputs') == inputs_hash
+                and entry.get('template') == template_hash
+                and entry.get('pdf_path') == str(pdf_path)
+                and Path(pdf_path).exists())
+
+    def record(self, certificate_id: str, inputs_hash: str, template_hash: str, pdf_path: Path):
+        """Запись собранного сертификата"""
+        self.entries[certificate_id] = {
+            'inputs': inputs_hash,
+            'template': template_hash,
+            'pdf_path': str(pdf_path),
+        }
+
+    def discard(self, certificate_id: str):
+        """Удаление записи (например, после ошибки рендеринга)"""
+        self.entries.pop(certificate_id, None)
@@ -1,16 +1,72 @@
 import hashlib
 import datetime
+import re
 import logging
 import base64
 import io
+import itertools
+import json
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
 from pathlib import Path
 from jinja2 import Environment, FileSystemLoader
 import qrcode
-from weasyprint import HTML
+import qrcode.image.svg
+from weasyprint import HTML, CSS
+from weasyprint.text.fonts import FontConfiguration
 from config import Config
+from participant import Participant
+from overlay_renderer import OverlayRenderer, OVERLAY_AVAILABLE
+from qr_store import QRCodeStore
+from build_manifest import BuildManifest
+from certificate_registry import CertificateRegistry
+from certificate_signer import CertificateSigner
 
 logger = logging.getLogger(__name__)
 
+# Блоки <style> шаблона, которые выносятся в заранее разобранные таблицы стилей
+STYLE_BLOCK_RE = re.compile(r'<style[^>]*>(.*?)</style>', re.IGNORECASE | re.DOTALL)
+
+# MIME-типы поддерживаемых форматов QR-кода
+QR_MIME_TYPES = {
+    'png': 'image/png',
+    'svg': 'image/svg+xml',
+}
+
+# Генератор, создаваемый один раз в каждом рабочем процессе пула
+_worker_generator = None
+
+
+def _config_snapshot() -> dict:
+    """Снимок настроек, влияющих на рендеринг, для передачи в рабочие процессы"""
+    return {
+        'PDF_OUTPUT_DIR': Config.PDF_OUTPUT_DIR,
+        'QR_OUTPUT_DIR': Config.QR_OUTPUT_DIR,
+        'QR_CACHE_DIR': Config.QR_CACHE_DIR,
+        'QR_CACHE_PERSIST': Config.QR_CACHE_PERSIST,
+        'TEMPLATES_DIR': Config.TEMPLATES_DIR,
+        'CERTIFICATE_CONFIG': dict(Config.CERTIFICATE_CONFIG),
+        'CERTIFICATE_SIGNING_KEY': Config.CERTIFICATE_SIGNING_KEY,
+        'CERTIFICATE_ENGINE': Config.CERTIFICATE_ENGINE,
+        'OVERLAY_LAYOUT': Config.OVERLAY_LAYOUT,
+        'QR_FORMAT': Config.QR_FORMAT,
+        'QR_CACHE_SIZE': Config.QR_CACHE_SIZE,
+    }
+
+
+def _init_worker(config_snapshot: dict):
+    """Инициализация рабочего процесса: Jinja-окружение и шаблон создаются один раз"""
+    global _worker_generator
+    for key, value in config_snapshot.items():
+        setattr(Config, key, value)
+    _worker_generator = CertificateGenerator()
+
+
+def _render_in_worker(participant: Participant, save_qr: bool) -> dict:
+    """Создание сертификата в рабочем процессе"""
+    return _worker_generator.create_certificate(participant, save_qr=save_qr)
+
+
 class CertificateGenerator:
     """Класс для генерации сертификатов с QR-кодами"""
     
@@ -20,7 +76,62 @@ class CertificateGenerator:
         
         # Создаем шаблон по умолчанию, если он не существует
         self.create_default_template()
-        self.template = self.env.get_template('certificate_template.html')
+        
+        # Подпись ID сертификатов (если задан ключ)
+        self.signer = CertificateSigner(Config.CERTIFICATE_SIGNING_KEY) if Config.CERTIFICATE_SIGNING_KEY else None
+        
+        # Хранилище QR-кодов с LRU-кэшем в памяти процесса
+        self.qr_store = QRCodeStore()
+        
+        # Общая конфигурация шрифтов: поиск шрифтов выполняется один раз на процесс
+        self.font_config = FontConfiguration()
+        self.template, self.stylesheets = self.load_template('certificate_template.html')
+        
+        # Быстрый движок наложения полей на готовый фон (если включен)
+        self.overlay = None
+        if Config.CERTIFICATE_ENGINE == 'overlay':
+            self.overlay = self.create_overlay_renderer()
+        
+        self.template_hash = self.compute_template_hash()
+    
+    def load_template(self, template_name: str):
+        """Загрузка шаблона с выносом статических стилей в заранее разобранные CSS.
+        
+        Статические блоки <style> удаляются из HTML и разбираются один раз,
+        после чего передаются в каждый рендер. Блоки с Jinja-выражениями
+        остаются в шаблоне, так как зависят от данных участника.
+        """
+        source, _, _ = self.env.loader.get_source(self.env, template_name)
+        css_blocks = []
+        
+        def extract_style(match):
+            css = match.group(1)
+            if '{{' in css or '{%' in css:
+                return match.group(0)
+            css_blocks.append(css)
+            return ''
+        
+        html_source = STYLE_BLOCK_RE.sub(extract_style, source)
+        stylesheets = [CSS(string=css, font_config=self.font_config) for css in css_blocks]
+        logger.debug(f"Из шаблона {template_name} вынесено таблиц стилей: {len(stylesheets)}")
+        
+        return self.env.from_string(html_source), stylesheets
+    
+    def compute_template_hash(self) -> str:
+        """Хеш всего, что влияет на вид сертификата помимо данных участника"""
+        hash_object = hashlib.sha256()
+        template_names = ['certificate_template.html']
+        if self.overlay is not None:
+            template_names.append('certificate_background.html')
+            hash_object.update(json.dumps(Config.OVERLAY_LAYOUT, ensure_ascii=False, sort_keys=True).encode())
+        
+        for template_name in template_names:
+            source, _, _ = self.env.loader.get_source(self.env, template_name)
+            hash_object.update(source.encode('utf-8'))
+        
+        engine = 'overlay' if self.overlay is not None else 'html'
+        hash_object.update(f"{engine}:{Config.QR_FORMAT}".encode())
+        return hash_object.hexdigest()
     
     def create_default_template(self):
         """Создание HTML-шаблона сертификата по умолчанию"""
@@ -182,7 +293,7 @@ class CertificateGenerator:
         
         <div class="footer">
             <div class="qr-code">
-                <img src="data:image/png;base64,{{ qr_code_base64 }}" alt="QR Code">
+                <img src="data:{{ qr_code_mime|default('image/png') }};base64,{{ qr_code_base64 }}" alt="QR Code">
                 <div class="qr-text">Отсканируйте для верификации</div>
                 <div class="verification-info">ID: {{ certificate_id }}</div>
                 <div class="verification-url">{{ verification_url|truncate(40) }}</div>
@@ -205,31 +316,70 @@ class CertificateGenerator:
             template_path.write_text(template_content, encoding='utf-8')
             logger.info("Создан шаблон сертификата по умолчанию")
     
-    def generate_qr_code(self, data: str, participant_name: str):
-        """Генерация QR-кода с данными для верификации"""
+    def create_overlay_renderer(self):
+        """Подготовка движка overlay: статический фон рендерится один раз.
+        
+        Фон берется из templates/certificate_background.html. Если файла нет
+        или движок недоступен, используется полный HTML-рендеринг.
+        """
+        if not OVERLAY_AVAILABLE:
+            logger.warning("Движок overlay недоступен (нужны pypdf и reportlab), используется HTML-рендеринг")
+            return None
+        
         try:
-            qr = qrcode.QRCode(
-                version=1,
-                error_correction=qrcode.constants.ERROR_CORRECT_L,
-                box_size=10,
-                border=4,
+            template, stylesheets = self.load_template('certificate_background.html')
+            background_html = template.render(organization=Config.CERTIFICATE_CONFIG['organization'])
+            background_pdf = HTML(string=background_html).write_pdf(
+                stylesheets=stylesheets,
+                font_config=self.font_config
             )
-            qr.add_data(data)
-            qr.make(fit=True)
-            
-            img = qr.make_image(fill_color="black", back_color="white")
+            logger.info("Фон сертификата подготовлен для движка overlay")
+            return OverlayRenderer(background_pdf, Config.OVERLAY_LAYOUT, self.env)
+        except Exception as e:
+            logger.warning(f"Не удалось подготовить движок overlay, используется HTML-рендеринг: {e}")
+            return None
+    
+    def generate_qr_code(self, data: str, participant_name: str, save_file: bool = True, qr_format: str = None):
+        """Генерация QR-кода с данными для верификации.
+        
+        Изображение кодируется один раз в памяти: 'png' — растровое, 'svg' —
+        векторное. Готовые QR-коды берутся из контентно-адресуемого хранилища
+        (дисковый кэш пополняется всегда). Файл в qr_codes/ записывается только
+        при save_file=True, иначе вместо пути возвращается None.
+        """
+        if qr_format is None:
+            qr_format = Config.QR_FORMAT
+        if qr_format not in QR_MIME_TYPES:
+            raise ValueError(f"Неподдерживаемый формат QR-кода: {qr_format}")
+        
+        try:
+            # Повторные и перезапускаемые сертификаты берут готовый QR-код из хранилища
+            qr_bytes = self.qr_store.get(data, qr_format)
             
-            safe_name = "".join(c if c.isalnum() else "_" for c in participant_name)
-            qr_filename = f"qr_{safe_name}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-            qr_path = Config.QR_OUTPUT_DIR / qr_filename
+            if qr_bytes is None:
+                qr = qrcode.QRCode(
+                    version=1,
+                    error_correction=qrcode.constants.ERROR_CORRECT_L,
+                    box_size=10,
+                    border=4,
+                )
+                qr.add_data(data)
+                qr.make(fit=True)
+                
+                if qr_format == 'svg':
+                    img = qr.make_image(image_factory=qrcode.image.svg.SvgPathImage)
+                    qr_bytes = img.to_string()
+                else:
+                    img = qr.make_image(fill_color="black", back_color="white")
+                    buffered = io.BytesIO()
+                    img.save(buffered, format="PNG")
+                    qr_bytes = buffered.getvalue()
+                logger.debug(f"QR-код сгенерирован для {participant_name}")
             
-            img.save(qr_path)
-            logger.debug(f"QR-код сохранен: {qr_path}")
+            qr_path = self.qr_store.put(data, qr_format, qr_bytes, save_file=save_file)
             
-            # Конвертируем изображение в base64 для HTML
-            buffered = io.BytesIO()
-            img.save(buffered, format="PNG")
-            qr_base64 = base64.b64encode(buffered.getvalue()).decode()
+            # base64 для data URI в HTML
+            qr_base64 = base64.b64encode(qr_bytes).decode()
             
             return qr_path, qr_base64
             
@@ -237,69 +387,139 @@ class CertificateGenerator:
             logger.error(f"Ошибка при генерации QR-кода: {e}")
             raise
     
-    def generate_certificate_id(self, participant: dict) -> str:
-        """Генерация уникального ID сертификата"""
+    def generate_certificate_id(self, participant: Participant) -> str:
+        """Генерация уникального ID сертификата.
+        
+        Если при загрузке обнаружена коллизия ID, участнику назначается
+        certificate_id_salt, который добавляется к хешируемым данным.
+        Если задан Config.CERTIFICATE_SIGNING_KEY, к ID добавляется HMAC-подпись.
+        """
         data_string = f"{participant['full_name']}_{participant['course_name']}_{participant.get('email', '')}"
+        salt = participant.get('certificate_id_salt')
+        if salt:
+            data_string = f"{data_string}_{salt}"
         hash_object = hashlib.sha256(data_string.encode())
         short_hash = hash_object.hexdigest()[:12].upper()
         
-        return f"{Config.CERTIFICATE_CONFIG['certificate_prefix']}-{short_hash}"
+        certificate_id = f"{Config.CERTIFICATE_CONFIG['certificate_prefix']}-{short_hash}"
+        if self.signer is not None:
+            certificate_id = self.signer.sign(certificate_id)
+        
+        return certificate_id
     
     def generate_verification_url(self, certificate_id: str) -> str:
         """Генерация URL для верификации"""
         return f"{Config.CERTIFICATE_CONFIG['base_url']}/verify/{certificate_id}"
     
-    def create_certificate(self, participant: dict) -> dict:
-        """Создание сертификата для участника"""
+    def identify_participant(self, participant: Participant) -> str:
+        """Заполнение имени и курса участника. Возвращает ID сертификата.
+        
+        Дата не подставляется: так ID можно вычислить до сборки (например,
+        при дедупликации), не меняя хеш входных данных в манифесте.
+        """
+        if 'full_name' not in participant:
+            participant['full_name'] = f"{participant.get('Имя', '')} {participant.get('Фамилия', '')}"
+        
+        if 'course_name' not in participant:
+            participant['course_name'] = participant.get('course', 'Основы Python')
+        
+        return self.generate_certificate_id(participant)
+    
+    def prepare_participant(self, participant: Participant) -> str:
+        """Заполнение недостающих полей участника. Возвращает ID сертификата"""
+        certificate_id = self.identify_participant(participant)
+        
+        if not participant.get('date_completed'):
+            participant['date_completed'] = datetime.datetime.now().strftime('%Y-%m-%d')
+        
+        return certificate_id
+    
+    def certificate_fields(self, participant: Participant, certificate_id: str) -> dict:
+        """Данные участника, которые попадают в сертификат (без QR-кода)"""
+        return {
+            'full_name': participant['full_name'],
+            'course_name': participant['course_name'],
+            'date_completed': participant.get('date_completed') or datetime.datetime.now().strftime('%Y-%m-%d'),
+            'hours': participant.get('hours', Config.CERTIFICATE_CONFIG['default_hours']),
+            'certificate_id': certificate_id,
+            'verification_url': self.generate_verification_url(certificate_id),
+            'organization': Config.CERTIFICATE_CONFIG['organization']
+        }
+    
+    def get_pdf_path(self, participant: Participant, certificate_id: str) -> Path:
+        """Путь к PDF сертификата участника"""
+        safe_name = "".join(c if c.isalnum() or c in " -_" else "_" for c in participant['full_name'])
+        return Config.PDF_OUTPUT_DIR / f"Сертификат_{safe_name}_{certificate_id}.pdf"
+    
+    @staticmethod
+    def hash_pdf_file(pdf_path: Path) -> str:
+        """SHA-256 содержимого готового PDF"""
+        hash_object = hashlib.sha256()
+        with open(pdf_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                hash_object.update(block)
+        return hash_object.hexdigest()
+    
+    def create_certificate(self, participant: Participant, save_qr: bool = True,
+                           registry: CertificateRegistry = None) -> dict:
+        """Создание сертификата для участника.
+        
+        Результат содержит SHA-256 содержимого PDF ('content_hash'). Если
+        передан реестр, сертификат сразу записывается в него.
+        """
         try:
-            # Добавляем недостающие поля
-            if 'full_name' not in participant:
-                participant['full_name'] = f"{participant.get('Имя', '')} {participant.get('Фамилия', '')}"
-            
-            if 'course_name' not in participant:
-                participant['course_name'] = participant.get('course', 'Основы Python')
+            # Добавляем недостающие поля и генерируем ID сертификата
+            certificate_id = self.prepare_participant(participant)
             
-            # Генерация ID сертификата
-            certificate_id = self.generate_certificate_id(participant)
+            # Данные для шаблона, включая URL для верификации
+            template_data = self.certificate_fields(participant, certificate_id)
+            verification_url = template_data['verification_url']
             
-            # Генерация URL для верификации
-            verification_url = self.generate_verification_url(certificate_id)
-            
-            # Генерация QR-кода (возвращает путь и base64)
-            qr_path, qr_base64 = self.generate_qr_code(verification_url, participant['full_name'])
-            
-            # Подготовка данных для шаблона
-            template_data = {
-                'full_name': participant['full_name'],
-                'course_name': participant['course_name'],
-                'date_completed': participant.get('date_completed', datetime.datetime.now().strftime('%Y-%m-%d')),
-                'hours': participant.get('hours', Config.CERTIFICATE_CONFIG['default_hours']),
-                'certificate_id': certificate_id,
-                'qr_code_base64': qr_base64,
-                'verification_url': verification_url,
-                'organization': Config.CERTIFICATE_CONFIG['organization']
-            }
+            # Генерация QR-кода (возвращает путь и base64); движку overlay нужен растровый PNG
+            qr_format = 'png' if self.overlay is not None else Config.QR_FORMAT
+            qr_path, qr_base64 = self.generate_qr_code(
+                verification_url, participant['full_name'],
+                save_file=save_qr, qr_format=qr_format
+            )
             
-            # Рендеринг HTML
-            html_content = self.template.render(**template_data)
+            template_data['qr_code_base64'] = qr_base64
+            template_data['qr_code_mime'] = QR_MIME_TYPES[qr_format]
             
             # Генерация PDF
-            safe_name = "".join(c if c.isalnum() or c in " -_" else "_" for c in participant['full_name'])
-            pdf_filename = f"Сертификат_{safe_name}_{certificate_id}.pdf"
-            pdf_path = Config.PDF_OUTPUT_DIR / pdf_filename
+            pdf_path = self.get_pdf_path(participant, certificate_id)
+            
+            if self.overlay is not None:
+                # Наложение полей на готовый фон без HTML-вёрстки
+                buffer = io.BytesIO()
+                self.overlay.render(template_data, base64.b64decode(qr_base64), buffer)
+                pdf_bytes = buffer.getvalue()
+            else:
+                # Рендеринг HTML
+                html_content = self.template.render(**template_data)
+                pdf_bytes = HTML(string=html_content).write_pdf(
+                    stylesheets=self.stylesheets,
+                    font_config=self.font_config
+                )
             
-            HTML(string=html_content).write_pdf(pdf_path)
+            # PDF уже в памяти: хеш содержимого считается без повторного чтения файла
+            pdf_path.write_bytes(pdf_bytes)
+            content_hash = hashlib.sha256(pdf_bytes).hexdigest()
             
-            logger.info(f"Сертификат создан: {pdf_filename}")
+            logger.info(f"Сертификат создан: {pdf_path.name}")
             
             # Добавляем информацию в объект участника
             participant['certificate_id'] = certificate_id
             participant['pdf_path'] = pdf_path
             participant['verification_url'] = verification_url
+            participant['content_hash'] = content_hash
+            
+            if registry is not None:
+                registry.upsert(CertificateRegistry.record_for(participant))
             
             return {
                 'participant': participant,
                 'pdf_path': pdf_path,
+                'content_hash': content_hash,
                 'status': 'success'
             }
             
@@ -309,4 +529,148 @@ class CertificateGenerator:
                 'participant': participant,
                 'status': 'error',
                 'error': str(e)
-            }
\ No newline at end of file
+            }
+    
+    def create_certificates(self, participants, workers: int = None, save_qr: bool = None,
+                            manifest: BuildManifest = None, force: bool = False,
+                            registry: CertificateRegistry = None):
+        """Пакетное создание сертификатов в пуле процессов.
+        
+        Результаты выдаются по мере готовности (в порядке завершения) в том же
+        формате, что и у create_certificate. Изменения участника, сделанные в
+        рабочем процессе, переносятся обратно в исходный объект.
+        Файлы QR-кодов по умолчанию не сохраняются (см. Config.QR_SAVE_FILES).
+        
+        Если передан манифест, сертификаты с неизменившимися входными данными
+        не перерисовываются (результат с 'skipped': True); force=True
+        пересобирает все сертификаты.
+        
+        Если передан реестр, выданные сертификаты записываются в него пачками
+        по Config.REGISTRY_BATCH_SIZE в родительском процессе.
+        """
+        if workers is None:
+            workers = Config.RENDER_WORKERS
+        if save_qr is None:
+            save_qr = Config.QR_SAVE_FILES
+        
+        if manifest is None:
+            results = self._render_batch(participants, workers, save_qr)
+        else:
+            results = self._render_incremental(participants, workers, save_qr, manifest, force)
+        
+        if registry is None:
+            yield from results
+            return
+        
+        records = []
+        try:
+            for result in results:
+                if result['status'] == 'success':
+                    participant = result['participant']
+                    if not result.get('skipped'):
+                        records.append(CertificateRegistry.record_for(participant))
+                    elif participant['certificate_id'] not in registry:
+                        # Сертификат собран раньше, но еще не попал в реестр
+                        participant['content_hash'] = self.hash_pdf_file(result['pdf_path'])
+                        records.append(CertificateRegistry.record_for(participant))
+                    
+                    if len(records) >= Config.REGISTRY_BATCH_SIZE:
+                        registry.upsert_many(records)
+                        records = []
+                yield result
+        finally:
+            results.close()
+            registry.upsert_many(records)
+    
+    def _render_incremental(self, participants, workers: int, save_qr: bool,
+                            manifest: BuildManifest, force: bool):
+        """Рендеринг только новых и изменившихся сертификатов с учетом манифеста"""
+        skipped = deque()
+        jobs = {}
+        stale = self._select_stale(participants, manifest, force, skipped, jobs)
+        
+        try:
+            for result in self._render_batch(stale, workers, save_qr):
+                while skipped:
+                    yield skipped.popleft()
+                
+                # ID берется из отбора: при ошибке рендеринга участнику он не назначается
+                _, certificate_id, inputs_hash = jobs.pop(id(result['participant']))
+                if result['status'] == 'success':
+                    manifest.record(certificate_id, inputs_hash, self.template_hash, result['pdf_path'])
+                else:
+                    manifest.discard(certificate_id)
+                yield result
+            
+            while skipped:
+                yield skipped.popleft()
+        finally:
+            manifest.save()
+    
+    def _select_stale(self, participants, manifest: BuildManifest, force: bool, skipped: deque, jobs: dict):
+        """Отбор участников, чьи сертификаты нужно перерисовать.
+        
+        Актуальные сертификаты складываются в skipped как готовые результаты.
+        Для отобранных в jobs запоминаются ID сертификата и хеш входных данных.
+        """
+        for participant in participants:
+            # Хешируется дата из исходных данных: подставленная по умолчанию
+            # текущая дата менялась бы каждый день и вызывала пересборку
+            raw_date = participant.get('date_completed') or None
+            certificate_id = self.prepare_participant(participant)
+            fields = self.certificate_fields(participant, certificate_id)
+            inputs_hash = BuildManifest.hash_inputs(dict(fields, date_completed=raw_date))
+            pdf_path = self.get_pdf_path(participant, certificate_id)
+            
+            if not force and manifest.is_current(certificate_id, inputs_hash, self.template_hash, pdf_path):
+                participant['certificate_id'] = certificate_id
+                participant['pdf_path'] = pdf_path
+                participant['verification_url'] = fields['verification_url']
+                skipped.append({
+                    'participant': participant,
+                    'pdf_path': pdf_path,
+                    'status': 'success',
+                    'skipped': True
+                })
+                continue
+            
+            jobs[id(participant)] = (participant, certificate_id, inputs_hash)
+            yield participant
+    
+    def _render_batch(self, participants, workers: int, save_qr: bool):
+        """Рендеринг сертификатов последовательно или в пуле процессов"""
+        if workers <= 1:
+            for participant in participants:
+                yield self.create_certificate(participant, save_qr=save_qr)
+            return
+        
+        participants_iter = iter(participants)
+        # Ограничиваем число задач в очереди, чтобы не держать всю когорту в пуле
+        max_pending = workers * 4
+        
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(_config_snapshot(),)) as executor:
+            pending = {}
+            for participant in itertools.islice(participants_iter, max_pending):
+                pending[executor.submit(_render_in_worker, participant, save_qr)] = participant
+            
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                
+                for future in done:
+                    participant = pending.pop(future)
+                    try:
+                        result = future.result()
+                        participant.update(result['participant'])
+                        result['participant'] = participant
+                    except Exception as e:
+                        logger.error(f"Ошибка рабочего процесса для {participant.get('full_name', 'Неизвестный')}: {e}")
+                        result = {
+                            'participant': participant,
+                            'status': 'error',
+                            'error': str(e)
+                        }
+                    yield result
+                
+                for participant in itertools.islice(participants_iter, len(done)):
+                    pending[executor.submit(_render_in_worker, participant, save_qr)] = participant
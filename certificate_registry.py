@@ -0,0 +1,128 @@
+import datetime
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class CertificateRegistry:
+    """Реестр выданных сертификатов во встроенной базе SQLite.
+
+    В отличие от report.csv, который перезаписывается при каждом запуске,
+    реестр накапливает все выданные сертификаты. Поиск по ID сертификата
+    (первичный ключ) и по email (индекс) выполняется за O(log n), записи
+    добавляются пачками в одной транзакции. Реестр служит источником данных
+    для проверки ссылок /verify/<id>.
+    """
+
+    COLUMNS = (
+        'certificate_id', 'full_name', 'email', 'course_name', 'hours',
+        'date_completed', 'pdf_path', 'content_hash', 'issued_at'
+    )
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS certificates (
+            certificate_id TEXT PRIMARY KEY,
+            full_name TEXT NOT NULL,
+            email TEXT,
+            course_name TEXT,
+            hours TEXT,
+            date_completed TEXT,
+            pdf_path TEXT,
+            content_hash TEXT,
+            issued_at TEXT NOT NULL
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_certificates_email ON certificates (email);
+    """
+
+    def __init__(self, path: Path = None):
+        self.path = Path(path) if path is not None else Config.REGISTRY_PATH
+        # Соединение используется из потоков конвейера, доступ сериализуется блокировкой
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(self.SCHEMA)
+
+    @staticmethod
+    def normalize_email(email) -> str:
+        """Email в виде, по которому строится индекс"""
+        return str(email or '').strip().lower()
+
+    @staticmethod
+    def record_for(participant, content_hash: str = None) -> dict:
+        """Запись реестра для участника с выданным сертификатом"""
+        return {
+            'certificate_id': participant['certificate_id'],
+            'full_name': participant.get('full_name', ''),
+            'email': CertificateRegistry.normalize_email(participant.get('Email')),
+            'course_name': participant.get('course_name', ''),
+            'hours': str(participant.get('hours', '')),
+            'date_completed': str(participant.get('date_completed', '')),
+            'pdf_path': str(participant.get('pdf_path', '')),
+            'content_hash': content_hash if content_hash is not None else participant.get('content_hash'),
+            'issued_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        }
+
+    def upsert_many(self, records) -> int:
+        """Добавление или обновление записей одной транзакцией. Возвращает их число"""
+        rows = [tuple(record[column] for column in self.COLUMNS) for record in records]
+        if not rows:
+            return 0
+
+        placeholders = ', '.join('?' for _ in self.COLUMNS)
+        updates = ', '.join(f"{column} = excluded.{column}" for column in self.COLUMNS[1:])
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT INTO certificates ({', '.join(self.COLUMNS)}) VALUES ({placeholders}) "
+                f"ON CONFLICT (certificate_id) DO UPDATE SET {updates}",
+                rows
+            )
+        logger.debug(f"В реестр записано сертификатов: {len(rows)}")
+        return len(rows)
+
+    def upsert(self, record: dict):
+        """Добавление или обновление одной записи"""
+        self.upsert_many([record])
+
+    def get(self, certificate_id: str):
+        """Поиск сертификата по ID. Возвращает словарь или None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM certificates WHERE certificate_id = ?", (certificate_id,)
+            ).fetchone()
+        return dict(row) if row is not None else None
+
+    def find_by_email(self, email: str) -> list:
+        """Все сертификаты, выданные на указанный email"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM certificates WHERE email = ? ORDER BY issued_at",
+                (self.normalize_email(email),)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def __contains__(self, certificate_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM certificates WHERE certificate_id = ?", (certificate_id,)
+            ).fetchone()
+        return row is not None
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM certificates").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,47 @@
+import base64
+import hashlib
+import hmac
+import logging
+
+logger = logging.getLogger(__name__)
+
+class CertificateSigner:
+    """Подпись ID сертификатов ключом HMAC-SHA256.
+
+    Подписанный ID имеет вид PREFIX-HASH12-MAC, где MAC — первые 80 бит
+    HMAC от PREFIX-HASH12 в base32 (16 символов). Владелец ключа проверяет
+    подлинность ID одной проверкой MAC за постоянное время, без обращения
+    к реестру. Состояние HMAC после ввода ключа вычисляется один раз и
+    копируется для каждого ID, поэтому пакетная проверка идет со скоростью
+    хеширования.
+    """
+
+    MAC_BYTES = 10
+
+    def __init__(self, key):
+        if not key:
+            raise ValueError("Ключ подписи сертификатов не задан")
+        if isinstance(key, str):
+            key = key.encode('utf-8')
+        self._hmac = hmac.new(key, digestmod=hashlib.sha256)
+
+    def mac(self, unsigned_id: str) -> str:
+        """MAC для ID без подписи"""
+        h = self._hmac.copy()
+        h.update(unsigned_id.encode('utf-8'))
+        return base64.b32encode(h.digest()[:self.MAC_BYTES]).decode('ascii')
+
+    def sign(self, unsigned_id: str) -> str:
+        """Добавление подписи к ID"""
+        return f"{unsigned_id}-{self.mac(unsigned_id)}"
+
+    def verify(self, certificate_id: str) -> bool:
+        """Проверка подписи ID (сравнение за постоянное время)"""
+        unsigned_id, sep, mac = str(certificate_id).rpartition('-')
+        if not sep or not unsigned_id:
+            return False
+        return hmac.compare_digest(self.mac(unsigned_id), mac)
+
+    def verify_many(self, certificate_ids) -> list:
+        """Пакетная проверка: список bool в порядке входных ID"""
+        return [self.verify(certificate_id) for certificate_id in certificate_ids]
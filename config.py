@@ -39,6 +39,10 @@ class Config:
     PDF_OUTPUT_DIR = Path("certificates")
     QR_OUTPUT_DIR = Path("qr_codes")
     TEMPLATES_DIR = Path("templates")
+    # Манифест инкрементальной сборки (рядом с каталогом сертификатов)
+    MANIFEST_PATH = Path("certificates_manifest.json")
+    # Реестр выданных сертификатов (SQLite) для проверки по ссылке /verify/<id>
+    REGISTRY_PATH = Path(os.getenv('REGISTRY_PATH', 'certificates.db'))
     
     # Конфигурация сертификатов
     CERTIFICATE_CONFIG = {
@@ -48,6 +52,10 @@ class Config:
         'organization': 'Образовательный центр'
     }
     
+    # Ключ подписи ID сертификатов (HMAC). Если задан, ID имеют вид PREFIX-HASH12-MAC
+    # и проверяются без обращения к реестру. Пустое значение — ID без подписи
+    CERTIFICATE_SIGNING_KEY = os.getenv('CERTIFICATE_SIGNING_KEY', '')
+    
     # Настройки для отправки email — берем из окружения (без хардкода)
     SENDER_EMAIL = os.getenv('SENDER_EMAIL', '')
     SENDER_PASSWORD = os.getenv('SENDER_PASSWORD', '')
@@ -56,10 +64,156 @@ class Config:
         SMTP_PORT = int(os.getenv('SMTP_PORT', '587'))
     except ValueError:
         SMTP_PORT = 587
+    # Защита соединения: 'starttls', 'ssl' или 'none' (только для локальных тестов).
+    # По умолчанию определяется по порту: 587 — STARTTLS, 465 — SSL
+    SMTP_SECURITY = os.getenv('SMTP_SECURITY', '').lower()
+    # Таймаут операций SMTP (секунды): зависшее соединение обнаруживается и пересоздается
+    try:
+        SMTP_TIMEOUT = float(os.getenv('SMTP_TIMEOUT', '30'))
+    except ValueError:
+        SMTP_TIMEOUT = 30.0
+    # Журнал рассылки (SQLite) для продолжения после сбоя (--resume) и размер пачки сохранения статусов
+    OUTBOX_PATH = Path(os.getenv('OUTBOX_PATH', 'email_outbox.db'))
+    try:
+        OUTBOX_BATCH_SIZE = int(os.getenv('OUTBOX_BATCH_SIZE', '20'))
+    except ValueError:
+        OUTBOX_BATCH_SIZE = 20
+    # Количество параллельных SMTP-соединений при рассылке
+    try:
+        SMTP_WORKERS = int(os.getenv('SMTP_WORKERS', '4'))
+    except ValueError:
+        SMTP_WORKERS = 4
+    # Ограничение скорости отправки на аккаунт: писем в секунду и в час (0 — без часового лимита)
+    try:
+        SMTP_RATE_PER_SECOND = float(os.getenv('SMTP_RATE_PER_SECOND', '5'))
+    except ValueError:
+        SMTP_RATE_PER_SECOND = 5.0
+    try:
+        SMTP_RATE_PER_HOUR = int(os.getenv('SMTP_RATE_PER_HOUR', '0'))
+    except ValueError:
+        SMTP_RATE_PER_HOUR = 0
+    # Повторы при временных ошибках SMTP: число попыток и экспоненциальная задержка (секунды)
+    try:
+        SMTP_RETRY_ATTEMPTS = int(os.getenv('SMTP_RETRY_ATTEMPTS', '5'))
+    except ValueError:
+        SMTP_RETRY_ATTEMPTS = 5
+    try:
+        SMTP_BACKOFF_BASE = float(os.getenv('SMTP_BACKOFF_BASE', '1'))
+    except ValueError:
+        SMTP_BACKOFF_BASE = 1.0
+    try:
+        SMTP_BACKOFF_MAX = float(os.getenv('SMTP_BACKOFF_MAX', '60'))
+    except ValueError:
+        SMTP_BACKOFF_MAX = 60.0
+    # Пул аккаунтов/релеев для рассылки: JSON-список в SMTP_ACCOUNTS или путь к JSON-файлу в
+    # SMTP_ACCOUNTS_FILE. Поля аккаунта: email, password, server, port, security, rate_per_second,
+    # rate_per_hour, weight (не указанные берутся из основных настроек). Если пул не задан,
+    # используется один аккаунт SENDER_EMAIL
+    SMTP_ACCOUNTS = os.getenv('SMTP_ACCOUNTS', '')
+    SMTP_ACCOUNTS_FILE = os.getenv('SMTP_ACCOUNTS_FILE', '')
+    # На сколько секунд аккаунт исключается из пула после ответа провайдера об ограничении
+    try:
+        SMTP_ACCOUNT_COOLDOWN = float(os.getenv('SMTP_ACCOUNT_COOLDOWN', '60'))
+    except ValueError:
+        SMTP_ACCOUNT_COOLDOWN = 60.0
+    # Сколько писем отправлять через одно SMTP-соединение до его пересоздания
+    try:
+        SMTP_MAX_MESSAGES_PER_CONNECTION = int(os.getenv('SMTP_MAX_MESSAGES_PER_CONNECTION', '100'))
+    except ValueError:
+        SMTP_MAX_MESSAGES_PER_CONNECTION = 100
+    
+    # Объединение сертификатов одного получателя (по email) в одно письмо;
+    # EMAIL_GROUP_ZIP — прикладывать их одним ZIP-архивом вместо отдельных PDF
+    EMAIL_GROUP_BY_RECIPIENT = os.getenv('EMAIL_GROUP_BY_RECIPIENT', '0').lower() in ('1', 'true', 'yes')
+    EMAIL_GROUP_ZIP = os.getenv('EMAIL_GROUP_ZIP', '0').lower() in ('1', 'true', 'yes')
+    
+    # Количество процессов для пакетного рендеринга сертификатов
+    try:
+        RENDER_WORKERS = int(os.getenv('RENDER_WORKERS', str(os.cpu_count() or 1)))
+    except ValueError:
+        RENDER_WORKERS = os.cpu_count() or 1
+    
+    # Движок рендеринга: 'html' — полная вёрстка WeasyPrint для каждого сертификата,
+    # 'overlay' — статический фон рендерится один раз, поверх накладываются поля участника
+    CERTIFICATE_ENGINE = os.getenv('CERTIFICATE_ENGINE', 'html')
+    
+    # Позиции переменных полей для движка overlay (мм от левого верхнего угла,
+    # y — базовая линия текста, размер шрифта в pt). Рассчитаны на фон
+    # templates/certificate_background.html; текст задается Jinja-выражением.
+    OVERLAY_LAYOUT = {
+        'full_name': {'x': 148.5, 'y': 92, 'size': 24, 'color': '#2980b9', 'align': 'center',
+                      'bold': True, 'underline': '#3498db', 'padding': 2.6,
+                      'text': '{{ full_name }}'},
+        'course_name': {'x': 148.5, 'y': 114, 'size': 16.5, 'color': '#e74c3c', 'align': 'center',
+                        'text': '«{{ course_name }}»'},
+        'hours': {'x': 148.5, 'y': 125, 'size': 12, 'color': '#7f8c8d', 'align': 'center',
+                  'text': 'Продолжительность: {{ hours }} академических часов'},
+        'date_completed': {'x': 148.5, 'y': 132, 'size': 12, 'color': '#7f8c8d', 'align': 'center',
+                           'text': 'Дата завершения: {{ date_completed }}'},
+        'qr_code': {'x': 46, 'y': 136, 'size': 30},
+        'certificate_id': {'x': 61, 'y': 173.5, 'size': 6.75, 'color': '#7f8c8d', 'align': 'center',
+                           'text': 'ID: {{ certificate_id }}'},
+        'verification_url': {'x': 61, 'y': 176.5, 'size': 6, 'color': '#95a5a6', 'align': 'center',
+                             'text': '{{ verification_url|truncate(40) }}'},
+        'certificate_id_corner': {'x': 269, 'y': 181, 'size': 7.5, 'color': '#95a5a6', 'align': 'right',
+                                  'text': 'ID: {{ certificate_id }}'},
+    }
+    
+    # Формат QR-кода в сертификате: 'png' (растровый) или 'svg' (векторный)
+    QR_FORMAT = os.getenv('QR_FORMAT', 'png')
+    # Дисковый кэш QR-кодов: готовые QR-коды переиспользуются между запусками ценой
+    # записи файла на каждый новый сертификат (по умолчанию выключен)
+    QR_CACHE_PERSIST = os.getenv('QR_CACHE_PERSIST', '0').lower() in ('1', 'true', 'yes')
+    QR_CACHE_DIR = Path(os.getenv('QR_CACHE_DIR', 'qr_cache'))
+    # Сохранять файлы QR-кодов в qr_codes/ при пакетной генерации (по умолчанию нет)
+    QR_SAVE_FILES = os.getenv('QR_SAVE_FILES', '0').lower() in ('1', 'true', 'yes')
+    # Размер LRU-кэша QR-кодов в памяти процесса
+    try:
+        QR_CACHE_SIZE = int(os.getenv('QR_CACHE_SIZE', '1024'))
+    except ValueError:
+        QR_CACHE_SIZE = 1024
+    
+    # Размер очереди между стадиями рендеринга и отправки в режиме конвейера
+    try:
+        PIPELINE_QUEUE_SIZE = int(os.getenv('PIPELINE_QUEUE_SIZE', '64'))
+    except ValueError:
+        PIPELINE_QUEUE_SIZE = 64
+    
+    # Размер части при потоковом чтении больших CSV
+    try:
+        CSV_CHUNK_SIZE = int(os.getenv('CSV_CHUNK_SIZE', '50000'))
+    except ValueError:
+        CSV_CHUNK_SIZE = 50000
+    
+    # Обработка дубликатов и коллизий ID при загрузке: 'report', 'drop' или 'disambiguate'
+    DEDUP_MODE = os.getenv('DEDUP_MODE', 'report')
+    
+    # Сколько записей реестра сертификатов сохранять одной транзакцией
+    try:
+        REGISTRY_BATCH_SIZE = int(os.getenv('REGISTRY_BATCH_SIZE', '500'))
+    except ValueError:
+        REGISTRY_BATCH_SIZE = 500
+    
+    # Сервер проверки сертификатов (verification_server.py)
+    VERIFY_HOST = os.getenv('VERIFY_HOST', '127.0.0.1')
+    try:
+        VERIFY_PORT = int(os.getenv('VERIFY_PORT', '8080'))
+    except ValueError:
+        VERIFY_PORT = 8080
+    # Размер горячего кэша ответов и время жизни записи в нем (секунды)
+    try:
+        VERIFY_CACHE_SIZE = int(os.getenv('VERIFY_CACHE_SIZE', '10000'))
+    except ValueError:
+        VERIFY_CACHE_SIZE = 10000
+    try:
+        VERIFY_CACHE_TTL = float(os.getenv('VERIFY_CACHE_TTL', '60'))
+    except ValueError:
+        VERIFY_CACHE_TTL = 60.0
     
     # Стиль сертификата
     FONT_PATH = os.getenv('FONT_PATH', 'arial.ttf')
     FONT_NAME = os.getenv('FONT_NAME', 'Arial')
+    FONT_BOLD_PATH = os.getenv('FONT_BOLD_PATH', 'arialbd.ttf')
 
     @staticmethod
     def save_to_env(updates: dict, dotenv_path: Path = Path('.env')):
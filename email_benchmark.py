@@ -0,0 +1,172 @@
+"""Бенчмарк рассылки на локальном SMTP-сервере (smtp_sink.py).
+
+Запускает SMTPSink с заданной задержкой, ограничением скорости и обрывами
+соединения и отправляет через EmailSender.send_emails_to_all синтетическую
+когорту писем с PDF-вложением. Для каждого числа потоков выводит писем в
+секунду, стоимость установки соединения (TCP + STARTTLS + AUTH), число
+соединений, ответов 451 и 421 и обрывов. Результаты сохраняются в JSON.
+
+Примеры:
+    python email_benchmark.py --messages 500 --workers 1 4 8
+    python email_benchmark.py --messages 500 --latency 0.02 --max-rate 100 --close-rate 0.01 --disconnect-rate 0.01
+    python email_benchmark.py --messages 200 --per-message-connection
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import logging
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from config import Config
+from email_sender import EmailSender
+from participant import Participant
+from rate_limiter import RateLimiter
+from smtp_sink import SMTPSink, make_tls_context
+
+RESULTS_DIR = Path("benchmark_results")
+
+
+def make_cohort(size: int, attachment_kb: int, directory: Path) -> list:
+    """Участники с готовым PDF-вложением заданного размера"""
+    pdf_path = directory / 'Сертификат_бенчмарк.pdf'
+    pdf_path.write_bytes(b'%PDF-1.4\n' + os.urandom(attachment_kb * 1024))
+
+    participants = []
+    for index in range(size):
+        participant = Participant(index + 1, 'Иван', 'Петров', 'Иван Петров', f"user{index}@example.com",
+                                  'Основы Python', 40, '2025-01-01')
+        participant['certificate_id'] = f"CERT-{index:012X}"
+        participant['verification_url'] = f"{Config.CERTIFICATE_CONFIG['base_url']}/verify/{participant['certificate_id']}"
+        participant['pdf_path'] = pdf_path
+        participants.append(participant)
+    return participants
+
+
+def measure_handshake(samples: int) -> dict:
+    """Время установки соединения: TCP + STARTTLS + AUTH"""
+    latencies = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        server = EmailSender._connect()
+        latencies.append(time.perf_counter() - start)
+        server.quit()
+    p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0]
+    return {
+        'p50_ms': round(statistics.median(latencies) * 1000, 3),
+        'p95_ms': round(p95 * 1000, 3),
+    }
+
+
+def run_send(sink: SMTPSink, participants: list, workers: int) -> dict:
+    """Один прогон рассылки с заданным числом потоков"""
+    RateLimiter.clear_shared()
+    before = dict(sink.stats)
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        successful, failed = EmailSender.send_emails_to_all(participants, workers=workers)
+    elapsed = time.perf_counter() - start
+
+    delta = {key: sink.stats[key] - before[key] for key in sink.stats}
+    return {
+        'workers': workers,
+        'elapsed_s': round(elapsed, 3),
+        'messages_per_s': round(successful / elapsed, 2) if elapsed else None,
+        'successful': successful,
+        'failed': failed,
+        'connections': delta['connections'],
+        'tls_handshakes': delta['tls_handshakes'],
+        'throttled': delta['throttled'],
+        'closed': delta['closed'],
+        'disconnects': delta['disconnects'],
+    }
+
+
+def print_report(results: dict):
+    print("=" * 96)
+    print(f"БЕНЧМАРК РАССЫЛКИ: {results['messages']} писем, вложение {results['attachment_kb']} КБ, "
+          f"задержка {results['sink']['latency']} с, STARTTLS: {results['sink']['tls']}")
+    print(f"Установка соединения (TCP + TLS + AUTH): p50 {results['handshake']['p50_ms']} мс, "
+          f"p95 {results['handshake']['p95_ms']} мс")
+    print("=" * 96)
+    print(f"{'потоков':>8}{'писем/с':>10}{'время, с':>10}{'успешно':>9}{'ошибок':>8}"
+          f"{'соедин.':>9}{'451':>6}{'421':>6}{'обрывов':>9}")
+    for run in results['runs']:
+        print(f"{run['workers']:>8}{run['messages_per_s']:>10}{run['elapsed_s']:>10}{run['successful']:>9}"
+              f"{run['failed']:>8}{run['connections']:>9}{run['throttled']:>6}{run['closed']:>6}{run['disconnects']:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк рассылки на локальном SMTP-сервере")
+    parser.add_argument('--messages', type=int, default=200, help="писем в прогоне")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8], help="числа потоков для прогонов")
+    parser.add_argument('--attachment-kb', type=int, default=150, help="размер вложения, КБ")
+    parser.add_argument('--latency', type=float, default=0.01, help="задержка ответа сервера, с")
+    parser.add_argument('--max-rate', type=float, default=0.0, help="лимит сервера, писем/с (ответ 451)")
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help="доля случайных ответов 451")
+    parser.add_argument('--close-rate', type=float, default=0.0, help="доля ответов 421 с закрытием соединения")
+    parser.add_argument('--disconnect-rate', type=float, default=0.0, help="доля обрывов после DATA")
+    parser.add_argument('--no-tls', action='store_true', help="без STARTTLS")
+    parser.add_argument('--rate', type=float, default=1000.0, help="SMTP_RATE_PER_SECOND отправителя")
+    parser.add_argument('--per-message-connection', action='store_true',
+                        help="новое соединение на каждое письмо (для сравнения с переиспользованием)")
+    parser.add_argument('--output', type=Path, help="файл для сохранения результатов (JSON)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+
+    sink = SMTPSink(
+        port=0, tls_context=None if args.no_tls else make_tls_context(), latency=args.latency,
+        max_rate=args.max_rate, throttle_rate=args.throttle_rate, disconnect_rate=args.disconnect_rate, seed=0,
+        close_rate=args.close_rate
+    ).start_in_thread()
+
+    Config.SMTP_SERVER = sink.host
+    Config.SMTP_PORT = sink.port
+    Config.SMTP_SECURITY = 'none' if sink.tls_context is None else 'starttls'
+    Config.SENDER_EMAIL = 'benchmark@example.com'
+    Config.SENDER_PASSWORD = 'benchmark'
+    Config.SMTP_RATE_PER_SECOND = args.rate
+    Config.SMTP_BACKOFF_BASE = 0.05
+    Config.SMTP_BACKOFF_MAX = 1.0
+    if args.per_message_connection:
+        Config.SMTP_MAX_MESSAGES_PER_CONNECTION = 1
+
+    with tempfile.TemporaryDirectory() as directory:
+        participants = make_cohort(args.messages, args.attachment_kb, Path(directory))
+        results = {
+            'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+            'messages': args.messages,
+            'attachment_kb': args.attachment_kb,
+            'per_message_connection': args.per_message_connection,
+            'sink': {
+                'latency': args.latency,
+                'max_rate': args.max_rate,
+                'throttle_rate': args.throttle_rate,
+                'close_rate': args.close_rate,
+                'disconnect_rate': args.disconnect_rate,
+                'tls': sink.tls_context is not None,
+            },
+            'handshake': measure_handshake(20),
+            'runs': [run_send(sink, participants, workers) for workers in args.workers],
+        }
+    sink.stop()
+
+    print_report(results)
+
+    output = args.output
+    if output is None:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        output = RESULTS_DIR / f"email_bench_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding='utf-8')
+    print(f"Результаты сохранены: {output}")
+
+
+if __name__ == "__main__":
+    main()
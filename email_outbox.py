@@ -0,0 +1,123 @@
+import datetime
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class EmailOutbox:
+    """Журнал рассылки во встроенной базе SQLite.
+
+    Для каждого certificate_id хранится статус письма: 'pending', 'sent' или
+    'failed'. Если процесс прервется посреди рассылки, повторный запуск в
+    режиме продолжения (--resume) отправит только письма, которые еще не
+    ушли. Статусы сохраняются пачками по Config.OUTBOX_BATCH_SIZE, поэтому
+    после аварийного завершения повторно могут уйти не больше последней
+    несохраненной пачки писем.
+    """
+
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS outbox (
+            certificate_id TEXT PRIMARY KEY,
+            email TEXT,
+            status TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            last_error TEXT,
+            updated_at TEXT NOT NULL
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_outbox_status ON outbox (status);
+    """
+
+    def __init__(self, path: Path = None, batch_size: int = None):
+        self.path = Path(path) if path is not None else Config.OUTBOX_PATH
+        self.batch_size = batch_size if batch_size is not None else Config.OUTBOX_BATCH_SIZE
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._lock = threading.Lock()
+        self._pending_updates = []
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(self.SCHEMA)
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.datetime.now().isoformat(timespec='seconds')
+
+    def enqueue(self, participants):
+        """Постановка писем в очередь (уже известные ID не меняются)"""
+        now = self._now()
+        rows = [
+            (participant['certificate_id'], participant.get('Email', ''), self.PENDING, now)
+            for participant in participants if 'certificate_id' in participant
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO outbox (certificate_id, email, status, updated_at) VALUES (?, ?, ?, ?)",
+                rows
+            )
+
+    def sent_ids(self) -> set:
+        """ID сертификатов, письма с которыми уже отправлены"""
+        with self._lock:
+            rows = self._conn.execute("SELECT certificate_id FROM outbox WHERE status = ?", (self.SENT,)).fetchall()
+        return {row[0] for row in rows}
+
+    def is_sent(self, certificate_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM outbox WHERE certificate_id = ? AND status = ?", (certificate_id, self.SENT)
+            ).fetchone()
+        return row is not None
+
+    def mark(self, participant, sent: bool, error: str = None):
+        """Запись результата отправки (сохраняется пачками)"""
+        update = (
+            self.SENT if sent else self.FAILED, error, self._now(),
+            participant['certificate_id'], participant.get('Email', '')
+        )
+        with self._lock:
+            self._pending_updates.append(update)
+            if len(self._pending_updates) >= self.batch_size:
+                self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._pending_updates:
+            return
+        updates, self._pending_updates = self._pending_updates, []
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO outbox (status, last_error, updated_at, certificate_id, email, attempts) "
+                "VALUES (?, ?, ?, ?, ?, 1) "
+                "ON CONFLICT (certificate_id) DO UPDATE SET status = excluded.status, "
+                "last_error = excluded.last_error, updated_at = excluded.updated_at, "
+                "attempts = outbox.attempts + 1",
+                updates
+            )
+
+    def flush(self):
+        """Сохранение накопленных статусов одной транзакцией"""
+        with self._lock:
+            self._flush_locked()
+
+    def counts(self) -> dict:
+        """Количество писем по статусам"""
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall()
+        return dict(rows)
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -1,93 +1,127 @@
 import smtplib
 import logging
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-from email.mime.base import MIMEBase
-from email import encoders
-from email.header import Header
-from email.utils import formatdate
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from config import Config
+from participant import Participant
+from rate_limiter import RateLimiter
+from certificate_registry import CertificateRegistry
+from smtp_accounts import SMTPAccount, AccountPool
+from message_builder import CertificateMessageBuilder, StreamingMessage
 
 logger = logging.getLogger(__name__)
 
 class EmailSender:
     """Класс для отправки email с сертификатами"""
     
+    _builders = {}
+    
     @staticmethod
-    def test_smtp_connection() -> bool:
-        """Тестирование подключения к SMTP серверу"""
-        try:
-            logger.info(f"Тестирование подключения к {Config.SMTP_SERVER}:{Config.SMTP_PORT}")
-            
-            if Config.SMTP_PORT == 587:
-                server = smtplib.SMTP(Config.SMTP_SERVER, Config.SMTP_PORT)
-                server.starttls()
-            elif Config.SMTP_PORT == 465:
-                server = smtplib.SMTP_SSL(Config.SMTP_SERVER, Config.SMTP_PORT)
-            else:
-                logger.error(f"Неподдерживаемый порт: {Config.SMTP_PORT}")
-                return False
-            
-            server.login(Config.SENDER_EMAIL, Config.SENDER_PASSWORD)
-            server.quit()
-            
-            logger.info("✓ Подключение успешно!")
-            return True
-            
-        except Exception as e:
-            logger.error(f"✗ Ошибка подключения: {e}")
-            return False
+    def smtp_security(account: SMTPAccount = None) -> str:
+        """Способ защиты соединения: SMTP_SECURITY аккаунта или по номеру порта"""
+        if account is None:
+            account = SMTPAccount.from_config()
+        if account.security:
+            return account.security
+        if account.port == 587:
+            return 'starttls'
+        if account.port == 465:
+            return 'ssl'
+        raise ValueError(f"Неподдерживаемый порт: {account.port}")
     
     @staticmethod
-    def send_email_with_attachment(recipient_email: str, subject: str, body: str, attachment_path: Path) -> bool:
-        """Отправка email с вложением"""
+    def _connect(account: SMTPAccount = None):
+        """Подключение к SMTP серверу и аутентификация (по умолчанию — аккаунт SENDER_EMAIL)"""
+        if account is None:
+            account = SMTPAccount.from_config()
+        security = EmailSender.smtp_security(account)
+        if security == 'ssl':
+            server = smtplib.SMTP_SSL(account.server, account.port, timeout=Config.SMTP_TIMEOUT)
+        elif security in ('starttls', 'none'):
+            server = smtplib.SMTP(account.server, account.port, timeout=Config.SMTP_TIMEOUT)
+            if security == 'starttls':
+                server.starttls()
+        else:
+            raise ValueError(f"Неизвестный способ защиты SMTP: {security}")
+        
         try:
-            message = MIMEMultipart()
-            message["From"] = Config.SENDER_EMAIL
-            message["To"] = recipient_email
-            message["Subject"] = subject
-            message["Date"] = formatdate(localtime=True)
-            message.attach(MIMEText(body, "plain", "utf-8"))
-
-            # Добавляем вложение
-            filename = attachment_path.name
-            
-            with open(attachment_path, "rb") as attachment:
-                # Указываем правильный MIME-тип для PDF
-                part = MIMEBase("application", "pdf")
-                part.set_payload(attachment.read())
-                encoders.encode_base64(part)
+            server.login(account.email, account.password)
+        except Exception:
+            server.close()
+            raise
+        return server
+    
+    @staticmethod
+    def test_smtp_connection() -> bool:
+        """Тестирование подключения к SMTP серверу.
+        
+        Если задан пул аккаунтов, проверяется каждый из них; результат
+        успешен, если работает хотя бы один.
+        """
+        accounts = AccountPool.load_accounts() or [SMTPAccount.from_config()]
+        connected = 0
+        for account in accounts:
+            try:
+                logger.info(f"Тестирование подключения к {account.server}:{account.port} ({account.email})")
                 
-                # Кодируем имя файла для поддержки русских символов
-                encoded_filename = Header(filename, 'utf-8').encode()
+                server = EmailSender._connect(account)
+                server.quit()
                 
-                # Устанавливаем заголовки
-                part.add_header(
-                    "Content-Disposition",
-                    "attachment",
-                    filename=encoded_filename
-                )
-                part.add_header(
-                    "Content-Type",
-                    "application/pdf",
-                    name=encoded_filename
-                )
-                message.attach(part)
-
-            # Настройка SMTP и отправка
-            if Config.SMTP_PORT == 587:
-                server = smtplib.SMTP(Config.SMTP_SERVER, Config.SMTP_PORT)
-                server.starttls()
-            elif Config.SMTP_PORT == 465:
-                server = smtplib.SMTP_SSL(Config.SMTP_SERVER, Config.SMTP_PORT)
+                logger.info("✓ Подключение успешно!")
+                connected += 1
+                
+            except Exception as e:
+                logger.error(f"✗ Ошибка подключения: {e}")
+        
+        if len(accounts) > 1:
+            logger.info(f"Доступно аккаунтов: {connected} из {len(accounts)}")
+        return connected > 0
+    
+    @staticmethod
+    def message_builder(sender: str = None) -> CertificateMessageBuilder:
+        """Сборщик писем для отправителя (создается один раз на отправителя)"""
+        if sender is None:
+            sender = Config.SENDER_EMAIL
+        builder = EmailSender._builders.get(sender)
+        if builder is None:
+            builder = EmailSender._builders[sender] = CertificateMessageBuilder(sender)
+        return builder
+    
+    @staticmethod
+    def open_session():
+        """Новая сессия отправки: по пулу аккаунтов, если он задан, иначе через SENDER_EMAIL"""
+        accounts = AccountPool.from_config()
+        return ShardedSession(accounts) if accounts is not None else SMTPSession()
+    
+    @staticmethod
+    def send_email_with_attachment(recipient_email: str, subject: str, body: str, attachment_path: Path,
+                                   session: 'SMTPSession' = None) -> bool:
+        """Отправка email с вложением.
+        
+        Если передана сессия, письмо отправляется через ее соединение,
+        иначе открывается отдельное соединение только для этого письма.
+        """
+        return EmailSender.send_email_with_attachments(
+            recipient_email, subject, body, [attachment_path], session=session
+        )
+    
+    @staticmethod
+    def send_email_with_attachments(recipient_email: str, subject: str, body: str, attachment_paths: list,
+                                    session: 'SMTPSession' = None) -> bool:
+        """Отправка email с несколькими вложениями"""
+        def build(sender):
+            return EmailSender.message_builder(sender).build_many(recipient_email, subject, body, attachment_paths)
+        
+        try:
+            if session is not None:
+                session.deliver(recipient_email, build)
             else:
-                logger.error(f"Неподдерживаемый порт: {Config.SMTP_PORT}")
-                return False
-
-            server.login(Config.SENDER_EMAIL, Config.SENDER_PASSWORD)
-            server.send_message(message)
-            server.quit()
+                with EmailSender.open_session() as single_session:
+                    single_session.deliver(recipient_email, build)
             
             logger.info(f"Email успешно отправлен на {recipient_email}")
             return True
@@ -100,7 +134,7 @@ class EmailSender:
             return False
     
     @staticmethod
-    def send_certificate_email(participant: dict) -> bool:
+    def send_certificate_email(participant: Participant, session: 'SMTPSession' = None) -> bool:
         """Отправка email с сертификатом для конкретного участника"""
         if 'pdf_path' not in participant:
             logger.error(f"У участника {participant['full_name']} нет сертификата для отправки")
@@ -125,30 +159,496 @@ ID вашего сертификата: {participant.get('certificate_id', 'N/A'
             participant['Email'], 
             subject, 
             body, 
-            participant['pdf_path']
+            participant['pdf_path'],
+            session=session
         )
     
     @staticmethod
-    def send_emails_to_all(participants: list) -> tuple:
-        """Отправка email всем участникам с сертификатами"""
+    def group_by_recipient(participants: list) -> list:
+        """Группы участников с одним email (без учета регистра и пробелов) в порядке появления.
+        
+        Участники без email не объединяются: каждый остается отдельной группой.
+        """
+        groups = {}
+        for index, participant in enumerate(participants):
+            email = CertificateRegistry.normalize_email(participant.get('Email'))
+            key = email if email else ('', index)
+            groups.setdefault(key, []).append(participant)
+        return list(groups.values())
+    
+    @staticmethod
+    def send_group_email(group: list, session: 'SMTPSession' = None, as_zip: bool = None) -> bool:
+        """Одно письмо со всеми сертификатами получателя.
+        
+        Сертификаты прикладываются отдельными PDF или, если as_zip
+        (по умолчанию Config.EMAIL_GROUP_ZIP), одним ZIP-архивом.
+        """
+        if len(group) == 1:
+            return EmailSender.send_certificate_email(group[0], session=session)
+        if as_zip is None:
+            as_zip = Config.EMAIL_GROUP_ZIP
+        
+        first = group[0]
+        recipient_email = CertificateRegistry.normalize_email(first['Email'])
+        subject = f"Ваши сертификаты ({len(group)})"
+        courses = "\n".join(
+            f"• «{participant['course_name']}» — ID {participant.get('certificate_id', 'N/A')}\n"
+            f"  {participant.get('verification_url', '')}"
+            for participant in group
+        )
+        body = f"""Уважаемый(ая) {first['full_name']}!
+
+Поздравляем с успешным завершением курсов:
+
+{courses}
+
+Ваши сертификаты прикреплены к этому письму.
+Для проверки подлинности сертификата отсканируйте QR-код или перейдите по ссылке рядом с курсом.
+
+С наилучшими пожеланиями,
+{Config.CERTIFICATE_CONFIG['organization']}
+"""
+        
+        paths = [Path(participant['pdf_path']) for participant in group]
+        if not as_zip:
+            return EmailSender.send_email_with_attachments(recipient_email, subject, body, paths, session=session)
+        
+        with tempfile.TemporaryDirectory(prefix='certificates_') as directory:
+            archive_path = Path(directory) / 'Сертификаты.zip'
+            try:
+                # PDF уже сжаты, поэтому файлы добавляются в архив без сжатия
+                with zipfile.ZipFile(archive_path, 'w', compression=zipfile.ZIP_STORED) as archive:
+                    for path in paths:
+                        archive.write(path, arcname=path.name)
+            except OSError as e:
+                logger.error(f"Не удалось собрать архив сертификатов для {recipient_email}: {e}")
+                return False
+            return EmailSender.send_email_with_attachments(
+                recipient_email, subject, body, [archive_path], session=session
+            )
+    
+    @staticmethod
+    def send_emails_to_all(participants: list, workers: int = None, outbox=None, resume: bool = False,
+                           group: bool = None) -> tuple:
+        """Отправка email всем участникам с сертификатами.
+        
+        Письма отправляются параллельно в workers потоков (по умолчанию
+        Config.SMTP_WORKERS); у каждого потока свое SMTP-соединение, которое
+        используется для многих писем (см. SMTPSession).
+        
+        Если передан журнал рассылки (EmailOutbox), результат каждого письма
+        сохраняется в нем; resume=True пропускает участников, которым письмо
+        уже было отправлено (они считаются успешными).
+        
+        group=True (по умолчанию Config.EMAIL_GROUP_BY_RECIPIENT) объединяет
+        сертификаты одного получателя в одно письмо (см. send_group_email).
+        Счетчики и журнал рассылки по-прежнему ведутся по сертификатам.
+        """
+        if workers is None:
+            workers = Config.SMTP_WORKERS
+        if group is None:
+            group = Config.EMAIL_GROUP_BY_RECIPIENT
+        
         successful = 0
         failed = 0
         
-        print(f"\nОтправка email для {len(participants)} участников...")
+        print(f"\nОтправка email для {len(participants)} участников (потоков: {workers})...")
         print("-" * 60)
         
+        ready = []
         for participant in participants:
             if 'certificate_id' in participant and 'pdf_path' in participant:
-                print(f"\nОтправка email для: {participant['full_name']}")
-                
-                if EmailSender.send_certificate_email(participant):
-                    print(f"✓ Email отправлен")
-                    successful += 1
-                else:
-                    print(f"✗ Ошибка отправки email")
-                    failed += 1
+                ready.append(participant)
             else:
                 print(f"⚠️  У участника {participant['full_name']} нет сертификата")
                 failed += 1
         
-        return successful, failed
\ No newline at end of file
+        if outbox is not None:
+            outbox.enqueue(ready)
+            if resume:
+                sent_ids = outbox.sent_ids()
+                remaining = [participant for participant in ready if participant['certificate_id'] not in sent_ids]
+                successful += len(ready) - len(remaining)
+                print(f"Режим продолжения: уже отправлено ранее {len(ready) - len(remaining)}, "
+                      f"осталось {len(remaining)}")
+                ready = remaining
+        
+        if group:
+            batches = EmailSender.group_by_recipient(ready)
+            print(f"Группировка по получателям: {len(ready)} сертификатов в {len(batches)} письмах")
+        else:
+            batches = [[participant] for participant in ready]
+        
+        with SMTPSessionPool() as sessions:
+            if sessions.accounts is not None:
+                print(f"Пул аккаунтов: {len(sessions.accounts)}")
+            
+            def send(batch):
+                return EmailSender.send_group_email(batch, session=sessions.get())
+            
+            with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='smtp') as executor:
+                futures = {executor.submit(send, batch): batch for batch in batches}
+                for future in as_completed(futures):
+                    batch = futures[future]
+                    error = None
+                    try:
+                        sent = future.result()
+                    except Exception as e:
+                        # Сбой одного письма не прерывает рассылку остальным
+                        logger.error(f"Ошибка отправки email на {batch[0].get('Email')}: {e}")
+                        sent, error = False, str(e)
+                    if outbox is not None:
+                        for participant in batch:
+                            outbox.mark(participant, sent, error)
+                    suffix = f" (сертификатов: {len(batch)})" if len(batch) > 1 else ""
+                    if sent:
+                        print(f"✓ Email отправлен: {batch[0]['full_name']}{suffix}")
+                        successful += len(batch)
+                    else:
+                        print(f"✗ Ошибка отправки email: {batch[0]['full_name']}{suffix}")
+                        failed += len(batch)
+            
+            if sessions.accounts is not None:
+                for key, sent in sessions.accounts.sent.items():
+                    print(f"  {key}: писем {sent}")
+        
+        if outbox is not None:
+            outbox.flush()
+        
+        return successful, failed
+
+
+class SMTPConnectionFailed(smtplib.SMTPException):
+    """Не удалось установить соединение с сервером аккаунта.
+    
+    Оборачивает любую ошибку подключения, TLS или приветствия (кроме
+    ошибки аутентификации); исходная ошибка доступна в error.
+    """
+    
+    def __init__(self, account: SMTPAccount, error: Exception):
+        super().__init__(f"Не удалось подключиться к {account.server}:{account.port} ({account.email}): {error}")
+        self.account = account
+        self.error = error
+
+
+class SMTPSession:
+    """Аутентифицированное SMTP-соединение, используемое для многих писем.
+    
+    Подключение, TLS и AUTH выполняются при первой отправке, а не для каждого
+    письма. Разорванное соединение обнаруживается при отправке: сессия
+    переподключается и повторяет письмо. После
+    Config.SMTP_MAX_MESSAGES_PER_CONNECTION писем соединение пересоздается,
+    так как многие серверы ограничивают число писем за сессию.
+    
+    Скорость отправки ограничивается общим лимитером аккаунта. Временные
+    ошибки (коды 4xx, разрыв соединения) повторяются до
+    Config.SMTP_RETRY_ATTEMPTS раз с экспоненциальной задержкой; ответы
+    о превышении лимита (421/450/451/452) дополнительно снижают скорость.
+    
+    По умолчанию письма отправляются от аккаунта SENDER_EMAIL; другой
+    аккаунт пула передается в account.
+    """
+    
+    # Коды, которыми провайдеры сообщают об ограничении отправки
+    THROTTLE_CODES = {421, 450, 451, 452}
+    
+    def __init__(self, max_messages: int = None, limiter: RateLimiter = None, account: SMTPAccount = None):
+        self.max_messages = max_messages if max_messages is not None else Config.SMTP_MAX_MESSAGES_PER_CONNECTION
+        self.account = account if account is not None else SMTPAccount.from_config()
+        if limiter is None:
+            limiter = RateLimiter.shared(self.account.key, self.account.rate_per_second, self.account.rate_per_hour)
+        self.limiter = limiter
+        self._server = None
+        self.messages_on_connection = 0
+        self.connections = 0
+        self.reconnects = 0
+        self.retries = 0
+    
+    @staticmethod
+    def smtp_code(error: Exception):
+        """Код ответа SMTP из исключения (None, если его нет)"""
+        if isinstance(error, smtplib.SMTPRecipientsRefused):
+            codes = [code for code, _ in error.recipients.values()]
+            return max(codes) if codes else None
+        if isinstance(error, smtplib.SMTPResponseException):
+            return error.smtp_code
+        return None
+    
+    @classmethod
+    def is_transient(cls, error: Exception) -> bool:
+        """Временная ошибка, после которой письмо стоит отправить повторно"""
+        if isinstance(error, SMTPConnectionFailed):
+            return cls.is_transient(error.error)
+        if cls._is_connection_lost(error):
+            return True
+        code = cls.smtp_code(error)
+        return code is not None and 400 <= code < 500
+    
+    @staticmethod
+    def _is_connection_lost(error: Exception) -> bool:
+        """Ошибка означает потерю соединения (а не отказ в приеме письма)"""
+        if isinstance(error, smtplib.SMTPServerDisconnected):
+            return True
+        if isinstance(error, smtplib.SMTPResponseException):
+            # 421 — сервер закрывает соединение
+            return error.smtp_code == 421
+        return isinstance(error, (ConnectionError, TimeoutError))
+    
+    def _ensure_connected(self):
+        if self._server is not None and self.messages_on_connection >= self.max_messages:
+            logger.debug(f"Пересоздание SMTP-соединения после {self.messages_on_connection} писем")
+            self.close()
+        
+        if self._server is None:
+            try:
+                self._server = EmailSender._connect(self.account)
+            except smtplib.SMTPAuthenticationError:
+                raise
+            except Exception as e:
+                raise SMTPConnectionFailed(self.account, e) from e
+            self.messages_on_connection = 0
+            self.connections += 1
+    
+    def _drop(self):
+        """Закрытие соединения без QUIT (соединение уже неработоспособно)"""
+        if self._server is not None:
+            try:
+                self._server.close()
+            except Exception:
+                pass
+            self._server = None
+    
+    def _send_streaming(self, message: StreamingMessage):
+        """Отправка письма потоком: вложение кодируется частями прямо в сокет.
+        
+        Повторяет последовательность smtplib.SMTP.sendmail (MAIL, RCPT, DATA),
+        но передает тело письма частями, не собирая его в памяти.
+        """
+        server = self._server
+        server.ehlo_or_helo_if_needed()
+        
+        code, response = server.mail(message.from_addr)
+        if code != 250:
+            self._reset_after_error(code)
+            raise smtplib.SMTPSenderRefused(code, response, message.from_addr)
+        
+        refused = {}
+        for recipient in message.to_addrs:
+            code, response = server.rcpt(recipient)
+            if code not in (250, 251):
+                refused[recipient] = (code, response)
+            if code == 421:
+                self._reset_after_error(code)
+                raise smtplib.SMTPRecipientsRefused(refused)
+        if len(refused) == len(message.to_addrs):
+            self._reset_after_error(None)
+            raise smtplib.SMTPRecipientsRefused(refused)
+        
+        server.putcmd("data")
+        code, response = server.getreply()
+        if code != 354:
+            self._reset_after_error(code)
+            raise smtplib.SMTPDataError(code, response)
+        
+        for chunk in message.iter_chunks():
+            server.send(chunk)
+        server.send(b".\r\n")
+        
+        code, response = server.getreply()
+        if code != 250:
+            self._reset_after_error(code)
+            raise smtplib.SMTPDataError(code, response)
+    
+    def _reset_after_error(self, code):
+        """Сброс транзакции после отказа (421 — сервер закрывает соединение)"""
+        if code == 421:
+            self._drop()
+            return
+        try:
+            self._server.rset()
+        except smtplib.SMTPServerDisconnected:
+            self._drop()
+    
+    def deliver(self, recipient: str, build):
+        """Сборка письма от имени аккаунта сессии (build(sender)) и его отправка"""
+        self.send(build(self.account.email))
+    
+    def send(self, message, attempts: int = None):
+        """Отправка письма через текущее соединение с повтором временных ошибок"""
+        if attempts is None:
+            attempts = Config.SMTP_RETRY_ATTEMPTS
+        attempts = max(1, attempts)
+        for attempt in range(1, attempts + 1):
+            self.limiter.acquire()
+            try:
+                self._ensure_connected()
+                if isinstance(message, StreamingMessage):
+                    self._send_streaming(message)
+                else:
+                    self._server.send_message(message)
+                self.messages_on_connection += 1
+                self.limiter.succeeded()
+                return
+            except Exception as e:
+                connection_lost = self._is_connection_lost(e)
+                if connection_lost or not isinstance(e, smtplib.SMTPException):
+                    self._drop()
+                # Отказ в приеме письма (5xx) не повторяется: соединение остается рабочим
+                if attempt == attempts or not self.is_transient(e):
+                    raise
+                
+                throttled = self.smtp_code(e) in self.THROTTLE_CODES
+                if throttled:
+                    self.limiter.throttled()
+                
+                if connection_lost:
+                    self.reconnects += 1
+                self.retries += 1
+                # Первый повтор после обычного разрыва соединения — сразу
+                delay = 0 if connection_lost and not throttled and attempt == 1 else RateLimiter.backoff_delay(attempt)
+                logger.warning(f"Временная ошибка SMTP ({e}), повтор {attempt}/{attempts - 1} через {delay:.1f} с")
+                time.sleep(delay)
+    
+    def close(self):
+        """Корректное завершение сессии"""
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except Exception:
+                pass
+            finally:
+                self._drop()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ShardedSession:
+    """Отправка через пул аккаунтов с переключением при сбоях.
+    
+    Получатель закрепляется за аккаунтом согласованным хешированием
+    (AccountPool). Если к серверу аккаунта не удается подключиться (сеть,
+    DNS, TLS, приветствие), провайдер ограничивает отправку или соединение
+    обрывается, аккаунт приостанавливается и письмо уходит через следующий
+    аккаунт кольца; при ошибке учетных данных или постоянном отказе
+    отправителю аккаунт исключается из рассылки. Отказ в приеме самому
+    получателю (в том числе временный 450/452) на другие аккаунты не
+    переносится и аккаунт не приостанавливает.
+    
+    Для каждого аккаунта используется своя SMTPSession (соединение
+    создается при первом письме через этот аккаунт).
+    """
+    
+    # Попыток на аккаунт, пока есть резервные аккаунты
+    FAILOVER_ATTEMPTS = 2
+    
+    def __init__(self, accounts: AccountPool, max_messages: int = None):
+        self.accounts = accounts
+        self.max_messages = max_messages
+        self._sessions = {}
+    
+    def _session(self, account: SMTPAccount) -> SMTPSession:
+        session = self._sessions.get(account.key)
+        if session is None:
+            session = self._sessions[account.key] = SMTPSession(self.max_messages, account=account)
+        return session
+    
+    # Временные отказы на RCPT, относящиеся к самому получателю
+    RECIPIENT_CODES = {450, 452}
+    
+    @staticmethod
+    def _is_account_error(error: Exception) -> bool:
+        """Ошибка относится к аккаунту, а не к письму: учетные данные или постоянный отказ отправителю"""
+        if isinstance(error, smtplib.SMTPSenderRefused):
+            return error.smtp_code >= 500
+        return isinstance(error, smtplib.SMTPAuthenticationError)
+    
+    @classmethod
+    def _is_account_unavailable(cls, error: Exception) -> bool:
+        """Аккаунт временно непригоден: нет соединения, обрыв или ограничение отправки"""
+        if isinstance(error, SMTPConnectionFailed) or SMTPSession._is_connection_lost(error):
+            return True
+        code = SMTPSession.smtp_code(error)
+        if isinstance(error, smtplib.SMTPRecipientsRefused) and code in cls.RECIPIENT_CODES:
+            return False
+        return code in SMTPSession.THROTTLE_CODES or isinstance(error, smtplib.SMTPSenderRefused)
+    
+    def deliver(self, recipient: str, build):
+        """Отправка письма через закрепленный за получателем аккаунт или резервные"""
+        candidates = self.accounts.candidates(recipient)
+        if not candidates:
+            raise RuntimeError("Нет доступных аккаунтов для отправки")
+        
+        for index, account in enumerate(candidates):
+            last = index == len(candidates) - 1
+            session = self._session(account)
+            try:
+                session.send(build(account.email), attempts=None if last else self.FAILOVER_ATTEMPTS)
+                self.accounts.succeeded(account)
+                return
+            except Exception as e:
+                if self._is_account_error(e):
+                    self.accounts.disable(account)
+                elif self._is_account_unavailable(e):
+                    self.accounts.suspend(account)
+                else:
+                    raise
+                if last:
+                    raise
+                logger.warning(f"Аккаунт {account.key} недоступен ({e}), переключение на резервный")
+    
+    def close(self):
+        sessions, self._sessions = self._sessions, {}
+        for session in sessions.values():
+            session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class SMTPSessionPool:
+    """Набор SMTP-сессий: у каждого потока отправки своя сессия.
+    
+    Если задан пул аккаунтов (по умолчанию AccountPool.from_config()),
+    потоки получают ShardedSession с общим для всех потоков состоянием
+    аккаунтов.
+    """
+    
+    def __init__(self, max_messages: int = None, accounts: AccountPool = None):
+        self.max_messages = max_messages
+        self.accounts = accounts if accounts is not None else AccountPool.from_config()
+        self._local = threading.local()
+        self._sessions = []
+        self._lock = threading.Lock()
+    
+    def get(self):
+        """Сессия текущего потока (создается при первом обращении)"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            if self.accounts is not None:
+                session = ShardedSession(self.accounts, self.max_messages)
+            else:
+                session = SMTPSession(self.max_messages)
+            self._local.session = session
+            with self._lock:
+                self._sessions.append(session)
+        return session
+    
+    def close(self):
+        """Закрытие всех сессий"""
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
\ No newline at end of file
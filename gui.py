@@ -3,6 +3,7 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from participants_handler import ParticipantsHandler
 from certificate_generator import CertificateGenerator
+from certificate_registry import CertificateRegistry
 from email_sender import EmailSender
 from report_generator import ReportGenerator
 from config import Config
@@ -123,12 +124,17 @@ class App:
         self.root.after(0, _append)
 
     def load_csv(self):
-        csv_path = filedialog.askopenfilename(title="Выберите CSV-файл", filetypes=[("CSV files", "*.csv"), ("All files", "*")])
+        csv_path = filedialog.askopenfilename(title="Выберите файл участников", filetypes=[
+            ("CSV files", "*.csv"),
+            ("Parquet files", "*.parquet *.pq"),
+            ("JSON Lines files", "*.jsonl *.ndjson"),
+            ("All files", "*")
+        ])
         if not csv_path:
             return
         try:
             self.append_log(f"Загрузка участников из {csv_path}...")
-            participants = ParticipantsHandler.import_from_csv(csv_path)
+            participants = ParticipantsHandler.load_file(csv_path)
             self.participants = participants
             self.populate_tree()
             self.append_log(f"Загружено {len(participants)} участников")
@@ -168,18 +174,21 @@ class App:
                 self.progress['maximum'] = total
                 self.progress['value'] = 0
 
-                for idx, p in enumerate(self.participants, start=1):
-                    self.append_log(f"Генерация: {p.get('full_name')}")
-                    result = generator.create_certificate(p)
-                    if result.get('status') == 'success':
-                        p.update(result.get('participant', {}))
-                        self.append_log(f"✓ Создан: {p.get('pdf_path').name}")
-                    else:
-                        self.append_log(f"✗ Ошибка: {result.get('error')}")
-
-                    # Обновляем строку в TreeView
-                    self.root.after(0, self.populate_tree)
-                    self.progress['value'] = idx
+                with CertificateRegistry() as registry:
+                    results = generator.create_certificates(
+                        self.participants, workers=Config.RENDER_WORKERS, registry=registry
+                    )
+                    for idx, result in enumerate(results, start=1):
+                        p = result['participant']
+                        self.append_log(f"Генерация: {p.get('full_name')}")
+                        if result.get('status') == 'success':
+                            self.append_log(f"✓ Создан: {p.get('pdf_path').name}")
+                        else:
+                            self.append_log(f"✗ Ошибка: {result.get('error')}")
+
+                        # Обновляем строку в TreeView
+                        self.root.after(0, self.populate_tree)
+                        self.progress['value'] = idx
 
                 self.append_log("Генерация завершена")
                 messagebox.showinfo("Готово", "Генерация сертификатов завершена")
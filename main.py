@@ -12,6 +12,10 @@ from participants_handler import ParticipantsHandler
 from certificate_generator import CertificateGenerator
 from email_sender import EmailSender
 from report_generator import ReportGenerator
+from build_manifest import BuildManifest
+from certificate_registry import CertificateRegistry
+from email_outbox import EmailOutbox
+from pipeline import CertificatePipeline
 
 # Настройка логирования
 logging.basicConfig(
@@ -20,8 +24,31 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def main():
-    """Основная функция программы - управляет всем процессом"""
+def print_dedup_report(report: dict):
+    """Вывод найденных дубликатов и коллизий ID сертификатов"""
+    duplicates = report.get('duplicates', [])
+    collisions = report.get('collisions', [])
+    if not duplicates and not collisions:
+        return
+    
+    print(f"\n⚠️  Дубликаты: {len(duplicates)}, коллизии ID сертификатов: {len(collisions)} "
+          f"(режим DEDUP_MODE={Config.DEDUP_MODE})")
+    for item in duplicates[:10]:
+        print(f"  Дубликат: строка {item['ID']} повторяет строку {item['first_ID']} ({item['full_name']}, {item['Email']})")
+    for item in collisions[:10]:
+        print(f"  Коллизия: {item['certificate_id']} у строки {item['ID']} ({item['full_name']}, {item['Email']})")
+    if len(duplicates) > 10 or len(collisions) > 10:
+        print("  ...")
+
+def main(force: bool = False, use_pipeline: bool = False, resume: bool = False):
+    """Основная функция программы - управляет всем процессом.
+    
+    force=True (флаг --force) пересобирает все сертификаты, игнорируя манифест.
+    use_pipeline=True (флаг --pipeline) выполняет генерацию, рассылку и отчет
+    одновременно в режиме конвейера.
+    resume=True (флаг --resume) продолжает прерванную рассылку: письма,
+    отмеченные в журнале рассылки как отправленные, повторно не отправляются.
+    """
     print("=" * 60)
     print("ГЕНЕРАЦИЯ СЕРТИФИКАТОВ С QR-КОДАМИ И РАССЫЛКА")
     print("=" * 60)
@@ -73,52 +100,120 @@ def main():
         else:
             # По умолчанию используем CSV
             csv_path = r"C:\Users\dyrdu\AppData\Local\Programs\Python\Python313\УИРС\art_uirs\participants.csv"
-            participants = ParticipantsHandler.import_from_csv(csv_path)
-        
-        if not participants:
-            print("❌ Нет данных для обработки. Завершение программы.")
-            return
+            if use_pipeline:
+                # В режиме конвейера CSV читается по частям, без загрузки в память целиком
+                participants = ParticipantsHandler.iter_participants(csv_path)
+            else:
+                participants = ParticipantsHandler.import_from_csv(csv_path)
         
-        print(f"✓ Загружено {len(participants)} участников")
+        if isinstance(participants, list):
+            if not participants:
+                print("❌ Нет данных для обработки. Завершение программы.")
+                return
+            
+            print(f"✓ Загружено {len(participants)} участников")
+        else:
+            print("✓ Участники будут читаться из CSV потоково")
         
         # Шаг 4: Генерация сертификатов
         print("\n[4] ГЕНЕРАЦИЯ СЕРТИФИКАТОВ")
         print("-" * 40)
         
-        # Удаляем старый шаблон если есть
-        template_path = Config.TEMPLATES_DIR / 'certificate_template.html'
-        if template_path.exists():
-            print("⚠️  Удаляю старый шаблон для создания нового с QR-кодом...")
-            try:
-                template_path.unlink()
-            except:
-                pass
-        
         generator = CertificateGenerator()
         
+        # Манифест позволяет перерисовать только новые и изменившиеся сертификаты
+        manifest = BuildManifest()
+        if force:
+            print("⚠️  Режим --force: все сертификаты будут пересобраны")
+        
+        # Дубликаты и коллизии ID ищутся за один проход до рендеринга
+        dedup_report = {}
+        if isinstance(participants, list):
+            participants, dedup_report = ParticipantsHandler.deduplicate(participants, generator.identify_participant)
+            print_dedup_report(dedup_report)
+        else:
+            participants = ParticipantsHandler.iter_deduplicated(
+                participants, generator.identify_participant, report=dedup_report
+            )
+        
+        # Реестр накапливает все выданные сертификаты для проверки по ID
+        registry = CertificateRegistry()
+        
+        if use_pipeline:
+            # Шаги 4–6 выполняются одновременно: генерация → рассылка → отчет
+            print("Режим конвейера: рассылка и отчет выполняются по мере генерации")
+            if not smtp_connected:
+                print("⚠️  Пропуск отправки email (SMTP не подключен)")
+            
+            if resume:
+                print("Режим --resume: уже отправленные письма будут пропущены")
+            
+            outbox = EmailOutbox()
+            pipeline = CertificatePipeline(generator, send_emails=smtp_connected, outbox=outbox, resume=resume)
+            try:
+                stats = pipeline.run(participants, workers=Config.RENDER_WORKERS, manifest=manifest,
+                                     force=force, registry=registry)
+            finally:
+                registry.close()
+                outbox.close()
+            print_dedup_report(dedup_report)
+            
+            print("\n" + "=" * 60)
+            print("ИТОГОВАЯ СТАТИСТИКА")
+            print("=" * 60)
+            print(f"  Сертификатов создано: {stats['rendered']}")
+            print(f"  Без изменений (не перерисованы): {stats['skipped']}")
+            print(f"  Ошибок генерации: {stats['render_failed']}")
+            if smtp_connected:
+                print(f"  Email отправлено: {stats['email_sent']}")
+                if resume:
+                    print(f"  Email отправлено ранее: {stats['email_already_sent']}")
+                print(f"  Ошибок отправки: {stats['email_failed']}")
+            print(f"  Отчет: {Path(pipeline.report_path).absolute()}")
+            print(f"  Реестр сертификатов: {Config.REGISTRY_PATH.absolute()}")
+            print("=" * 60)
+            print("\n✅ Программа успешно завершена!")
+            return
+        
         # Генерация сертификатов для всех участников
         successful = 0
         failed = 0
+        skipped = 0
         
-        print(f"\nГенерация сертификатов для {len(participants)} участников...")
+        print(f"\nГенерация сертификатов для {len(participants)} участников "
+              f"(процессов: {Config.RENDER_WORKERS})...")
         print("-" * 60)
         
-        for participant in participants:
-            print(f"\nУчастник: {participant['full_name']}")
-            print(f"Email: {participant['Email']}")
-            print(f"Курс: {participant['course_name']}")
-            
-            result = generator.create_certificate(participant)
-            
-            if result['status'] == 'success':
-                pdf_path = result['pdf_path']
-                print(f"✓ Сертификат создан: {pdf_path.name}")
-                print(f"  ID сертификата: {participant.get('certificate_id', 'N/A')}")
-                print(f"  QR-код сгенерирован и добавлен в сертификат")
-                successful += 1
-            else:
-                print(f"✗ Ошибка создания сертификата: {result.get('error', 'Неизвестная ошибка')}")
-                failed += 1
+        try:
+            results = generator.create_certificates(
+                participants,
+                workers=Config.RENDER_WORKERS,
+                manifest=manifest,
+                force=force,
+                registry=registry
+            )
+            for result in results:
+                participant = result['participant']
+                if result.get('skipped'):
+                    skipped += 1
+                    successful += 1
+                    continue
+                
+                print(f"\nУчастник: {participant['full_name']}")
+                print(f"Email: {participant['Email']}")
+                print(f"Курс: {participant['course_name']}")
+                
+                if result['status'] == 'success':
+                    pdf_path = result['pdf_path']
+                    print(f"✓ Сертификат создан: {pdf_path.name}")
+                    print(f"  ID сертификата: {participant.get('certificate_id', 'N/A')}")
+                    print(f"  QR-код сгенерирован и добавлен в сертификат")
+                    successful += 1
+                else:
+                    print(f"✗ Ошибка создания сертификата: {result.get('error', 'Неизвестная ошибка')}")
+                    failed += 1
+        finally:
+            registry.close()
         
         # Шаг 5: Рассылка email
         print("\n[5] РАССЫЛКА EMAIL")
@@ -128,7 +223,11 @@ def main():
         email_failed = 0
         
         if smtp_connected:
-            email_successful, email_failed = EmailSender.send_emails_to_all(participants)
+            # Журнал рассылки позволяет продолжить после сбоя без повторной отправки
+            with EmailOutbox() as outbox:
+                email_successful, email_failed = EmailSender.send_emails_to_all(
+                    participants, outbox=outbox, resume=resume
+                )
         else:
             print("⚠️  Пропуск отправки email (SMTP не подключен)")
         
@@ -145,6 +244,7 @@ def main():
         print(f"ОБРАБОТКА УЧАСТНИКОВ:")
         print(f"  Успешно: {successful}")
         print(f"  Не удалось: {failed}")
+        print(f"  Без изменений (не перерисованы): {skipped}")
         print(f"  Всего: {len(participants)}")
         
         if smtp_connected:
@@ -160,6 +260,7 @@ def main():
         print(f"  Сертификаты: {Config.PDF_OUTPUT_DIR.absolute()}")
         print(f"  QR-коды: {Config.QR_OUTPUT_DIR.absolute()}")
         print(f"  Шаблоны: {Config.TEMPLATES_DIR.absolute()}")
+        print(f"  Реестр сертификатов: {Config.REGISTRY_PATH.absolute()}")
         print("=" * 60)
         
         print("\n✅ Программа успешно завершена!")
@@ -179,6 +280,8 @@ if __name__ == "__main__":
             start_gui()
         except Exception as e:
             print(f"Ошибка запуска GUI: {e}")
-            main()
+            main(force="--force" in sys.argv, use_pipeline="--pipeline" in sys.argv,
+                 resume="--resume" in sys.argv)
     else:
-        main() 
\ No newline at end of file
+        main(force="--force" in sys.argv, use_pipeline="--pipeline" in sys.argv,
+             resume="--resume" in sys.argv) 
\ No newline at end of file
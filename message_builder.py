@@ -0,0 +1,125 @@
+import base64
+import mimetypes
+import mmap
+import os
+import re
+import secrets
+from email.header import Header
+from email.utils import formatdate
+from functools import lru_cache
+from pathlib import Path
+from config import Config
+
+# Строки, начинающиеся с точки, удваиваются при передаче в SMTP DATA (RFC 5321)
+DOT_LINE_RE = re.compile(rb'^\.', re.MULTILINE)
+
+
+@lru_cache(maxsize=1024)
+def encode_header(value: str) -> str:
+    """Кодирование значения заголовка в UTF-8 (повторяющиеся темы и имена кодируются один раз)"""
+    return Header(value, 'utf-8').encode(linesep='\r\n')
+
+
+@lru_cache(maxsize=1024)
+def encode_filename(filename: str) -> str:
+    """Кодирование имени файла вложения без переноса строк"""
+    return Header(filename, 'utf-8').encode(maxlinelen=0)
+
+
+class StreamingMessage:
+    """Письмо с вложениями, которое отдается в SMTP по частям.
+
+    Вложения не читаются в память целиком: каждый файл отображается через
+    mmap и кодируется в base64 частями по LINE_BYTES * CHUNK_LINES байт.
+    attachments — список пар (заголовки MIME-части, путь к файлу).
+    """
+
+    # 57 исходных байт дают строку base64 из 76 символов
+    LINE_BYTES = 57
+    CHUNK_LINES = 1024
+
+    def __init__(self, from_addr: str, to_addr: str, head: bytes, attachments: list, tail: bytes):
+        self.from_addr = from_addr
+        self.to_addrs = [to_addr]
+        self.head = head
+        self.attachments = [(part_head, Path(path)) for part_head, path in attachments]
+        self.tail = tail
+
+    def iter_attachment(self, path: Path):
+        """Вложение в base64 (строки по 76 символов, CRLF) частями"""
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if not size:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                step = self.LINE_BYTES * self.CHUNK_LINES
+                for offset in range(0, size, step):
+                    yield base64.encodebytes(mapped[offset:offset + step]).replace(b'\n', b'\r\n')
+
+    def iter_chunks(self):
+        """Письмо целиком частями, уже подготовленное для SMTP DATA"""
+        yield self.head
+        for part_head, path in self.attachments:
+            yield part_head
+            yield from self.iter_attachment(path)
+        yield self.tail
+
+    def as_bytes(self) -> bytes:
+        return b''.join(self.iter_chunks())
+
+
+class CertificateMessageBuilder:
+    """Сборка писем с сертификатами из заранее подготовленных частей.
+
+    Неизменные части MIME (заголовки From/MIME-Version, разделитель, заголовки
+    текстовой части, завершение письма) собираются один раз; темы и имена
+    файлов кодируются с кэшированием. Для каждого письма остаются только
+    переменные заголовки, текст и потоковое кодирование вложений.
+    """
+
+    def __init__(self, sender: str = None):
+        self.sender = sender if sender is not None else Config.SENDER_EMAIL
+        # Текст и вложение кодируются в base64, поэтому разделитель не может встретиться в содержимом
+        self.boundary = f"===============_{secrets.token_hex(16)}=="
+        self._static_headers = (
+            f"From: {self.sender}\r\n"
+            f"MIME-Version: 1.0\r\n"
+            f"Content-Type: multipart/mixed; boundary=\"{self.boundary}\"\r\n"
+        )
+        self._text_part_header = (
+            f"\r\n--{self.boundary}\r\n"
+            f"Content-Type: text/plain; charset=\"utf-8\"\r\n"
+            f"Content-Transfer-Encoding: base64\r\n\r\n"
+        )
+        self._tail = f"--{self.boundary}--\r\n".encode('ascii')
+
+    def _attachment_head(self, path: Path) -> bytes:
+        """Заголовки MIME-части вложения"""
+        filename = encode_filename(path.name)
+        content_type = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+        return (
+            f"--{self.boundary}\r\n"
+            f"Content-Type: {content_type}; name=\"{filename}\"\r\n"
+            f"Content-Transfer-Encoding: base64\r\n"
+            f"Content-Disposition: attachment; filename=\"{filename}\"\r\n\r\n"
+        ).encode('ascii')
+
+    def build(self, recipient_email: str, subject: str, body: str, attachment_path: Path) -> StreamingMessage:
+        """Письмо с текстом и PDF-вложением"""
+        return self.build_many(recipient_email, subject, body, [attachment_path])
+
+    def build_many(self, recipient_email: str, subject: str, body: str, attachment_paths: list) -> StreamingMessage:
+        """Письмо с текстом и несколькими вложениями"""
+        head = (
+            f"{self._static_headers}"
+            f"To: {recipient_email}\r\n"
+            f"Subject: {encode_header(subject)}\r\n"
+            f"Date: {formatdate(localtime=True)}\r\n"
+            f"{self._text_part_header}"
+        ).encode('utf-8')
+        head += base64.encodebytes(body.encode('utf-8')).replace(b'\n', b'\r\n')
+        attachments = [(self._attachment_head(Path(path)), path) for path in attachment_paths]
+
+        return StreamingMessage(
+            self.sender, recipient_email, DOT_LINE_RE.sub(b'..', head), attachments, self._tail
+        )
@@ -0,0 +1,105 @@
+import io
+import logging
+from config import Config
+
+try:
+    from pypdf import PdfReader, PdfWriter
+    from reportlab.lib.colors import HexColor
+    from reportlab.lib.units import mm
+    from reportlab.lib.utils import ImageReader
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+    from reportlab.pdfgen import canvas
+    OVERLAY_AVAILABLE = True
+except ImportError:
+    OVERLAY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+class OverlayRenderer:
+    """Быстрый рендеринг: готовый PDF-фон + наложение переменных полей.
+
+    Статическая часть сертификата рендерится WeasyPrint один раз, а для каждого
+    участника на фон в фиксированных позициях (Config.OVERLAY_LAYOUT, мм от
+    левого верхнего угла) накладываются только текстовые поля и QR-код.
+    """
+
+    def __init__(self, background_pdf: bytes, layout: dict, env):
+        if not OVERLAY_AVAILABLE:
+            raise RuntimeError("Для движка overlay необходимы пакеты pypdf и reportlab")
+
+        self.background_page = PdfReader(io.BytesIO(background_pdf)).pages[0]
+        self.page_width = float(self.background_page.mediabox.width)
+        self.page_height = float(self.background_page.mediabox.height)
+        self.layout = layout
+
+        # Текст полей задается Jinja-выражениями, компилируем их один раз
+        self.field_templates = {
+            name: env.from_string(spec['text'])
+            for name, spec in layout.items() if 'text' in spec
+        }
+
+        self.font_name, self.bold_font_name = self.register_fonts()
+
+    @staticmethod
+    def register_fonts():
+        """Регистрация TTF-шрифтов с поддержкой кириллицы"""
+        font_name = Config.FONT_NAME
+        pdfmetrics.registerFont(TTFont(font_name, Config.FONT_PATH))
+
+        bold_font_name = f"{font_name}-Bold"
+        try:
+            pdfmetrics.registerFont(TTFont(bold_font_name, Config.FONT_BOLD_PATH))
+        except Exception as e:
+            logger.warning(f"Жирный шрифт {Config.FONT_BOLD_PATH} не найден, используется обычный: {e}")
+            bold_font_name = font_name
+
+        return font_name, bold_font_name
+
+    def draw_fields(self, template_data: dict, qr_png: bytes) -> bytes:
+        """Отрисовка переменных полей на прозрачной странице"""
+        buffer = io.BytesIO()
+        pdf = canvas.Canvas(buffer, pagesize=(self.page_width, self.page_height))
+
+        for name, spec in self.layout.items():
+            x = spec['x'] * mm
+            y = self.page_height - spec['y'] * mm
+
+            if name == 'qr_code':
+                size = spec['size'] * mm
+                pdf.drawImage(ImageReader(io.BytesIO(qr_png)), x, y - size, width=size, height=size)
+                continue
+
+            text = self.field_templates[name].render(**template_data)
+            font = self.bold_font_name if spec.get('bold') else self.font_name
+            pdf.setFont(font, spec['size'])
+            pdf.setFillColor(HexColor(spec.get('color', '#000000')))
+
+            text_width = pdfmetrics.stringWidth(text, font, spec['size'])
+            align = spec.get('align', 'left')
+            if align == 'center':
+                left = x - text_width / 2
+            elif align == 'right':
+                left = x - text_width
+            else:
+                left = x
+            pdf.drawString(left, y, text)
+
+            if 'underline' in spec:
+                padding = spec.get('padding', 0) * mm
+                pdf.setStrokeColor(HexColor(spec['underline']))
+                pdf.setLineWidth(1.5)
+                pdf.line(left - padding, y - padding, left + text_width + padding, y - padding)
+
+        pdf.showPage()
+        pdf.save()
+        return buffer.getvalue()
+
+    def render(self, template_data: dict, qr_png: bytes, pdf_path):
+        """Создание PDF сертификата наложением полей на фон (путь или файловый объект)"""
+        overlay_page = PdfReader(io.BytesIO(self.draw_fields(template_data, qr_png))).pages[0]
+
+        writer = PdfWriter()
+        page = writer.add_page(self.background_page)
+        page.merge_page(overlay_page)
+        writer.write(pdf_path)
@@ -0,0 +1,121 @@
+from collections.abc import MutableMapping
+
+# Маркер незаданного поля
+_MISSING = object()
+
+class Participant(MutableMapping):
+    """Компактная запись участника.
+
+    Поля хранятся в слотах, а не в словаре, что многократно уменьшает расход
+    памяти на больших списках. Для совместимости с существующим кодом запись
+    ведет себя как словарь с прежними ключами ('Имя', 'Фамилия', 'Email',
+    'full_name', ...). Незаданное поле считается отсутствующим ключом;
+    ключи вне схемы хранятся в дополнительном словаре extra.
+    """
+
+    # Ключ словаря → имя слота
+    FIELDS = {
+        'ID': 'id',
+        'Имя': 'first_name',
+        'Фамилия': 'last_name',
+        'full_name': 'full_name',
+        'Email': 'email',
+        'course_name': 'course_name',
+        'hours': 'hours',
+        'date_completed': 'date_completed',
+        'certificate_id': 'certificate_id',
+        'pdf_path': 'pdf_path',
+        'verification_url': 'verification_url',
+        'certificate_id_salt': 'certificate_id_salt',
+        'content_hash': 'content_hash',
+    }
+
+    __slots__ = tuple(FIELDS.values()) + ('extra',)
+
+    def __init__(self, id=_MISSING, first_name=_MISSING, last_name=_MISSING, full_name=_MISSING,
+                 email=_MISSING, course_name=_MISSING, hours=_MISSING, date_completed=_MISSING):
+        self.extra = None
+        for attr, value in (('id', id), ('first_name', first_name), ('last_name', last_name),
+                            ('full_name', full_name), ('email', email), ('course_name', course_name),
+                            ('hours', hours), ('date_completed', date_completed)):
+            if value is not _MISSING:
+                setattr(self, attr, value)
+
+    @classmethod
+    def from_dict(cls, data) -> 'Participant':
+        """Создание записи из словаря с прежними ключами"""
+        participant = cls()
+        for key, value in data.items():
+            participant[key] = value
+        return participant
+
+    def to_dict(self) -> dict:
+        """Преобразование в обычный словарь"""
+        return dict(self.items())
+
+    def __getitem__(self, key):
+        attr = self.FIELDS.get(key)
+        if attr is not None:
+            try:
+                return getattr(self, attr)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        attr = self.FIELDS.get(key)
+        if attr is not None:
+            setattr(self, attr, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __delitem__(self, key):
+        attr = self.FIELDS.get(key)
+        try:
+            if attr is not None:
+                delattr(self, attr)
+            elif self.extra is not None:
+                del self.extra[key]
+            else:
+                raise KeyError(key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key):
+        attr = self.FIELDS.get(key)
+        if attr is not None:
+            return hasattr(self, attr)
+        return self.extra is not None and key in self.extra
+
+    def get(self, key, default=None):
+        attr = self.FIELDS.get(key)
+        if attr is not None:
+            return getattr(self, attr, default)
+        if self.extra is not None:
+            return self.extra.get(key, default)
+        return default
+
+    def __iter__(self):
+        for key, attr in self.FIELDS.items():
+            if hasattr(self, attr):
+                yield key
+        if self.extra is not None:
+            yield from self.extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __getstate__(self):
+        return self.to_dict()
+
+    def __setstate__(self, state):
+        self.extra = None
+        for key, value in state.items():
+            self[key] = value
+
+    def __repr__(self):
+        return f"Participant({self.to_dict()!r})"
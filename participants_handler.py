@@ -1,16 +1,63 @@
 import pandas as pd
+import numpy as np
 import random
 import datetime
 import os
 import logging
 from pathlib import Path
 from config import Config
+from participant import Participant
 
 logger = logging.getLogger(__name__)
 
+# Справочники для массовой генерации участников (нагрузочное тестирование)
+BULK_NAMES = {
+    'male_first': ["Иван", "Петр", "Сергей", "Алексей", "Дмитрий", "Александр", "Максим", "Ян",
+                   "Константин", "Владимир", "Святослав", "Всеволод", "Лев", "Ростислав"],
+    'female_first': ["Анна", "Мария", "Елена", "Ольга", "Ия", "Екатерина", "Наталья", "Ксения",
+                     "Александра", "Анастасия", "Евгения", "Виктория", "Зоя", "Маргарита"],
+    # (мужская форма, женская форма, латиница для email)
+    'last': [
+        ("Иванов", "Иванова", "ivanov"), ("Петров", "Петрова", "petrov"),
+        ("Сидоров", "Сидорова", "sidorov"), ("Кузнецов", "Кузнецова", "kuznetsov"),
+        ("Смирнов", "Смирнова", "smirnov"), ("Попов", "Попова", "popov"),
+        ("Амажаев", "Амажаева", "amazhaev"), ("Ким", "Ким", "kim"), ("Ли", "Ли", "li"),
+        ("Дюрдуев", "Дюрдуева", "dyrduev"), ("Полотебнов", "Полотебнова", "polotebnov"),
+        ("Римский-Корсаков", "Римская-Корсакова", "rimsky-korsakov"),
+        ("Константинопольский", "Константинопольская", "konstantinopolsky"),
+        ("Преображенский-Воскресенский", "Преображенская-Воскресенская", "preobrazhensky"),
+    ],
+    # (мужская форма, женская форма)
+    'patronymic': [
+        ("Иванович", "Ивановна"), ("Петрович", "Петровна"), ("Сергеевич", "Сергеевна"),
+        ("Алексеевич", "Алексеевна"), ("Дмитриевич", "Дмитриевна"),
+        ("Константинович", "Константиновна"), ("Всеволодович", "Всеволодовна"),
+        ("Ильич", "Ильинична"),
+    ],
+    'courses': ["Основы Python", "Машинное обучение", "Веб-разработка", "Анализ данных", "DevOps",
+                "Проектирование высоконагруженных распределенных систем обработки данных",
+                "ИИ"],
+}
+
+# Строк в блоке массовой генерации: у каждого блока свой генератор случайных
+# чисел, поэтому результат не зависит от размера частей записи
+BULK_BLOCK_SIZE = 8192
+
+# Колонки исходных данных, которые используются при загрузке участников
+PARTICIPANT_COLUMNS = ['Имя', 'Фамилия', 'Отчество', 'Email', 'Курс', 'Часы', 'Дата_завершения']
+
 class ParticipantsHandler:
     """Класс для работы с участниками: загрузка, генерация, управление"""
     
+    # Читатели источников по расширению файла: (путь, размер части) → (колонки, итератор DataFrame)
+    READERS = {
+        '.csv': '_read_csv',
+        '.parquet': '_read_parquet',
+        '.pq': '_read_parquet',
+        '.jsonl': '_read_jsonl',
+        '.ndjson': '_read_jsonl',
+    }
+    
     @staticmethod
     def create_directories():
         """Создание необходимых директорий"""
@@ -19,12 +66,87 @@ class ParticipantsHandler:
         Config.TEMPLATES_DIR.mkdir(exist_ok=True)
         logger.info("Созданы необходимые директории")
     
+    @staticmethod
+    def _column_as_str(series: pd.Series) -> pd.Series:
+        """Векторное приведение колонки к строкам (пропуски дают 'nan', как str())"""
+        return series.astype(object).fillna('nan').astype(str)
+    
+    @staticmethod
+    def _parse_hours(series: pd.Series) -> pd.Series:
+        """Векторное приведение часов к int; некорректные значения — часы по умолчанию"""
+        default_hours = Config.CERTIFICATE_CONFIG['default_hours']
+        
+        if pd.api.types.is_bool_dtype(series) or pd.api.types.is_numeric_dtype(series):
+            numeric = pd.to_numeric(series, errors='coerce').astype(float)
+            valid = np.isfinite(numeric)
+            hours = np.where(valid, np.trunc(numeric.where(valid, 0)), default_hours)
+        else:
+            # Строковые значения: принимаем то же, что и int() — целое число со знаком
+            text = series.astype(object).where(series.notna(), '').astype(str)
+            valid = text.str.fullmatch(r'\s*[+-]?\d+(?:_\d+)*\s*')
+            cleaned = text.where(valid, '0').str.replace('_', '', regex=False).str.strip()
+            hours = np.where(valid, pd.to_numeric(cleaned, errors='coerce').fillna(0), default_hours)
+        
+        return pd.Series(hours.astype(np.int64), index=series.index)
+    
+    @staticmethod
+    def _normalize_frame(df: pd.DataFrame) -> list:
+        """Векторная нормализация таблицы участников в список Participant.
+        
+        Все преобразования выполняются по колонкам, записи собираются одним
+        проходом в конце. ID участника — номер строки в исходном файле (с 1).
+        """
+        first_name = ParticipantsHandler._column_as_str(df['Имя'])
+        last_name = ParticipantsHandler._column_as_str(df['Фамилия'])
+        
+        # Формируем полное имя
+        full_name = first_name + ' ' + last_name
+        if 'Отчество' in df.columns:
+            has_patronymic = df['Отчество'].notna()
+            patronymic = ParticipantsHandler._column_as_str(df['Отчество'])
+            full_name = full_name.where(~has_patronymic, first_name + ' ' + patronymic + ' ' + last_name)
+        
+        # Опциональные поля
+        if 'Курс' in df.columns:
+            course_name = ParticipantsHandler._column_as_str(df['Курс']).str.strip().where(
+                df['Курс'].notna(), 'Основы Python')
+        else:
+            course_name = pd.Series('Основы Python', index=df.index)
+        
+        if 'Часы' in df.columns:
+            hours = ParticipantsHandler._parse_hours(df['Часы'])
+        else:
+            hours = pd.Series(Config.CERTIFICATE_CONFIG['default_hours'], index=df.index)
+        
+        # Отсутствующая дата остается пустой (None): дата по умолчанию подставляется
+        # при подготовке сертификата и не попадает в хеш входных данных манифеста
+        if 'Дата_завершения' in df.columns:
+            date_completed = ParticipantsHandler._column_as_str(df['Дата_завершения']).str.strip()
+            date_completed = date_completed.astype(object).where(df['Дата_завершения'].notna(), None)
+        else:
+            # Series(None, dtype=object) заполняется NaN, а не None
+            date_completed = pd.Series([None] * len(df), index=df.index, dtype=object)
+        
+        columns = {
+            "ID": (df.index + 1).tolist(),
+            "Имя": first_name.str.strip().tolist(),
+            "Фамилия": last_name.str.strip().tolist(),
+            "full_name": full_name.str.strip().tolist(),
+            "Email": ParticipantsHandler._column_as_str(df['Email']).str.strip().tolist(),
+            "course_name": course_name.tolist(),
+            "hours": hours.tolist(),
+            "date_completed": date_completed.tolist(),
+        }
+        
+        # Аргументы Participant называются по слотам схемы (Participant.FIELDS)
+        attrs = [Participant.FIELDS[key] for key in columns]
+        return [Participant(**dict(zip(attrs, values))) for values in zip(*columns.values())]
+    
     @staticmethod
     def import_from_csv(csv_path: str) -> list:
         """Импорт данных участников из CSV файла"""
         try:
             df = pd.read_csv(csv_path, encoding='utf-8')
-            participants = []
             required_columns = ['Имя', 'Фамилия', 'Email']
             
             # Проверяем обязательные колонки
@@ -32,41 +154,8 @@ class ParticipantsHandler:
                 if col not in df.columns:
                     raise ValueError(f"В CSV файле отсутствует обязательная колонка: {col}")
             
-            # Обрабатываем каждую строку
-            for idx, row in df.iterrows():
-                # Формируем полное имя
-                full_name = f"{row['Имя']} {row['Фамилия']}"
-                if 'Отчество' in df.columns and pd.notna(row.get('Отчество')):
-                    full_name = f"{row['Имя']} {row['Отчество']} {row['Фамилия']}"
-                
-                participant = {
-                    "ID": idx + 1,
-                    "Имя": str(row['Имя']).strip(),
-                    "Фамилия": str(row['Фамилия']).strip(),
-                    "full_name": full_name.strip(),
-                    "Email": str(row['Email']).strip()
-                }
-                
-                # Опциональные поля
-                if 'Курс' in df.columns and pd.notna(row.get('Курс')):
-                    participant['course_name'] = str(row['Курс']).strip()
-                else:
-                    participant['course_name'] = 'Основы Python'
-                
-                if 'Часы' in df.columns and pd.notna(row.get('Часы')):
-                    try:
-                        participant['hours'] = int(row['Часы'])
-                    except (ValueError, TypeError):
-                        participant['hours'] = Config.CERTIFICATE_CONFIG['default_hours']
-                else:
-                    participant['hours'] = Config.CERTIFICATE_CONFIG['default_hours']
-                
-                if 'Дата_завершения' in df.columns and pd.notna(row.get('Дата_завершения')):
-                    participant['date_completed'] = str(row['Дата_завершения']).strip()
-                else:
-                    participant['date_completed'] = datetime.datetime.now().strftime('%Y-%m-%d')
-                
-                participants.append(participant)
+            # Обрабатываем все строки по колонкам
+            participants = ParticipantsHandler._normalize_frame(df)
             
             logger.info(f"Успешно импортировано {len(participants)} участников из {csv_path}")
             return participants
@@ -81,6 +170,196 @@ class ParticipantsHandler:
             logger.error(f"Ошибка при импорте из CSV: {e}")
             raise
     
+    @staticmethod
+    def _read_csv(path: str, chunk_size: int):
+        """Читатель CSV: заголовок читается сразу, данные — частями"""
+        header = pd.read_csv(path, encoding='utf-8', nrows=0)
+        columns = [c for c in header.columns if c in PARTICIPANT_COLUMNS]
+        
+        def chunks():
+            with pd.read_csv(path, encoding='utf-8', usecols=columns, chunksize=chunk_size) as reader:
+                yield from reader
+        
+        return list(header.columns), chunks()
+    
+    @staticmethod
+    def _read_parquet(path: str, chunk_size: int):
+        """Читатель Parquet: читаются только нужные колонки, пакетами"""
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Для чтения Parquet необходим пакет pyarrow") from None
+        
+        parquet_file = pq.ParquetFile(path)
+        names = parquet_file.schema_arrow.names
+        columns = [c for c in names if c in PARTICIPANT_COLUMNS]
+        
+        def chunks():
+            for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+                yield batch.to_pandas()
+        
+        return names, chunks()
+    
+    @staticmethod
+    def _read_jsonl(path: str, chunk_size: int):
+        """Читатель JSON Lines: файл читается потоково, колонки берутся из первой части"""
+        reader = pd.read_json(path, lines=True, chunksize=chunk_size, dtype=False,
+                              convert_dates=False, keep_default_dates=False, encoding='utf-8')
+        try:
+            first = next(iter(reader))
+        except StopIteration:
+            reader.close()
+            raise pd.errors.EmptyDataError(f"Файл пуст: {path}") from None
+        
+        def chunks():
+            with reader:
+                yield first[[c for c in first.columns if c in PARTICIPANT_COLUMNS]]
+                for chunk in reader:
+                    yield chunk[[c for c in chunk.columns if c in PARTICIPANT_COLUMNS]]
+        
+        return list(first.columns), chunks()
+    
+    @staticmethod
+    def iter_participants(path: str, chunk_size: int = None):
+        """Потоковое чтение участников из CSV, Parquet или JSON Lines частями по chunk_size строк.
+        
+        Формат определяется по расширению файла (см. READERS). Обязательные
+        колонки проверяются один раз (сразу при вызове), затем участники
+        нормализуются по частям и выдаются лениво. Пиковая память зависит от
+        размера части, а не от размера файла.
+        """
+        if chunk_size is None:
+            chunk_size = Config.CSV_CHUNK_SIZE
+        
+        suffix = Path(path).suffix.lower()
+        reader_name = ParticipantsHandler.READERS.get(suffix)
+        if reader_name is None:
+            raise ValueError(f"Неподдерживаемый формат файла участников: {suffix}")
+        
+        try:
+            columns, chunks = getattr(ParticipantsHandler, reader_name)(str(path), chunk_size)
+        except FileNotFoundError:
+            logger.error(f"Файл участников не найден: {path}")
+            raise
+        except pd.errors.EmptyDataError:
+            logger.error(f"Файл участников пуст: {path}")
+            raise
+        
+        for col in ['Имя', 'Фамилия', 'Email']:
+            if col not in columns:
+                raise ValueError(f"В файле {path} отсутствует обязательная колонка: {col}")
+        
+        def generate():
+            total = 0
+            for chunk in chunks:
+                # Сквозная нумерация строк для ID участников
+                chunk.index = pd.RangeIndex(total, total + len(chunk))
+                participants = ParticipantsHandler._normalize_frame(chunk)
+                total += len(participants)
+                yield from participants
+            logger.info(f"Потоково прочитано {total} участников из {path}")
+        
+        return generate()
+    
+    @staticmethod
+    def load_file(path: str) -> list:
+        """Загрузка всех участников из файла любого поддерживаемого формата"""
+        if Path(path).suffix.lower() == '.csv':
+            return ParticipantsHandler.import_from_csv(path)
+        
+        participants = list(ParticipantsHandler.iter_participants(path))
+        logger.info(f"Успешно импортировано {len(participants)} участников из {path}")
+        return participants
+    
+    @staticmethod
+    def identity_key(participant: Participant) -> tuple:
+        """Нормализованная идентичность участника: имя, курс и email без учета регистра и пробелов"""
+        return tuple(
+            " ".join(str(participant.get(key, '')).split()).casefold()
+            for key in ('full_name', 'course_name', 'Email')
+        )
+    
+    @staticmethod
+    def iter_deduplicated(participants, certificate_id_func, mode: str = None, report: dict = None):
+        """Поиск дубликатов и коллизий ID сертификатов за один проход (O(n)).
+        
+        Дубликат — повтор той же идентичности (имя, курс, email); коллизия —
+        совпадение ID сертификата у разных людей. certificate_id_func вычисляет
+        ID (например, CertificateGenerator.identify_participant). Режимы:
+        'report' — только сообщить, 'drop' — отбросить повторы,
+        'disambiguate' — выдать повторам отдельный ID через certificate_id_salt.
+        Найденное складывается в report ('duplicates', 'collisions').
+        """
+        if mode is None:
+            mode = Config.DEDUP_MODE
+        if mode not in ('report', 'drop', 'disambiguate'):
+            raise ValueError(f"Неизвестный режим дедупликации: {mode}")
+        if report is None:
+            report = {}
+        report.setdefault('duplicates', [])
+        report.setdefault('collisions', [])
+        
+        seen_identities = {}
+        seen_ids = {}
+        
+        for participant in participants:
+            # certificate_id_func дополняет запись (например, full_name), поэтому
+            # идентичность берется после вычисления ID
+            certificate_id = certificate_id_func(participant)
+            identity = ParticipantsHandler.identity_key(participant)
+            
+            first = seen_identities.get(identity)
+            if first is not None:
+                first['count'] += 1
+                report['duplicates'].append({
+                    'ID': participant.get('ID'),
+                    'first_ID': first['ID'],
+                    'full_name': participant.get('full_name'),
+                    'Email': participant.get('Email'),
+                })
+                if mode == 'drop':
+                    continue
+                if mode == 'disambiguate':
+                    participant['certificate_id_salt'] = f"#{first['count']}"
+                    certificate_id = certificate_id_func(participant)
+            else:
+                seen_identities[identity] = {'ID': participant.get('ID'), 'count': 1}
+            
+            owner = seen_ids.get(certificate_id)
+            if owner is not None and owner != identity:
+                report['collisions'].append({
+                    'certificate_id': certificate_id,
+                    'ID': participant.get('ID'),
+                    'full_name': participant.get('full_name'),
+                    'Email': participant.get('Email'),
+                })
+                if mode == 'drop':
+                    continue
+                if mode == 'disambiguate':
+                    # Email различает людей с одинаковыми именем и курсом
+                    salt = identity[2]
+                    participant['certificate_id_salt'] = salt
+                    certificate_id = certificate_id_func(participant)
+                    attempt = 1
+                    while certificate_id in seen_ids:
+                        attempt += 1
+                        participant['certificate_id_salt'] = f"{salt}#{attempt}"
+                        certificate_id = certificate_id_func(participant)
+            
+            seen_ids.setdefault(certificate_id, identity)
+            yield participant
+        
+        if report['duplicates'] or report['collisions']:
+            logger.warning(f"Найдено дубликатов: {len(report['duplicates'])}, "
+                           f"коллизий ID: {len(report['collisions'])} (режим: {mode})")
+    
+    @staticmethod
+    def deduplicate(participants: list, certificate_id_func, mode: str = None) -> tuple:
+        """Дедупликация списка участников. Возвращает (участники, отчет)"""
+        report = {}
+        result = list(ParticipantsHandler.iter_deduplicated(participants, certificate_id_func, mode, report))
+        return result, report
+    
     @staticmethod
     def generate_random_participants(num: int = 5) -> list:
         """Генерация случайных участников"""
@@ -91,7 +370,7 @@ class ParticipantsHandler:
             first_name = random.choice(["Иван", "Петр", "Сергей", "Анна", "Мария", "Елена", "Алексей"])
             last_name = random.choice(["Иванов", "Петров", "Сидоров", "Кузнецова", "Смирнова", "Попова", "Амажаев"])
             
-            participants.append({
+            participants.append(Participant.from_dict({
                 "ID": i,
                 "Имя": first_name,
                 "Фамилия": last_name,
@@ -100,11 +379,123 @@ class ParticipantsHandler:
                 "course_name": random.choice(courses),
                 "hours": random.randint(20, 100),
                 "date_completed": (datetime.datetime.now() - datetime.timedelta(days=random.randint(1, 30))).strftime('%Y-%m-%d')
-            })
+            }))
         
         logger.info(f"Сгенерировано {len(participants)} случайных участников")
         return participants
     
+    @staticmethod
+    def generate_bulk_frame(num: int, seed: int = 0, patronymic_ratio: float = 0.5,
+                            start: int = 0, base_date: str = None) -> pd.DataFrame:
+        """Векторная генерация участников в формате входного CSV.
+        
+        Результат полностью определяется seed (и base_date — датой, от которой
+        отсчитываются даты завершения; по умолчанию сегодня). Строки
+        генерируются блоками по BULK_BLOCK_SIZE, выровненными по сквозному
+        номеру строки, поэтому строка с данным номером одинакова при любом
+        разбиении на части. Email уникальны за счет сквозного номера строки
+        start..start+num-1. Имена разной длины, включая очень длинные двойные
+        фамилии, нагружают вёрстку.
+        """
+        base = pd.Timestamp(base_date) if base_date else pd.Timestamp.now().normalize()
+        if num <= 0:
+            return ParticipantsHandler._bulk_block(seed, 0, patronymic_ratio, base).iloc[:0]
+        
+        first_block = start // BULK_BLOCK_SIZE
+        last_block = (start + num - 1) // BULK_BLOCK_SIZE
+        frame = pd.concat(
+            [ParticipantsHandler._bulk_block(seed, block, patronymic_ratio, base)
+             for block in range(first_block, last_block + 1)],
+            ignore_index=True
+        )
+        offset = start - first_block * BULK_BLOCK_SIZE
+        return frame.iloc[offset:offset + num].reset_index(drop=True)
+    
+    @staticmethod
+    def _bulk_block(seed: int, block: int, patronymic_ratio: float, base: pd.Timestamp) -> pd.DataFrame:
+        """Один блок массовой генерации (строки block * BULK_BLOCK_SIZE и далее)"""
+        num = BULK_BLOCK_SIZE
+        start = block * BULK_BLOCK_SIZE
+        rng = np.random.default_rng([seed, block])
+        
+        is_female = rng.random(num) < 0.5
+        male_first = np.array(BULK_NAMES['male_first'], dtype=object)
+        female_first = np.array(BULK_NAMES['female_first'], dtype=object)
+        first_name = np.where(is_female,
+                              female_first[rng.integers(0, len(female_first), num)],
+                              male_first[rng.integers(0, len(male_first), num)])
+        
+        # Фамилии хранятся парами (мужская, женская, латиница для email)
+        surnames = BULK_NAMES['last']
+        surname_idx = rng.integers(0, len(surnames), num)
+        male_last = np.array([s[0] for s in surnames], dtype=object)[surname_idx]
+        female_last = np.array([s[1] for s in surnames], dtype=object)[surname_idx]
+        latin_last = pd.Series(np.array([s[2] for s in surnames], dtype=object)[surname_idx])
+        last_name = np.where(is_female, female_last, male_last)
+        
+        patronymic_idx = rng.integers(0, len(BULK_NAMES['patronymic']), num)
+        patronymics = BULK_NAMES['patronymic']
+        patronymic = np.where(is_female,
+                              np.array([p[1] for p in patronymics], dtype=object)[patronymic_idx],
+                              np.array([p[0] for p in patronymics], dtype=object)[patronymic_idx])
+        patronymic = np.where(rng.random(num) < patronymic_ratio, patronymic, None)
+        
+        row_numbers = pd.Series(np.arange(start, start + num)).astype(str)
+        email = latin_last + '.' + row_numbers + '@example.com'
+        
+        courses = np.array(BULK_NAMES['courses'], dtype=object)
+        days_ago = pd.to_timedelta(rng.integers(1, 366, num), unit='D')
+        
+        return pd.DataFrame({
+            'Имя': first_name,
+            'Фамилия': last_name,
+            'Отчество': patronymic,
+            'Email': email.to_numpy(),
+            'Курс': courses[rng.integers(0, len(courses), num)],
+            'Часы': rng.integers(8, 145, num),
+            'Дата_завершения': (base - days_ago).strftime('%Y-%m-%d'),
+        })
+    
+    @staticmethod
+    def write_bulk_participants(path: str, num: int, seed: int = 0, chunk_size: int = None,
+                                patronymic_ratio: float = 0.5, base_date: str = None) -> Path:
+        """Запись большого синтетического списка участников в CSV или Parquet по частям"""
+        if chunk_size is None:
+            chunk_size = Config.CSV_CHUNK_SIZE
+        path = Path(path)
+        suffix = path.suffix.lower()
+        if suffix not in ('.csv', '.parquet', '.pq'):
+            raise ValueError(f"Неподдерживаемый формат для записи: {suffix}")
+        
+        parquet_writer = None
+        try:
+            for start in range(0, num, chunk_size):
+                frame = ParticipantsHandler.generate_bulk_frame(
+                    min(chunk_size, num - start), seed=seed, patronymic_ratio=patronymic_ratio,
+                    start=start, base_date=base_date
+                )
+                if suffix == '.csv':
+                    frame.to_csv(path, mode='w' if start == 0 else 'a', header=start == 0,
+                                 index=False, encoding='utf-8')
+                else:
+                    import pyarrow as pa
+                    import pyarrow.parquet as pq
+                    if parquet_writer is None:
+                        schema = pa.schema([
+                            (name, pa.int64() if name == 'Часы' else pa.string())
+                            for name in frame.columns
+                        ])
+                        parquet_writer = pq.ParquetWriter(path, schema)
+                    parquet_writer.write_table(
+                        pa.Table.from_pandas(frame, schema=parquet_writer.schema, preserve_index=False)
+                    )
+        finally:
+            if parquet_writer is not None:
+                parquet_writer.close()
+        
+        logger.info(f"Сгенерировано {num} участников (seed={seed}) в {path}")
+        return path
+    
     @staticmethod
     def get_test_participants() -> list:
         """Получение тестовых участников"""
@@ -130,6 +521,7 @@ class ParticipantsHandler:
                 "date_completed": (datetime.datetime.now() - datetime.timedelta(days=7)).strftime('%Y-%m-%d')
             }
         ]
+        participants = [Participant.from_dict(p) for p in participants]
         
         logger.info(f"Используются тестовые данные ({len(participants)} участников)")
         return participants
@@ -164,8 +556,14 @@ class ParticipantsHandler:
         return "participants.csv"
     
     @staticmethod
-    def load_participants(source_type: str = "csv", csv_path: str = None) -> list:
-        """Универсальный метод загрузки участников"""
+    def load_participants(source_type: str = "csv", csv_path: str = None, num: int = None) -> list:
+        """Универсальный метод загрузки участников.
+        
+        Для source_type="random" количество можно передать в num, иначе оно
+        запрашивается у пользователя.
+        """
+        if csv_path is None and source_type in ("parquet", "jsonl"):
+            raise ValueError(f"Для источника {source_type} нужно указать путь к файлу")
         if csv_path is None:
             csv_path = r"D:\popitka3\certification_system_tpu\src\participants.csv"
         
@@ -177,12 +575,16 @@ class ParticipantsHandler:
             
             return ParticipantsHandler.import_from_csv(csv_path)
         
+        elif source_type in ("parquet", "jsonl"):
+            return ParticipantsHandler.load_file(csv_path)
+        
         elif source_type == "test":
             return ParticipantsHandler.get_test_participants()
         
         elif source_type == "random":
-            num = input("Сколько участников сгенерировать? (по умолчанию 5): ").strip()
-            num = int(num) if num else 5
+            if num is None:
+                num = input("Сколько участников сгенерировать? (по умолчанию 5): ").strip()
+                num = int(num) if num else 5
             return ParticipantsHandler.generate_random_participants(num)
         
         else:
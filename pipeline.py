@@ -0,0 +1,150 @@
+import logging
+import queue
+import threading
+from config import Config
+from certificate_generator import CertificateGenerator
+from email_sender import EmailSender, SMTPSessionPool
+from report_generator import ReportWriter
+
+logger = logging.getLogger(__name__)
+
+# Маркер завершения очереди
+_STOP = object()
+
+class CertificatePipeline:
+    """Конвейер генерации и рассылки сертификатов.
+
+    Рендеринг (CPU) и отправка email (сеть) выполняются одновременно:
+    готовые сертификаты через ограниченную очередь сразу попадают в стадию
+    отправки, а строка отчета пишется, как только участник обработан.
+    Заполненная очередь приостанавливает рендеринг, поэтому память не растет.
+    Стадию отправки выполняют email_workers потоков, у каждого свое
+    SMTP-соединение. Если все потоки отправки завершились аварийно,
+    рендеринг останавливается с ошибкой, а не ждет места в очереди.
+    """
+
+    # Как часто (секунды) проверять, живы ли потоки отправки, пока очередь заполнена
+    PUT_TIMEOUT = 1.0
+
+    def __init__(self, generator: CertificateGenerator, send_emails: bool = True,
+                 report_path: str = "report.csv", queue_size: int = None, email_workers: int = None,
+                 outbox=None, resume: bool = False):
+        self.generator = generator
+        self.send_emails = send_emails
+        # Журнал рассылки: с resume=True уже отправленные письма пропускаются
+        self.outbox = outbox
+        self.resume = resume
+        self.email_workers = email_workers if email_workers is not None else Config.SMTP_WORKERS
+        self.report_path = report_path
+        self.queue_size = queue_size if queue_size is not None else Config.PIPELINE_QUEUE_SIZE
+        self.stats = {
+            'rendered': 0,
+            'skipped': 0,
+            'render_failed': 0,
+            'email_sent': 0,
+            'email_already_sent': 0,
+            'email_failed': 0,
+        }
+        self._stats_lock = threading.Lock()
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _process(self, result: dict, report: ReportWriter, session):
+        """Отправка сертификата участнику и запись строки отчета"""
+        participant = result['participant']
+        if self.send_emails and result['status'] == 'success':
+            if self.outbox is not None and self.resume and self.outbox.is_sent(participant['certificate_id']):
+                self._count('email_already_sent')
+            else:
+                sent = EmailSender.send_certificate_email(participant, session=session)
+                if self.outbox is not None:
+                    self.outbox.mark(participant, sent)
+                if sent:
+                    self._count('email_sent')
+                    print(f"✓ Email отправлен: {participant['full_name']}")
+                else:
+                    self._count('email_failed')
+                    print(f"✗ Ошибка отправки email: {participant['full_name']}")
+
+        report.write(participant)
+
+    def _put(self, results: queue.Queue, item, email_threads: list):
+        """Постановка в очередь; ошибка, если не осталось живых потоков отправки"""
+        while True:
+            try:
+                results.put(item, timeout=self.PUT_TIMEOUT)
+                return
+            except queue.Full:
+                if not any(email_thread.is_alive() for email_thread in email_threads):
+                    raise RuntimeError("Стадия отправки остановилась, очередь конвейера не разбирается")
+
+    def _email_stage(self, results: queue.Queue, report: ReportWriter, sessions: SMTPSessionPool):
+        """Стадия отправки: забирает готовые сертификаты из очереди.
+
+        Все письма потока стадии идут через его SMTP-сессию (одно соединение
+        или, при пуле аккаунтов, по соединению на аккаунт).
+        """
+        try:
+            session = sessions.get()
+        except Exception as e:
+            logger.error(f"Поток стадии отправки не запущен: {e}")
+            return
+        while True:
+            result = results.get()
+            try:
+                if result is _STOP:
+                    return
+
+                self._process(result, report, session)
+            except Exception as e:
+                logger.error(f"Ошибка стадии отправки: {e}")
+            finally:
+                results.task_done()
+
+    def run(self, participants, workers: int = None, manifest=None, force: bool = False,
+            registry=None) -> dict:
+        """Запуск конвейера. Возвращает статистику по стадиям"""
+        results = queue.Queue(maxsize=self.queue_size)
+
+        with ReportWriter(self.report_path) as report, SMTPSessionPool() as sessions:
+            email_threads = [
+                threading.Thread(
+                    target=self._email_stage, args=(results, report, sessions), name=f"email-stage-{index}",
+                    daemon=True
+                )
+                for index in range(max(1, self.email_workers) if self.send_emails else 1)
+            ]
+            for email_thread in email_threads:
+                email_thread.start()
+
+            try:
+                rendered = self.generator.create_certificates(
+                    participants, workers=workers, manifest=manifest, force=force, registry=registry
+                )
+                for result in rendered:
+                    if result['status'] != 'success':
+                        self._count('render_failed')
+                        print(f"✗ Ошибка создания сертификата: {result.get('error', 'Неизвестная ошибка')}")
+                    elif result.get('skipped'):
+                        self._count('skipped')
+                    else:
+                        self._count('rendered')
+                        print(f"✓ Сертификат создан: {result['pdf_path'].name}")
+
+                    # Ждет, если стадия отправки не успевает (backpressure)
+                    self._put(results, result, email_threads)
+            finally:
+                try:
+                    for _ in email_threads:
+                        self._put(results, _STOP, email_threads)
+                except RuntimeError:
+                    # Потоки отправки уже завершились: ждать их некому
+                    pass
+                for email_thread in email_threads:
+                    email_thread.join()
+                if self.outbox is not None:
+                    self.outbox.flush()
+
+        return self.stats
@@ -0,0 +1,100 @@
+import hashlib
+import logging
+import os
+from collections import OrderedDict
+from pathlib import Path
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class QRCodeStore:
+    """Контентно-адресуемое хранилище QR-кодов.
+
+    Имя файла — хеш от содержимого QR-кода и формата, поэтому одинаковые URL
+    верификации дают один и тот же файл, а каталог не разрастается при
+    повторных запусках. Перед диском стоит LRU-кэш в памяти процесса.
+
+    Дисковый кэш (Config.QR_CACHE_DIR) включается persist (по умолчанию
+    Config.QR_CACHE_PERSIST): тогда каждый новый QR-код записывается в файл,
+    а повторный запуск берет его оттуда, не генерируя заново. По умолчанию
+    он выключен, чтобы рендеринг не писал файл на каждый сертификат.
+
+    Копия для пользователя в qr_codes/ (export_directory) записывается
+    отдельно, только по запросу (save_file в put).
+    """
+
+    def __init__(self, directory: Path = None, cache_size: int = None, export_directory: Path = None,
+                 persist: bool = None):
+        self.directory = Path(directory) if directory is not None else Config.QR_CACHE_DIR
+        self.export_directory = Path(export_directory) if export_directory is not None else Config.QR_OUTPUT_DIR
+        self.cache_size = cache_size if cache_size is not None else Config.QR_CACHE_SIZE
+        self.persist = persist if persist is not None else Config.QR_CACHE_PERSIST
+        self._cache = OrderedDict()
+
+    @staticmethod
+    def content_key(data: str, qr_format: str) -> str:
+        """Ключ QR-кода: SHA-256 от формата и данных"""
+        return hashlib.sha256(f"{qr_format}:{data}".encode('utf-8')).hexdigest()
+
+    def path_for(self, data: str, qr_format: str, directory: Path = None) -> Path:
+        """Путь к файлу QR-кода в хранилище (или в другом каталоге с тем же именем)"""
+        if directory is None:
+            directory = self.directory
+        return directory / f"qr_{self.content_key(data, qr_format)[:32]}.{qr_format}"
+
+    def get(self, data: str, qr_format: str):
+        """Поиск QR-кода в кэше и на диске. Возвращает байты или None"""
+        key = (qr_format, data)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        if not self.persist:
+            return None
+        qr_path = self.path_for(data, qr_format)
+        try:
+            qr_bytes = qr_path.read_bytes()
+        except OSError:
+            return None
+
+        logger.debug(f"QR-код взят из хранилища: {qr_path}")
+        self._remember(key, qr_bytes)
+        return qr_bytes
+
+    def put(self, data: str, qr_format: str, qr_bytes: bytes, save_file: bool = False):
+        """Сохранение QR-кода в кэш (на диск — при persist) и (при save_file) копии в qr_codes/.
+
+        Возвращает путь копии или None.
+        """
+        self._remember((qr_format, data), qr_bytes)
+
+        if self.persist:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._write(self.path_for(data, qr_format), qr_bytes)
+
+        if not save_file:
+            return None
+
+        self.export_directory.mkdir(parents=True, exist_ok=True)
+        export_path = self.path_for(data, qr_format, self.export_directory)
+        self._write(export_path, qr_bytes)
+        return export_path
+
+    @staticmethod
+    def _write(qr_path: Path, qr_bytes: bytes):
+        if qr_path.exists():
+            return
+        # Атомарная запись: параллельные процессы не увидят частично записанный файл
+        tmp_path = qr_path.with_name(f"{qr_path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(qr_bytes)
+        os.replace(tmp_path, qr_path)
+        logger.debug(f"QR-код сохранен: {qr_path}")
+
+    def _remember(self, key, qr_bytes: bytes):
+        """Добавление в LRU-кэш с вытеснением самых старых записей"""
+        if self.cache_size <= 0:
+            return
+        self._cache[key] = qr_bytes
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
@@ -0,0 +1,127 @@
+import logging
+import random
+import threading
+import time
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class RateLimiter:
+    """Ограничение скорости отправки писем для одного почтового аккаунта.
+
+    Два токен-бакета: писем в секунду и писем в час (0 — без часового
+    лимита). Скорость адаптивная: при ответе провайдера о превышении лимита
+    (421/450/451/452) она уменьшается вдвое, а после серии успешных отправок
+    постепенно возвращается к настроенной. Лимитер общий для всех потоков и
+    соединений одного аккаунта (см. shared).
+    """
+
+    # Во сколько раз снижается скорость при ограничении со стороны провайдера
+    THROTTLE_FACTOR = 0.5
+    # Повторные ответы об ограничении в течение этого времени (секунды) относятся
+    # к тому же эпизоду и скорость повторно не снижают
+    THROTTLE_COOLDOWN = 5.0
+    # Сколько успешных отправок подряд нужно для повышения скорости и на сколько
+    RECOVERY_SUCCESSES = 20
+    RECOVERY_FACTOR = 1.25
+
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, per_second: float = None, per_hour: int = None):
+        if per_second is None:
+            per_second = Config.SMTP_RATE_PER_SECOND
+        if per_hour is None:
+            per_hour = Config.SMTP_RATE_PER_HOUR
+        if per_second <= 0:
+            raise ValueError("Скорость отправки должна быть больше нуля")
+
+        self.max_per_second = per_second
+        self.per_second = per_second
+        self.min_per_second = min(per_second, 0.1)
+        self.per_hour = per_hour
+
+        self._tokens = self._burst()
+        self._hour_tokens = float(per_hour)
+        self._updated = time.monotonic()
+        self._successes = 0
+        self._throttled_at = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, account: str, per_second: float = None, per_hour: int = None) -> 'RateLimiter':
+        """Общий лимитер аккаунта (один на процесс)"""
+        with cls._shared_lock:
+            limiter = cls._shared.get(account)
+            if limiter is None:
+                limiter = cls._shared[account] = cls(per_second, per_hour)
+            return limiter
+
+    @classmethod
+    def clear_shared(cls):
+        """Сброс общих лимитеров (например, между прогонами бенчмарка)"""
+        with cls._shared_lock:
+            cls._shared.clear()
+
+    def _burst(self) -> float:
+        return max(1.0, self.per_second)
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        self._updated = now
+        self._tokens = min(self._burst(), self._tokens + elapsed * self.per_second)
+        if self.per_hour:
+            self._hour_tokens = min(float(self.per_hour), self._hour_tokens + elapsed * self.per_hour / 3600)
+
+    def acquire(self):
+        """Ожидание разрешения на отправку одного письма"""
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                hour_ready = not self.per_hour or self._hour_tokens >= 1
+                if self._tokens >= 1 and hour_ready:
+                    self._tokens -= 1
+                    if self.per_hour:
+                        self._hour_tokens -= 1
+                    return
+
+                wait = 0.0
+                if self._tokens < 1:
+                    wait = (1 - self._tokens) / self.per_second
+                if not hour_ready:
+                    wait = max(wait, (1 - self._hour_tokens) * 3600 / self.per_hour)
+            time.sleep(wait)
+
+    def throttled(self):
+        """Провайдер ограничил отправку: снижение скорости"""
+        with self._lock:
+            self._successes = 0
+            self._tokens = min(self._tokens, 0.0)
+            now = time.monotonic()
+            if self._throttled_at is not None and now - self._throttled_at < self.THROTTLE_COOLDOWN:
+                return
+            self._throttled_at = now
+            previous = self.per_second
+            self.per_second = max(self.min_per_second, self.per_second * self.THROTTLE_FACTOR)
+        if self.per_second < previous:
+            logger.warning(f"Провайдер ограничивает отправку, скорость снижена до {self.per_second:.2f} писем/с")
+
+    def succeeded(self):
+        """Успешная отправка: постепенное возвращение к настроенной скорости"""
+        with self._lock:
+            if self.per_second >= self.max_per_second:
+                return
+            self._successes += 1
+            if self._successes >= self.RECOVERY_SUCCESSES:
+                self._successes = 0
+                self.per_second = min(self.max_per_second, self.per_second * self.RECOVERY_FACTOR)
+                logger.info(f"Скорость отправки повышена до {self.per_second:.2f} писем/с")
+
+    @staticmethod
+    def backoff_delay(attempt: int, base: float = None, maximum: float = None) -> float:
+        """Экспоненциальная задержка со случайным разбросом (full jitter)"""
+        if base is None:
+            base = Config.SMTP_BACKOFF_BASE
+        if maximum is None:
+            maximum = Config.SMTP_BACKOFF_MAX
+        return random.uniform(0, min(maximum, base * 2 ** (attempt - 1)))
@@ -1,5 +1,7 @@
 import pandas as pd
+import csv
 import logging
+import threading
 from pathlib import Path
 from config import Config
 
@@ -8,25 +10,27 @@ logger = logging.getLogger(__name__)
 class ReportGenerator:
     """Класс для генерации отчетов"""
     
+    @staticmethod
+    def report_row(p) -> dict:
+        """Строка отчета для одного участника"""
+        return {
+            'ID': p.get('ID', ''),
+            'Полное имя': p.get('full_name', ''),
+            'Email': p.get('Email', ''),
+            'Курс': p.get('course_name', ''),
+            'Часы': p.get('hours', ''),
+            'Дата завершения': p.get('date_completed', ''),
+            'ID сертификата': p.get('certificate_id', ''),
+            'Ссылка для верификации': p.get('verification_url', ''),
+            'Файл сертификата': p.get('pdf_path', Path('')).name if 'pdf_path' in p else '',
+            'Статус': 'Успешно' if 'certificate_id' in p else 'Ошибка'
+        }
+    
     @staticmethod
     def save_report(participants: list, output_path: str = "report.csv"):
         """Сохранение отчета в CSV"""
         try:
-            report_data = []
-            
-            for p in participants:
-                report_data.append({
-                    'ID': p.get('ID', ''),
-                    'Полное имя': p.get('full_name', ''),
-                    'Email': p.get('Email', ''),
-                    'Курс': p.get('course_name', ''),
-                    'Часы': p.get('hours', ''),
-                    'Дата завершения': p.get('date_completed', ''),
-                    'ID сертификата': p.get('certificate_id', ''),
-                    'Ссылка для верификации': p.get('verification_url', ''),
-                    'Файл сертификата': p.get('pdf_path', Path('')).name if 'pdf_path' in p else '',
-                    'Статус': 'Успешно' if 'certificate_id' in p else 'Ошибка'
-                })
+            report_data = [ReportGenerator.report_row(p) for p in participants]
             
             df = pd.DataFrame(report_data)
             report_path = Path(output_path)
@@ -39,4 +43,41 @@ class ReportGenerator:
             
         except Exception as e:
             logger.error(f"Ошибка при сохранении отчета: {e}")
-            return None
\ No newline at end of file
+            return None
+
+
+class ReportWriter:
+    """Потоковая запись отчета: строки дописываются по мере обработки участников"""
+    
+    FIELDNAMES = [
+        'ID', 'Полное имя', 'Email', 'Курс', 'Часы', 'Дата завершения',
+        'ID сертификата', 'Ссылка для верификации', 'Файл сертификата', 'Статус'
+    ]
+    
+    def __init__(self, output_path: str = "report.csv"):
+        self.report_path = Path(output_path)
+        self._lock = threading.Lock()
+        self._file = open(self.report_path, 'w', newline='', encoding='utf-8-sig')
+        self._writer = csv.DictWriter(self._file, fieldnames=self.FIELDNAMES)
+        self._writer.writeheader()
+        self.rows_written = 0
+    
+    def write(self, participant):
+        """Запись строки отчета (потокобезопасно)"""
+        with self._lock:
+            self._writer.writerow(ReportGenerator.report_row(participant))
+            self._file.flush()
+            self.rows_written += 1
+    
+    def close(self):
+        """Закрытие файла отчета"""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+                logger.info(f"Отчет сохранен: {self.report_path.absolute()} ({self.rows_written} строк)")
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
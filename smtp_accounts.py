@@ -0,0 +1,154 @@
+import bisect
+import hashlib
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from config import Config
+from certificate_registry import CertificateRegistry
+
+logger = logging.getLogger(__name__)
+
+class SMTPAccount:
+    """Почтовый аккаунт (или релей) для отправки писем со своими лимитами"""
+
+    def __init__(self, email: str, password: str = '', server: str = None, port: int = None,
+                 security: str = None, rate_per_second: float = None, rate_per_hour: int = None,
+                 weight: int = 1):
+        self.email = email
+        self.password = password
+        self.server = server if server is not None else Config.SMTP_SERVER
+        self.port = int(port) if port is not None else Config.SMTP_PORT
+        self.security = (security if security is not None else Config.SMTP_SECURITY).lower()
+        self.rate_per_second = float(rate_per_second) if rate_per_second is not None else Config.SMTP_RATE_PER_SECOND
+        self.rate_per_hour = int(rate_per_hour) if rate_per_hour is not None else Config.SMTP_RATE_PER_HOUR
+        self.weight = max(1, int(weight))
+
+    @property
+    def key(self) -> str:
+        """Идентификатор аккаунта (ключ общего лимитера)"""
+        return f"{self.email}@{self.server}:{self.port}"
+
+    @classmethod
+    def from_config(cls) -> 'SMTPAccount':
+        """Аккаунт из основных настроек (SENDER_EMAIL, SMTP_SERVER, ...)"""
+        return cls(Config.SENDER_EMAIL, Config.SENDER_PASSWORD)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'SMTPAccount':
+        if not data.get('email'):
+            raise ValueError(f"У аккаунта не указан email: {data}")
+        return cls(
+            data['email'], data.get('password', ''), data.get('server'), data.get('port'), data.get('security'),
+            data.get('rate_per_second'), data.get('rate_per_hour'), data.get('weight', 1)
+        )
+
+    def __repr__(self):
+        return f"SMTPAccount({self.key})"
+
+
+class AccountPool:
+    """Пул аккаунтов с распределением получателей по согласованному хешированию.
+
+    Каждый аккаунт занимает на кольце VIRTUAL_NODES * weight точек, поэтому
+    получатели распределяются равномерно (пропорционально весу), а при
+    добавлении или удалении аккаунта переезжает только его доля получателей.
+
+    Для получателя candidates() возвращает аккаунты в порядке обхода кольца:
+    сначала «свой», затем резервные. Аккаунт, которому провайдер ограничил
+    отправку, приостанавливается на Config.SMTP_ACCOUNT_COOLDOWN секунд,
+    а аккаунт с неверными учетными данными исключается до конца рассылки.
+    """
+
+    VIRTUAL_NODES = 64
+
+    def __init__(self, accounts: list, cooldown: float = None):
+        if not accounts:
+            raise ValueError("Пул аккаунтов пуст")
+        keys = [account.key for account in accounts]
+        if len(set(keys)) != len(keys):
+            raise ValueError("В пуле аккаунтов есть повторяющиеся аккаунты")
+
+        self.accounts = list(accounts)
+        self.cooldown = cooldown if cooldown is not None else Config.SMTP_ACCOUNT_COOLDOWN
+        self._lock = threading.Lock()
+        self._suspended_until = {}
+        self._disabled = set()
+        self.sent = {account.key: 0 for account in self.accounts}
+
+        ring = sorted(
+            (self._hash(f"{account.key}#{node}"), index)
+            for index, account in enumerate(self.accounts)
+            for node in range(self.VIRTUAL_NODES * account.weight)
+        )
+        self._ring_hashes = [point for point, _ in ring]
+        self._ring_accounts = [index for _, index in ring]
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        return int.from_bytes(hashlib.sha256(value.encode('utf-8')).digest()[:8], 'big')
+
+    @classmethod
+    def load_accounts(cls) -> list:
+        """Аккаунты из SMTP_ACCOUNTS (JSON) или файла SMTP_ACCOUNTS_FILE (пустой список, если не заданы)"""
+        if Config.SMTP_ACCOUNTS:
+            data = json.loads(Config.SMTP_ACCOUNTS)
+        elif Config.SMTP_ACCOUNTS_FILE:
+            data = json.loads(Path(Config.SMTP_ACCOUNTS_FILE).read_text(encoding='utf-8'))
+        else:
+            return []
+        return [SMTPAccount.from_dict(item) for item in data]
+
+    @classmethod
+    def from_config(cls) -> 'AccountPool':
+        """Пул из настроек или None, если используется один аккаунт SENDER_EMAIL"""
+        accounts = cls.load_accounts()
+        return cls(accounts) if accounts else None
+
+    def ring_order(self, recipient: str) -> list:
+        """Все аккаунты в порядке обхода кольца от точки получателя (первый — закрепленный за ним)"""
+        position = bisect.bisect(self._ring_hashes, self._hash(CertificateRegistry.normalize_email(recipient)))
+        ordered = []
+        seen = set()
+        total = len(self._ring_hashes)
+        for offset in range(total):
+            index = self._ring_accounts[(position + offset) % total]
+            if index not in seen:
+                seen.add(index)
+                ordered.append(self.accounts[index])
+                if len(seen) == len(self.accounts):
+                    break
+        return ordered
+
+    def candidates(self, recipient: str) -> list:
+        """Аккаунты для отправки получателю: доступные по кольцу, затем приостановленные"""
+        ordered = self.ring_order(recipient)
+        now = time.monotonic()
+        with self._lock:
+            active = [account for account in ordered if account.key not in self._disabled]
+            available = [account for account in active if self._suspended_until.get(account.key, 0) <= now]
+            suspended = sorted(
+                (account for account in active if self._suspended_until.get(account.key, 0) > now),
+                key=lambda account: self._suspended_until[account.key]
+            )
+        return available + suspended
+
+    def suspend(self, account: SMTPAccount):
+        """Провайдер ограничил отправку: аккаунт временно не используется"""
+        with self._lock:
+            self._suspended_until[account.key] = time.monotonic() + self.cooldown
+        logger.warning(f"Аккаунт {account.key} приостановлен на {self.cooldown:.0f} с")
+
+    def disable(self, account: SMTPAccount):
+        """Ошибка учетных данных или отказ отправителю: аккаунт исключается из рассылки"""
+        with self._lock:
+            self._disabled.add(account.key)
+        logger.error(f"Аккаунт {account.key} исключен из рассылки")
+
+    def succeeded(self, account: SMTPAccount):
+        with self._lock:
+            self.sent[account.key] += 1
+
+    def __len__(self):
+        return len(self.accounts)
@@ -0,0 +1,270 @@
+"""Локальный SMTP-сервер для тестирования и бенчмарка рассылки.
+
+Принимает письма и никуда их не доставляет. Поддерживает STARTTLS
+(самоподписанный сертификат создается через openssl), AUTH PLAIN/LOGIN,
+а также имитирует проблемы реальных провайдеров: задержку ответов,
+ограничение скорости (451), случайные ответы 421 и обрывы соединения.
+
+Примеры:
+    python smtp_sink.py --port 2525
+    python smtp_sink.py --port 2525 --latency 0.05 --max-rate 20 --close-rate 0.01 --disconnect-rate 0.01
+"""
+import argparse
+import asyncio
+import collections
+import logging
+import random
+import shutil
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+def make_tls_context():
+    """TLS-контекст с самоподписанным сертификатом (None, если openssl недоступен)"""
+    openssl = shutil.which('openssl')
+    if openssl is None:
+        logger.warning("openssl не найден, STARTTLS отключен")
+        return None
+
+    directory = Path(tempfile.mkdtemp(prefix='smtp_sink_'))
+    cert_path = directory / 'cert.pem'
+    key_path = directory / 'key.pem'
+    try:
+        subprocess.run(
+            [openssl, 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+             '-subj', '/CN=localhost', '-keyout', str(key_path), '-out', str(cert_path)],
+            check=True, capture_output=True
+        )
+    except (OSError, subprocess.CalledProcessError) as e:
+        logger.warning(f"Не удалось создать сертификат, STARTTLS отключен: {e}")
+        return None
+
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert_path, key_path)
+    return context
+
+
+class SMTPSink:
+    """Асинхронный SMTP-сервер, принимающий и отбрасывающий письма.
+
+    Параметры имитации:
+        latency — задержка перед каждым ответом (секунды);
+        max_rate — писем в секунду, сверх которых RCPT получает 451 (0 — без ограничения);
+        throttle_rate — доля RCPT, получающих 451 случайным образом;
+        close_rate — доля RCPT, получающих 421, после которого сервер закрывает соединение;
+        disconnect_rate — доля писем, после DATA которых соединение обрывается без ответа.
+    Статистика работы накапливается в stats.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 2525, tls_context=None, require_auth: bool = True,
+                 latency: float = 0.0, max_rate: float = 0.0, throttle_rate: float = 0.0,
+                 disconnect_rate: float = 0.0, seed: int = None, close_rate: float = 0.0):
+        self.host = host
+        self.port = port
+        self.tls_context = tls_context
+        self.require_auth = require_auth
+        self.latency = latency
+        self.max_rate = max_rate
+        self.throttle_rate = throttle_rate
+        self.disconnect_rate = disconnect_rate
+        self.close_rate = close_rate
+        self.random = random.Random(seed)
+        self._accepted = collections.deque()
+        self._server = None
+        self._loop = None
+        self.stats = {
+            'connections': 0,
+            'tls_handshakes': 0,
+            'auths': 0,
+            'messages': 0,
+            'bytes': 0,
+            'throttled': 0,
+            'closed': 0,
+            'disconnects': 0,
+        }
+
+    def _over_rate(self) -> bool:
+        """Превышен ли лимит max_rate за последнюю секунду"""
+        if not self.max_rate:
+            return False
+        now = time.monotonic()
+        while self._accepted and now - self._accepted[0] > 1.0:
+            self._accepted.popleft()
+        return len(self._accepted) >= self.max_rate
+
+    async def _reply(self, writer, line: str):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        writer.write(line.encode('ascii') + b'\r\n')
+        await writer.drain()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Один SMTP-диалог"""
+        self.stats['connections'] += 1
+        # StreamWriter.start_tls появился в Python 3.11
+        tls_available = self.tls_context is not None and hasattr(writer, 'start_tls')
+        tls = False
+        authenticated = not self.require_auth
+        in_transaction = False
+        try:
+            await self._reply(writer, "220 localhost SMTP sink ready")
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                command = line.decode('utf-8', 'replace').strip()
+                verb = command.split(' ', 1)[0].upper()
+
+                if verb in ('EHLO', 'HELO'):
+                    extensions = ['SIZE 52428800', '8BITMIME', 'AUTH PLAIN LOGIN']
+                    if tls_available and not tls:
+                        extensions.insert(0, 'STARTTLS')
+                    if verb == 'HELO':
+                        await self._reply(writer, "250 localhost")
+                    else:
+                        lines = ['localhost'] + extensions
+                        for extension in lines[:-1]:
+                            writer.write(f"250-{extension}\r\n".encode('ascii'))
+                        await self._reply(writer, f"250 {lines[-1]}")
+                elif verb == 'STARTTLS':
+                    if not tls_available or tls:
+                        await self._reply(writer, "454 TLS not available")
+                        continue
+                    await self._reply(writer, "220 Ready to start TLS")
+                    await writer.start_tls(self.tls_context)
+                    tls = True
+                    self.stats['tls_handshakes'] += 1
+                elif verb == 'AUTH':
+                    parts = command.split()
+                    mechanism = parts[1].upper() if len(parts) > 1 else ''
+                    if mechanism == 'PLAIN' and len(parts) < 3:
+                        await self._reply(writer, "334 ")
+                        await reader.readline()
+                    elif mechanism == 'LOGIN':
+                        if len(parts) < 3:
+                            await self._reply(writer, "334 VXNlcm5hbWU6")
+                            await reader.readline()
+                        await self._reply(writer, "334 UGFzc3dvcmQ6")
+                        await reader.readline()
+                    elif mechanism != 'PLAIN':
+                        await self._reply(writer, "504 Unrecognized authentication type")
+                        continue
+                    authenticated = True
+                    self.stats['auths'] += 1
+                    await self._reply(writer, "235 Authentication successful")
+                elif verb == 'MAIL':
+                    if not authenticated:
+                        await self._reply(writer, "530 Authentication required")
+                        continue
+                    in_transaction = True
+                    await self._reply(writer, "250 OK")
+                elif verb == 'RCPT':
+                    if not in_transaction:
+                        await self._reply(writer, "503 Need MAIL command")
+                    elif self.close_rate and self.random.random() < self.close_rate:
+                        self.stats['closed'] += 1
+                        await self._reply(writer, "421 Service not available, closing transmission channel")
+                        return
+                    elif self._over_rate() or self.random.random() < self.throttle_rate:
+                        self.stats['throttled'] += 1
+                        await self._reply(writer, "451 Too many messages, slow down")
+                    else:
+                        await self._reply(writer, "250 OK")
+                elif verb == 'DATA':
+                    await self._reply(writer, "354 End data with <CR><LF>.<CR><LF>")
+                    size = 0
+                    while True:
+                        data_line = await reader.readline()
+                        if not data_line:
+                            return
+                        if data_line == b'.\r\n':
+                            break
+                        size += len(data_line)
+                    in_transaction = False
+                    if self.random.random() < self.disconnect_rate:
+                        self.stats['disconnects'] += 1
+                        return
+                    self.stats['messages'] += 1
+                    self.stats['bytes'] += size
+                    self._accepted.append(time.monotonic())
+                    await self._reply(writer, "250 OK: queued")
+                elif verb == 'RSET':
+                    in_transaction = False
+                    await self._reply(writer, "250 OK")
+                elif verb == 'NOOP':
+                    await self._reply(writer, "250 OK")
+                elif verb == 'QUIT':
+                    await self._reply(writer, "221 Bye")
+                    break
+                else:
+                    await self._reply(writer, "502 Command not implemented")
+        except (ConnectionError, ssl.SSLError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self):
+        self._server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self._server
+
+    def start_in_thread(self) -> 'SMTPSink':
+        """Запуск сервера в фоновом потоке (port=0 — любой свободный порт)"""
+        started = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.start())
+            started.set()
+            self._loop.run_forever()
+
+        threading.Thread(target=run, name='smtp-sink', daemon=True).start()
+        started.wait()
+        return self
+
+    def stop(self):
+        if self._loop is not None and self._server is not None:
+            self._loop.call_soon_threadsafe(self._server.close)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Локальный SMTP-сервер для тестирования рассылки")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=2525)
+    parser.add_argument('--no-tls', action='store_true', help="без STARTTLS")
+    parser.add_argument('--latency', type=float, default=0.0, help="задержка ответа, с")
+    parser.add_argument('--max-rate', type=float, default=0.0, help="писем в секунду до ответов 451")
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help="доля случайных ответов 451")
+    parser.add_argument('--close-rate', type=float, default=0.0, help="доля ответов 421 с закрытием соединения")
+    parser.add_argument('--disconnect-rate', type=float, default=0.0, help="доля обрывов соединения")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    sink = SMTPSink(
+        args.host, args.port, tls_context=None if args.no_tls else make_tls_context(),
+        latency=args.latency, max_rate=args.max_rate, throttle_rate=args.throttle_rate,
+        disconnect_rate=args.disconnect_rate, close_rate=args.close_rate
+    )
+
+    async def serve():
+        server = await sink.start()
+        print(f"✓ SMTP sink: {args.host}:{sink.port} (STARTTLS: {'да' if sink.tls_context else 'нет'})")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        print(f"\nОстановлен. Статистика: {sink.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Временный рабочий каталог: относительные пути из Config указывают в него"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def smtp_sink():
+    """Фабрика локальных SMTP-серверов (SMTPSink) на свободных портах"""
+    from smtp_sink import SMTPSink
+
+    sinks = []
+
+    def start(**options):
+        sink = SMTPSink(port=0, seed=0, **options).start_in_thread()
+        sinks.append(sink)
+        return sink
+
+    yield start
+    for sink in sinks:
+        sink.stop()
+
+
+@pytest.fixture
+def smtp_config(monkeypatch):
+    """Настройки рассылки для локального сервера: один аккаунт, без TLS и долгих пауз"""
+    from config import Config
+    from rate_limiter import RateLimiter
+
+    settings = {
+        'SENDER_EMAIL': 'sender@example.com',
+        'SENDER_PASSWORD': 'password',
+        'SMTP_SERVER': '127.0.0.1',
+        # Порт задает тест (порт запущенного SMTPSink)
+        'SMTP_PORT': Config.SMTP_PORT,
+        'SMTP_SECURITY': 'none',
+        'SMTP_TIMEOUT': 5.0,
+        'SMTP_RATE_PER_SECOND': 1000.0,
+        'SMTP_RATE_PER_HOUR': 0,
+        'SMTP_BACKOFF_BASE': 0.01,
+        'SMTP_BACKOFF_MAX': 0.05,
+        'SMTP_ACCOUNTS': '',
+        'SMTP_ACCOUNTS_FILE': '',
+        'SMTP_WORKERS': 2,
+        'EMAIL_GROUP_BY_RECIPIENT': False,
+    }
+    for name, value in settings.items():
+        monkeypatch.setattr(Config, name, value)
+    RateLimiter.clear_shared()
+    yield Config
+    RateLimiter.clear_shared()
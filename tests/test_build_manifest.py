@@ -0,0 +1,167 @@
+import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from build_manifest import BuildManifest
+from config import Config
+from participant import Participant
+from participants_handler import ParticipantsHandler
+
+TEMPLATES_DIR = Path(__file__).resolve().parent.parent / 'templates'
+
+
+@pytest.fixture
+def manifest(workdir):
+    return BuildManifest(workdir / 'manifest.json')
+
+
+def test_is_current_requires_same_hashes_and_pdf(manifest, workdir):
+    pdf_path = workdir / 'a.pdf'
+    pdf_path.write_bytes(b'%PDF')
+    manifest.record('CERT-1', 'inputs', 'template', pdf_path)
+
+    assert manifest.is_current('CERT-1', 'inputs', 'template', pdf_path)
+    assert not manifest.is_current('CERT-1', 'changed', 'template', pdf_path)
+    assert not manifest.is_current('CERT-1', 'inputs', 'changed', pdf_path)
+    assert not manifest.is_current('CERT-2', 'inputs', 'template', pdf_path)
+
+    pdf_path.unlink()
+    assert not manifest.is_current('CERT-1', 'inputs', 'template', pdf_path)
+
+
+def test_save_and_load_round_trip(manifest, workdir):
+    manifest.record('CERT-1', 'inputs', 'template', workdir / 'a.pdf')
+    manifest.save()
+
+    assert BuildManifest(manifest.path).entries == manifest.entries
+
+
+def test_corrupted_manifest_is_empty(workdir):
+    path = workdir / 'manifest.json'
+    path.write_text('{не json', encoding='utf-8')
+
+    assert BuildManifest(path).entries == {}
+
+
+def test_discard(manifest, workdir):
+    manifest.record('CERT-1', 'inputs', 'template', workdir / 'a.pdf')
+    manifest.discard('CERT-1')
+    manifest.discard('CERT-missing')
+
+    assert manifest.entries == {}
+
+
+class TestIncrementalBuild:
+    """Отбор устаревших сертификатов в CertificateGenerator (рендеринг подменяется записью файла)"""
+
+    @pytest.fixture
+    def generator(self, workdir, monkeypatch):
+        try:
+            from certificate_generator import CertificateGenerator
+        except (ImportError, OSError) as e:
+            pytest.skip(f"WeasyPrint недоступен: {e}")
+
+        monkeypatch.setattr(Config, 'TEMPLATES_DIR', TEMPLATES_DIR)
+        monkeypatch.setattr(Config, 'PDF_OUTPUT_DIR', workdir / 'certificates')
+        monkeypatch.setattr(Config, 'CERTIFICATE_ENGINE', 'html')
+        monkeypatch.setattr(Config, 'CERTIFICATE_SIGNING_KEY', '')
+        Config.PDF_OUTPUT_DIR.mkdir()
+
+        generator = CertificateGenerator()
+        generator.rendered = []
+
+        def create_certificate(participant, save_qr=True, **kwargs):
+            certificate_id = generator.prepare_participant(participant)
+            pdf_path = generator.get_pdf_path(participant, certificate_id)
+            pdf_path.write_bytes(b'%PDF')
+            participant['certificate_id'] = certificate_id
+            participant['pdf_path'] = pdf_path
+            generator.rendered.append(certificate_id)
+            return {'participant': participant, 'pdf_path': pdf_path, 'status': 'success'}
+
+        monkeypatch.setattr(generator, 'create_certificate', create_certificate)
+        return generator
+
+    @staticmethod
+    def participants(date_completed='2025-01-01'):
+        return [
+            Participant(1, 'Иван', 'Петров', 'Иван Петров', 'ivan@example.com', 'Python', 40, date_completed),
+            Participant(2, 'Анна', 'Смирнова', 'Анна Смирнова', 'anna@example.com', 'SQL', 20, date_completed),
+        ]
+
+    def build(self, generator, manifest, participants, force=False):
+        return list(generator.create_certificates(participants, workers=1, manifest=manifest, force=force))
+
+    def test_unchanged_participants_are_skipped(self, generator, manifest):
+        first = self.build(generator, manifest, self.participants())
+        second = self.build(generator, manifest, self.participants())
+
+        assert [result.get('skipped') for result in first] == [None, None]
+        assert [result.get('skipped') for result in second] == [True, True]
+        assert len(generator.rendered) == 2
+        assert all(result['participant']['certificate_id'] for result in second)
+
+    def test_changed_and_forced_are_rebuilt(self, generator, manifest):
+        self.build(generator, manifest, self.participants())
+        changed = self.participants()
+        changed[1]['hours'] = 36
+
+        assert [result.get('skipped') for result in self.build(generator, manifest, changed)] == [True, None]
+        assert [result.get('skipped') for result in self.build(generator, manifest, changed, force=True)] == [None, None]
+
+    @staticmethod
+    def travel_to_tomorrow(monkeypatch):
+        tomorrow = datetime.datetime.now() + datetime.timedelta(days=1)
+
+        class Tomorrow(datetime.datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return tomorrow
+
+        monkeypatch.setattr('certificate_generator.datetime', SimpleNamespace(datetime=Tomorrow))
+
+    def test_missing_date_is_stable_across_days(self, generator, manifest, monkeypatch):
+        self.build(generator, manifest, self.participants(date_completed=None))
+
+        self.travel_to_tomorrow(monkeypatch)
+        results = self.build(generator, manifest, self.participants(date_completed=None))
+
+        assert [result.get('skipped') for result in results] == [True, True]
+
+    def test_missing_date_is_stable_after_deduplication(self, generator, manifest, monkeypatch):
+        """Путь main.py: дедупликация вычисляет ID до сборки и не должна подставлять дату"""
+        def run():
+            participants, _ = ParticipantsHandler.deduplicate(
+                self.participants(date_completed=None), generator.identify_participant, mode='report'
+            )
+            assert all(participant['date_completed'] is None for participant in participants)
+            return [result.get('skipped') for result in self.build(generator, manifest, participants)]
+
+        assert run() == [None, None]
+        assert run() == [True, True]
+        self.travel_to_tomorrow(monkeypatch)
+        assert run() == [True, True]
+
+    def test_failed_render_discards_entry(self, generator, manifest, monkeypatch):
+        self.build(generator, manifest, self.participants())
+        changed = self.participants()
+        changed[0]['hours'] = 80
+        monkeypatch.setattr(generator, 'create_certificate',
+                            lambda participant, **kwargs: {'participant': participant, 'status': 'error',
+                                                           'error': 'сбой рендеринга'})
+
+        results = self.build(generator, manifest, changed)
+
+        assert [result['status'] for result in results] == ['error', 'success']
+        assert len(manifest.entries) == 1
+        assert 'certificate_id' not in changed[0]
+
+    def test_csv_without_dates_gets_today(self, generator, manifest, workdir):
+        path = workdir / 'participants.csv'
+        path.write_text('Имя,Фамилия,Email\nИван,Петров,ivan@example.com\n', encoding='utf-8')
+
+        result, = self.build(generator, manifest, ParticipantsHandler.import_from_csv(str(path)))
+
+        assert result['participant']['date_completed'] == datetime.datetime.now().strftime('%Y-%m-%d')
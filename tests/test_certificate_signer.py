@@ -0,0 +1,56 @@
+import pytest
+
+from certificate_signer import CertificateSigner
+
+
+@pytest.fixture
+def signer():
+    return CertificateSigner('секретный ключ')
+
+
+def test_sign_and_verify(signer):
+    certificate_id = signer.sign('CERT-0123456789AB')
+
+    assert certificate_id.startswith('CERT-0123456789AB-')
+    assert len(certificate_id.rpartition('-')[2]) == 16
+    assert signer.verify(certificate_id)
+    assert signer.sign('CERT-0123456789AB') == certificate_id
+
+
+@pytest.mark.parametrize('certificate_id', [
+    'CERT-0123456789AB',
+    'CERT-0123456789AC-AAAAAAAAAAAAAAAA',
+    '',
+    '-ABC',
+    None,
+])
+def test_rejects_unsigned_and_forged(signer, certificate_id):
+    assert not signer.verify(certificate_id)
+
+
+def test_tampered_id_is_rejected(signer):
+    certificate_id = signer.sign('CERT-0123456789AB')
+
+    assert not signer.verify(certificate_id.replace('CERT-0', 'CERT-1'))
+    assert not signer.verify(certificate_id[:-1] + ('A' if certificate_id[-1] != 'A' else 'B'))
+
+
+def test_other_key_is_rejected(signer):
+    certificate_id = CertificateSigner(b'other key').sign('CERT-0123456789AB')
+
+    assert not signer.verify(certificate_id)
+
+
+def test_verify_many_matches_verify(signer):
+    ids = [signer.sign(f"CERT-{index:012X}") for index in range(50)]
+    ids[10] = ids[10][:-2] + 'AA'
+    ids.append('CERT-0123456789AB')
+
+    assert signer.verify_many(ids) == [signer.verify(certificate_id) for certificate_id in ids]
+    assert signer.verify_many(iter(ids[:3])) == [True, True, True]
+    assert signer.verify_many(ids).count(False) == 2
+
+
+def test_empty_key():
+    with pytest.raises(ValueError):
+        CertificateSigner('')
@@ -0,0 +1,73 @@
+import pytest
+
+from email_outbox import EmailOutbox
+from email_sender import EmailSender
+from participant import Participant
+
+
+def make_participants(directory, count):
+    pdf_path = directory / 'certificate.pdf'
+    pdf_path.write_bytes(b'%PDF-1.4 test')
+    participants = []
+    for index in range(count):
+        participant = Participant(index + 1, 'Иван', 'Петров', f'Иван Петров {index}', f'user{index}@example.com',
+                                  'Python', 40, '2025-01-01')
+        participant['certificate_id'] = f'CERT-{index:012X}'
+        participant['pdf_path'] = pdf_path
+        participants.append(participant)
+    return participants
+
+
+@pytest.fixture
+def outbox_path(workdir):
+    return workdir / 'outbox.db'
+
+
+def test_statuses_are_saved_in_batches(workdir, outbox_path):
+    participants = make_participants(workdir, 3)
+    with EmailOutbox(outbox_path, batch_size=2) as outbox:
+        outbox.enqueue(participants)
+        outbox.mark(participants[0], True)
+        assert not EmailOutbox(outbox_path).is_sent(participants[0]['certificate_id'])
+
+        outbox.mark(participants[1], False, 'ошибка')
+        assert EmailOutbox(outbox_path).is_sent(participants[0]['certificate_id'])
+        assert outbox.counts() == {'sent': 1, 'failed': 1, 'pending': 1}
+
+    with EmailOutbox(outbox_path) as outbox:
+        outbox.enqueue(participants)
+        assert outbox.sent_ids() == {participants[0]['certificate_id']}
+        assert outbox.counts() == {'sent': 1, 'failed': 1, 'pending': 1}
+
+
+def test_resume_sends_only_remaining(workdir, outbox_path, smtp_sink, smtp_config):
+    sink = smtp_sink()
+    smtp_config.SMTP_PORT = sink.port
+    participants = make_participants(workdir, 20)
+    # Вложение одного письма недоступно: оно завершится ошибкой
+    participants[3]['pdf_path'] = workdir / 'missing.pdf'
+
+    # Первый запуск прерван после 12 участников
+    with EmailOutbox(outbox_path) as outbox:
+        assert EmailSender.send_emails_to_all(participants[:12], outbox=outbox) == (11, 1)
+    assert sink.stats['messages'] == 11
+
+    participants[3]['pdf_path'] = participants[0]['pdf_path']
+    with EmailOutbox(outbox_path) as outbox:
+        assert EmailSender.send_emails_to_all(participants, outbox=outbox, resume=True) == (20, 0)
+        assert outbox.counts() == {'sent': 20}
+
+    # Повторно уходят только неудачное письмо и не отправленные ранее
+    assert sink.stats['messages'] == 20
+
+
+def test_without_resume_everything_is_sent_again(workdir, outbox_path, smtp_sink, smtp_config):
+    sink = smtp_sink()
+    smtp_config.SMTP_PORT = sink.port
+    participants = make_participants(workdir, 5)
+
+    with EmailOutbox(outbox_path) as outbox:
+        EmailSender.send_emails_to_all(participants, outbox=outbox)
+        EmailSender.send_emails_to_all(participants, outbox=outbox)
+
+    assert sink.stats['messages'] == 10
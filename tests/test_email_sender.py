@@ -0,0 +1,193 @@
+import smtplib
+import socket
+
+import pytest
+
+from email_outbox import EmailOutbox
+from email_sender import EmailSender, SMTPConnectionFailed, SMTPSession, ShardedSession
+from message_builder import CertificateMessageBuilder
+from participant import Participant
+from smtp_accounts import AccountPool, SMTPAccount
+
+
+def make_participant(id, email, course='Python', pdf_path=None):
+    participant = Participant(id, 'Иван', 'Петров', 'Иван Петров', email, course, 40, '2025-01-01')
+    participant['certificate_id'] = f'CERT-{id:012X}'
+    if pdf_path is not None:
+        participant['pdf_path'] = pdf_path
+    return participant
+
+
+@pytest.fixture
+def pdf_path(workdir):
+    path = workdir / 'certificate.pdf'
+    path.write_bytes(b'%PDF-1.4 test')
+    return path
+
+
+class TestGroupByRecipient:
+    def test_groups_by_normalized_email_in_order(self):
+        participants = [
+            make_participant(1, 'ivan@example.com'),
+            make_participant(2, 'anna@example.com'),
+            make_participant(3, ' IVAN@Example.com '),
+            make_participant(4, 'anna@example.com', course='SQL'),
+        ]
+
+        groups = EmailSender.group_by_recipient(participants)
+
+        assert [[p['ID'] for p in group] for group in groups] == [[1, 3], [2, 4]]
+
+    def test_participants_without_email_are_not_grouped(self):
+        participants = [
+            make_participant(1, ''),
+            make_participant(2, '  '),
+            make_participant(3, None),
+            make_participant(4, 'ivan@example.com'),
+        ]
+
+        groups = EmailSender.group_by_recipient(participants)
+
+        assert [[p['ID'] for p in group] for group in groups] == [[1], [2], [3], [4]]
+
+    def test_group_email_goes_to_normalized_address(self, pdf_path, monkeypatch):
+        calls = []
+
+        def send_email_with_attachments(recipient, subject, body, paths, session=None):
+            calls.append((recipient, paths))
+            return True
+
+        monkeypatch.setattr(EmailSender, 'send_email_with_attachments', send_email_with_attachments)
+        group = [make_participant(1, ' IVAN@Example.com ', pdf_path=pdf_path),
+                 make_participant(2, 'ivan@example.com', course='SQL', pdf_path=pdf_path)]
+
+        assert EmailSender.send_group_email(group, as_zip=False)
+        assert calls == [('ivan@example.com', [pdf_path, pdf_path])]
+
+    @pytest.mark.parametrize('as_zip', [False, True])
+    def test_send_grouped(self, workdir, smtp_sink, smtp_config, monkeypatch, as_zip):
+        sink = smtp_sink()
+        smtp_config.SMTP_PORT = sink.port
+        monkeypatch.setattr(smtp_config, 'EMAIL_GROUP_ZIP', as_zip)
+        participants = []
+        for id, email in enumerate(['ivan@example.com', 'IVAN@example.com', 'anna@example.com'], start=1):
+            path = workdir / f'certificate_{id}.pdf'
+            path.write_bytes(b'%PDF-1.4 test')
+            participants.append(make_participant(id, email, course=f'Курс {id}', pdf_path=path))
+
+        assert EmailSender.send_emails_to_all(participants, group=True) == (3, 0)
+        assert sink.stats['messages'] == 2
+
+    def test_missing_pdf_fails_only_its_group(self, workdir, smtp_sink, smtp_config, monkeypatch):
+        sink = smtp_sink()
+        smtp_config.SMTP_PORT = sink.port
+        monkeypatch.setattr(smtp_config, 'EMAIL_GROUP_ZIP', True)
+        participants = []
+        for id, email in enumerate(['ivan@example.com', 'ivan@example.com', 'anna@example.com',
+                                    'anna@example.com'], start=1):
+            path = workdir / f'certificate_{id}.pdf'
+            path.write_bytes(b'%PDF-1.4 test')
+            participants.append(make_participant(id, email, course=f'Курс {id}', pdf_path=path))
+        participants[1]['pdf_path'].unlink()
+
+        with EmailOutbox(workdir / 'outbox.db') as outbox:
+            assert EmailSender.send_emails_to_all(participants, outbox=outbox, group=True) == (2, 2)
+            assert outbox.counts() == {'sent': 2, 'failed': 2}
+        assert sink.stats['messages'] == 1
+
+    def test_unexpected_error_does_not_abort_sending(self, pdf_path, smtp_config, monkeypatch, workdir):
+        participants = [make_participant(id, f'user{id}@example.com', pdf_path=pdf_path) for id in range(1, 6)]
+
+        def send_group_email(group, session=None, as_zip=None):
+            if group[0]['ID'] == 3:
+                raise RuntimeError('сбой')
+            return True
+
+        monkeypatch.setattr(EmailSender, 'send_group_email', send_group_email)
+        with EmailOutbox(workdir / 'outbox.db') as outbox:
+            assert EmailSender.send_emails_to_all(participants, outbox=outbox) == (4, 1)
+            assert outbox.counts() == {'sent': 4, 'failed': 1}
+
+
+def free_port() -> int:
+    """Порт, на котором никто не слушает"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class TestShardedSession:
+    RECIPIENTS = [f'user{index}@example.com' for index in range(40)]
+
+    @staticmethod
+    def sink_account(email, sink):
+        return SMTPAccount(email, 'password', server='127.0.0.1', port=sink.port, security='none')
+
+    @staticmethod
+    def deliver_all(session, pdf_path, recipients):
+        for recipient in recipients:
+            session.deliver(recipient, lambda sender, recipient=recipient: CertificateMessageBuilder(sender).build(
+                recipient, 'Сертификат', 'Текст', pdf_path))
+
+    def test_fails_over_to_healthy_account(self, pdf_path, smtp_sink, smtp_config):
+        healthy = smtp_sink()
+        throttled = smtp_sink(throttle_rate=1.0)
+        closing = smtp_sink(close_rate=1.0)
+        pool = AccountPool([
+            self.sink_account('healthy@example.com', healthy),
+            self.sink_account('throttled@example.com', throttled),
+            self.sink_account('closing@example.com', closing),
+            SMTPAccount('refused@example.com', server='127.0.0.1', port=free_port(), security='none'),
+            SMTPAccount('unknown@example.com', server='nonexistent.invalid', port=25, security='none'),
+        ], cooldown=60)
+
+        with ShardedSession(pool) as session:
+            self.deliver_all(session, pdf_path, self.RECIPIENTS)
+
+        assert healthy.stats['messages'] == len(self.RECIPIENTS)
+        assert pool.sent == {account.key: len(self.RECIPIENTS) if account.email == 'healthy@example.com' else 0
+                             for account in pool.accounts}
+        assert throttled.stats['throttled'] and closing.stats['closed']
+        # Все неисправные аккаунты приостановлены, исправный — первый кандидат для всех
+        assert all(pool.candidates(recipient)[0].email == 'healthy@example.com' for recipient in self.RECIPIENTS)
+
+    def test_auth_error_disables_account(self, pdf_path, smtp_sink, smtp_config, monkeypatch):
+        sink = smtp_sink()
+        pool = AccountPool([self.sink_account('a@example.com', sink), self.sink_account('b@example.com', sink)])
+        connect = EmailSender._connect
+
+        def reject_b(account=None):
+            if account.email == 'b@example.com':
+                raise smtplib.SMTPAuthenticationError(535, b'invalid credentials')
+            return connect(account)
+
+        monkeypatch.setattr(EmailSender, '_connect', staticmethod(reject_b))
+        with ShardedSession(pool) as session:
+            self.deliver_all(session, pdf_path, self.RECIPIENTS)
+
+        assert sink.stats['messages'] == len(self.RECIPIENTS)
+        assert [account.email for account in pool.candidates('ivan@example.com')] == ['a@example.com']
+
+    def test_recipient_refusal_does_not_suspend_account(self, pdf_path, smtp_config, monkeypatch):
+        pool = AccountPool([SMTPAccount('a@example.com'), SMTPAccount('b@example.com')], cooldown=60)
+        used = []
+
+        def send(session, message, attempts=None):
+            used.append(session.account.email)
+            raise smtplib.SMTPRecipientsRefused({message.to_addrs[0]: (450, b'mailbox busy')})
+
+        monkeypatch.setattr(SMTPSession, 'send', send)
+        with ShardedSession(pool) as session, pytest.raises(smtplib.SMTPRecipientsRefused):
+            self.deliver_all(session, pdf_path, ['ivan@example.com'])
+
+        assert len(used) == 1
+        assert pool.candidates('ivan@example.com') == pool.ring_order('ivan@example.com')
+
+    def test_connection_failure_is_wrapped(self, smtp_config):
+        smtp_config.SMTP_PORT = free_port()
+
+        with SMTPSession() as session, pytest.raises(SMTPConnectionFailed) as error:
+            session.send(CertificateMessageBuilder().build_many('ivan@example.com', 'Тема', 'Текст', []), attempts=1)
+
+        assert isinstance(error.value.error, ConnectionRefusedError)
+        assert SMTPSession.is_transient(error.value)
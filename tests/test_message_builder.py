@@ -0,0 +1,81 @@
+import email
+import os
+from email import policy
+
+import pytest
+
+from email_sender import SMTPSession
+from message_builder import CertificateMessageBuilder, StreamingMessage
+
+SUBJECT = 'Ваш сертификат: очень длинное название курса про проектирование распределенных систем'
+BODY = 'Уважаемый Иван Петров!\n.строка с точкой\nС наилучшими пожеланиями'
+
+
+@pytest.fixture
+def pdf_path(workdir):
+    path = workdir / 'Сертификат_Иван Петров_CERT-0123456789AB.pdf'
+    # Больше одной части кодирования, длина не кратна строке base64
+    path.write_bytes(os.urandom(StreamingMessage.LINE_BYTES * StreamingMessage.CHUNK_LINES * 3 + 11))
+    return path
+
+
+def parse(message: StreamingMessage):
+    return email.message_from_bytes(message.as_bytes(), policy=policy.default)
+
+
+def test_round_trip(pdf_path):
+    message = CertificateMessageBuilder('sender@example.com').build('ivan@example.com', SUBJECT, BODY, pdf_path)
+    parsed = parse(message)
+
+    assert message.from_addr == 'sender@example.com'
+    assert message.to_addrs == ['ivan@example.com']
+    assert parsed['From'] == 'sender@example.com'
+    assert parsed['To'] == 'ivan@example.com'
+    assert parsed['Subject'] == SUBJECT
+    assert parsed.get_body().get_content() == BODY
+
+    attachments = list(parsed.iter_attachments())
+    assert len(attachments) == 1
+    assert attachments[0].get_filename() == pdf_path.name
+    assert attachments[0].get_content_type() == 'application/pdf'
+    assert attachments[0].get_content() == pdf_path.read_bytes()
+
+
+def test_several_attachments(pdf_path, workdir):
+    empty_path = workdir / 'пустой.pdf'
+    empty_path.write_bytes(b'')
+    message = CertificateMessageBuilder('sender@example.com').build_many(
+        'ivan@example.com', SUBJECT, BODY, [pdf_path, empty_path]
+    )
+
+    attachments = list(parse(message).iter_attachments())
+
+    assert [part.get_filename() for part in attachments] == [pdf_path.name, empty_path.name]
+    assert [part.get_content() for part in attachments] == [pdf_path.read_bytes(), b'']
+
+
+def test_wire_format(pdf_path):
+    message = CertificateMessageBuilder('sender@example.com').build('ivan@example.com', SUBJECT, BODY, pdf_path)
+    raw = message.as_bytes()
+    lines = raw.split(b'\r\n')
+
+    assert b''.join(message.iter_chunks()) == raw
+    assert raw.endswith(b'\r\n')
+    assert b'\n' not in raw.replace(b'\r\n', b'')
+    # Предел длины строки RFC 5321; строки base64 — 76 символов
+    assert max(len(line) for line in lines) <= 998
+    encoded = b''.join(message.iter_attachment(pdf_path)).split(b'\r\n')
+    assert all(len(line) == 76 for line in encoded[:-2])
+    assert not any(line.startswith(b'.') for line in lines)
+
+
+def test_sent_through_session(pdf_path, smtp_sink, smtp_config):
+    sink = smtp_sink()
+    smtp_config.SMTP_PORT = sink.port
+    message = CertificateMessageBuilder('sender@example.com').build('ivan@example.com', SUBJECT, BODY, pdf_path)
+
+    with SMTPSession() as session:
+        session.send(message)
+
+    assert sink.stats['messages'] == 1
+    assert sink.stats['bytes'] == len(message.as_bytes())
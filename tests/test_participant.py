@@ -0,0 +1,85 @@
+import pickle
+
+import pandas as pd
+import pytest
+
+from participant import Participant
+from participants_handler import ParticipantsHandler
+
+
+def make_participant():
+    return Participant(1, 'Иван', 'Петров', 'Иван Петров', 'ivan@example.com', 'Python', 40, '2025-01-01')
+
+
+def test_behaves_like_dict():
+    participant = make_participant()
+
+    assert participant['full_name'] == 'Иван Петров'
+    assert list(participant) == ['ID', 'Имя', 'Фамилия', 'full_name', 'Email', 'course_name', 'hours',
+                                 'date_completed']
+    assert 'certificate_id' not in participant
+    assert participant.get('certificate_id', 'нет') == 'нет'
+    with pytest.raises(KeyError):
+        participant['certificate_id']
+
+    participant['certificate_id'] = 'CERT-1'
+    participant['note'] = 'вне схемы'
+    assert participant['certificate_id'] == 'CERT-1'
+    assert participant.extra == {'note': 'вне схемы'}
+    assert len(participant) == 10
+
+    del participant['note']
+    del participant['certificate_id']
+    assert 'note' not in participant
+    with pytest.raises(KeyError):
+        del participant['certificate_id']
+
+
+def test_from_dict_round_trip():
+    data = dict(make_participant(), pdf_path='a.pdf', note='вне схемы')
+
+    assert Participant.from_dict(data).to_dict() == data
+
+
+def test_pickle_round_trip():
+    participant = make_participant()
+    participant['certificate_id'] = 'CERT-1'
+    participant['note'] = 'вне схемы'
+
+    restored = pickle.loads(pickle.dumps(participant))
+
+    assert restored.to_dict() == participant.to_dict()
+    assert restored.extra == {'note': 'вне схемы'}
+
+
+def test_normalize_frame_maps_columns_to_fields():
+    frame = pd.DataFrame({
+        'Имя': ['Иван', 'Анна'],
+        'Фамилия': ['Петров', 'Смирнова'],
+        'Отчество': ['Сергеевич', None],
+        'Email': [' ivan@example.com', 'anna@example.com'],
+        'Курс': ['SQL', None],
+        'Часы': ['36', 'много'],
+        'Дата_завершения': ['2025-01-01', None],
+    })
+
+    first, second = ParticipantsHandler._normalize_frame(frame)
+
+    assert first.to_dict() == {
+        'ID': 1, 'Имя': 'Иван', 'Фамилия': 'Петров', 'full_name': 'Иван Сергеевич Петров',
+        'Email': 'ivan@example.com', 'course_name': 'SQL', 'hours': 36, 'date_completed': '2025-01-01',
+    }
+    assert second['full_name'] == 'Анна Смирнова'
+    assert second['course_name'] == 'Основы Python'
+    assert second['hours'] == 40
+    assert second['date_completed'] is None
+
+
+def test_csv_without_date_column(workdir):
+    path = workdir / 'participants.csv'
+    path.write_text('Имя,Фамилия,Email\nИван,Петров,ivan@example.com\n', encoding='utf-8')
+
+    participant, = ParticipantsHandler.import_from_csv(str(path))
+
+    # Пустая дата заменяется текущей при подготовке сертификата
+    assert participant['date_completed'] is None
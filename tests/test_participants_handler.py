@@ -0,0 +1,128 @@
+import hashlib
+
+import pytest
+
+from participant import Participant
+from participants_handler import ParticipantsHandler
+
+
+def certificate_id(participant):
+    """ID по имени и курсу (как в генераторе), с солью при ее наличии"""
+    data = f"{participant['full_name']}_{participant['course_name']}_{participant.get('certificate_id_salt', '')}"
+    return 'CERT-' + hashlib.sha256(data.encode()).hexdigest()[:12].upper()
+
+
+def make_participant(id, full_name, email, course='Python'):
+    return Participant(id, '', '', full_name, email, course, 40, '2025-01-01')
+
+
+@pytest.fixture
+def participants():
+    return [
+        make_participant(1, 'Иван Петров', 'ivan@example.com'),
+        make_participant(2, ' иван  ПЕТРОВ ', 'IVAN@example.com '),
+        make_participant(3, 'Иван Петров', 'petrov@example.com'),
+        make_participant(4, 'Иван Петров', 'ivan@example.com', course='SQL'),
+    ]
+
+
+class TestDeduplicate:
+    """Участник 2 — дубликат участника 1, у участника 3 тот же ID при другом email"""
+
+    def test_report_keeps_everyone(self, participants):
+        result, report = ParticipantsHandler.deduplicate(participants, certificate_id, mode='report')
+
+        assert [p['ID'] for p in result] == [1, 2, 3, 4]
+        assert [(d['ID'], d['first_ID']) for d in report['duplicates']] == [(2, 1)]
+        assert [c['ID'] for c in report['collisions']] == [3]
+        assert 'certificate_id_salt' not in participants[2]
+
+    def test_drop_removes_duplicates_and_collisions(self, participants):
+        result, report = ParticipantsHandler.deduplicate(participants, certificate_id, mode='drop')
+
+        assert [p['ID'] for p in result] == [1, 4]
+        assert len(report['duplicates']) == 1
+        assert len(report['collisions']) == 1
+
+    def test_disambiguate_gives_unique_ids(self, participants):
+        result, _ = ParticipantsHandler.deduplicate(participants, certificate_id, mode='disambiguate')
+
+        ids = [certificate_id(p) for p in result]
+        assert [p['ID'] for p in result] == [1, 2, 3, 4]
+        assert len(set(ids)) == 4
+        assert result[1]['certificate_id_salt'] == '#2'
+        assert result[2]['certificate_id_salt'] == 'petrov@example.com'
+        assert 'certificate_id_salt' not in result[0]
+
+    def test_stream_is_lazy(self, participants):
+        report = {}
+        stream = ParticipantsHandler.iter_deduplicated(iter(participants), certificate_id, 'drop', report)
+
+        assert next(stream)['ID'] == 1
+        assert report['duplicates'] == []
+
+    def test_identity_uses_fields_filled_by_id_func(self):
+        def fill_and_identify(participant):
+            if 'full_name' not in participant:
+                participant['full_name'] = f"{participant['Имя']} {participant['Фамилия']}"
+            return certificate_id(participant)
+
+        rows = [
+            Participant.from_dict({'ID': 1, 'Имя': 'Иван', 'Фамилия': 'Петров', 'Email': 'family@example.com',
+                                   'course_name': 'Python'}),
+            Participant.from_dict({'ID': 2, 'Имя': 'Анна', 'Фамилия': 'Петрова', 'Email': 'family@example.com',
+                                   'course_name': 'Python'}),
+            Participant.from_dict({'ID': 3, 'Имя': 'Иван', 'Фамилия': 'Петров', 'Email': 'family@example.com',
+                                   'course_name': 'Python'}),
+        ]
+        report = {}
+
+        result = list(ParticipantsHandler.iter_deduplicated(iter(rows), fill_and_identify, 'drop', report))
+
+        assert [p['ID'] for p in result] == [1, 2]
+        assert [(d['ID'], d['first_ID']) for d in report['duplicates']] == [(3, 1)]
+
+    def test_unknown_mode(self, participants):
+        with pytest.raises(ValueError):
+            ParticipantsHandler.deduplicate(participants, certificate_id, mode='merge')
+
+
+class TestBulkRoster:
+    SIZE = 10000
+
+    def test_frame_is_reproducible(self):
+        first = ParticipantsHandler.generate_bulk_frame(100, seed=7, base_date='2025-01-01')
+        second = ParticipantsHandler.generate_bulk_frame(100, seed=7, base_date='2025-01-01')
+        other = ParticipantsHandler.generate_bulk_frame(100, seed=8, base_date='2025-01-01')
+
+        assert first.equals(second)
+        assert not first.equals(other)
+
+    def test_slices_match_full_frame(self):
+        full = ParticipantsHandler.generate_bulk_frame(self.SIZE, seed=3, base_date='2025-01-01')
+        # Срез пересекает границу блока генерации
+        part = ParticipantsHandler.generate_bulk_frame(500, seed=3, start=8000, base_date='2025-01-01')
+
+        assert part.equals(full.iloc[8000:8500].reset_index(drop=True))
+        assert full['Email'].is_unique
+
+    @pytest.mark.parametrize('chunk_size', [997, 4096, 20000])
+    def test_output_does_not_depend_on_chunk_size(self, workdir, chunk_size):
+        expected = workdir / 'expected.csv'
+        ParticipantsHandler.write_bulk_participants(expected, self.SIZE, seed=1, chunk_size=self.SIZE,
+                                                    base_date='2025-01-01')
+        path = ParticipantsHandler.write_bulk_participants(workdir / 'roster.csv', self.SIZE, seed=1,
+                                                           chunk_size=chunk_size, base_date='2025-01-01')
+
+        assert path.read_bytes() == expected.read_bytes()
+
+    def test_parquet_matches_csv(self, workdir):
+        pytest.importorskip('pyarrow')
+        csv_path = ParticipantsHandler.write_bulk_participants(workdir / 'roster.csv', 1000, seed=5,
+                                                               chunk_size=300, base_date='2025-01-01')
+        parquet_path = ParticipantsHandler.write_bulk_participants(workdir / 'roster.parquet', 1000, seed=5,
+                                                                   chunk_size=300, base_date='2025-01-01')
+
+        from_csv = [p.to_dict() for p in ParticipantsHandler.load_file(str(csv_path))]
+        from_parquet = [p.to_dict() for p in ParticipantsHandler.load_file(str(parquet_path))]
+        assert from_parquet == from_csv
@@ -0,0 +1,63 @@
+import threading
+
+import pytest
+
+try:
+    from pipeline import CertificatePipeline
+except (ImportError, OSError) as e:
+    pytest.skip(f"WeasyPrint недоступен: {e}", allow_module_level=True)
+
+from email_sender import SMTPSessionPool
+from participant import Participant
+
+
+class RenderedGenerator:
+    """Генератор, который сразу отдает готовые результаты"""
+
+    def __init__(self, count):
+        self.count = count
+
+    def create_certificates(self, participants, **kwargs):
+        for index in range(self.count):
+            participant = Participant(index + 1, 'Иван', 'Петров', 'Иван Петров', f'user{index}@example.com',
+                                      'Python', 40, '2025-01-01')
+            yield {'participant': participant, 'status': 'error', 'error': 'не отрисован'}
+
+
+def run_in_thread(pipeline):
+    outcome = {}
+
+    def run():
+        try:
+            outcome['stats'] = pipeline.run([])
+        except Exception as e:
+            outcome['error'] = e
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(timeout=10)
+    assert not thread.is_alive(), "конвейер завис"
+    return outcome
+
+
+def test_runs_all_results(workdir, smtp_config):
+    pipeline = CertificatePipeline(RenderedGenerator(20), report_path=str(workdir / 'report.csv'), queue_size=2)
+
+    outcome = run_in_thread(pipeline)
+
+    assert outcome['stats']['render_failed'] == 20
+    assert len((workdir / 'report.csv').read_text(encoding='utf-8-sig').splitlines()) == 21
+
+
+def test_dead_email_stage_does_not_hang(workdir, smtp_config, monkeypatch):
+    def broken_get(self):
+        raise RuntimeError('нет соединения')
+
+    monkeypatch.setattr(SMTPSessionPool, 'get', broken_get)
+    monkeypatch.setattr(CertificatePipeline, 'PUT_TIMEOUT', 0.05)
+    pipeline = CertificatePipeline(RenderedGenerator(20), report_path=str(workdir / 'report.csv'), queue_size=2,
+                                   email_workers=2)
+
+    outcome = run_in_thread(pipeline)
+
+    assert isinstance(outcome.get('error'), RuntimeError)
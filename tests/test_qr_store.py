@@ -0,0 +1,43 @@
+from config import Config
+from qr_store import QRCodeStore
+
+URL = 'https://example.com/verify/CERT-0123456789AB'
+
+
+def test_disk_cache_is_opt_in(workdir, monkeypatch):
+    monkeypatch.setattr(Config, 'QR_CACHE_PERSIST', False)
+    store = QRCodeStore(workdir / 'cache', export_directory=workdir / 'export')
+
+    assert store.put(URL, 'png', b'qr') is None
+    assert store.get(URL, 'png') == b'qr'
+    assert not (workdir / 'cache').exists()
+    assert not (workdir / 'export').exists()
+    assert QRCodeStore(workdir / 'cache').get(URL, 'png') is None
+
+
+def test_persisted_codes_survive_restart(workdir):
+    QRCodeStore(workdir / 'cache', persist=True).put(URL, 'png', b'qr')
+
+    restored = QRCodeStore(workdir / 'cache', persist=True)
+
+    assert restored.get(URL, 'png') == b'qr'
+    assert restored.get(URL, 'svg') is None
+
+
+def test_export_copy(workdir):
+    store = QRCodeStore(workdir / 'cache', export_directory=workdir / 'export', persist=False)
+
+    path = store.put(URL, 'svg', b'<svg/>', save_file=True)
+
+    assert path == store.path_for(URL, 'svg', workdir / 'export')
+    assert path.read_bytes() == b'<svg/>'
+    assert not (workdir / 'cache').exists()
+
+
+def test_lru_eviction(workdir):
+    store = QRCodeStore(workdir / 'cache', cache_size=2, persist=False)
+    for index in range(3):
+        store.put(f'{URL}{index}', 'png', bytes([index]))
+
+    assert store.get(f'{URL}0', 'png') is None
+    assert store.get(f'{URL}2', 'png') == b'\x02'
@@ -0,0 +1,88 @@
+import time
+
+import pytest
+
+from rate_limiter import RateLimiter
+
+
+@pytest.fixture(autouse=True)
+def clear_shared():
+    RateLimiter.clear_shared()
+    yield
+    RateLimiter.clear_shared()
+
+
+def test_acquire_respects_rate():
+    limiter = RateLimiter(per_second=50, per_hour=0)
+
+    start = time.monotonic()
+    for _ in range(50 + 10):
+        limiter.acquire()
+    elapsed = time.monotonic() - start
+
+    # Первые 50 писем — запас бакета, остальные 10 идут со скоростью 50 писем/с
+    assert 0.15 <= elapsed < 1.0
+
+
+def test_hourly_limit():
+    limiter = RateLimiter(per_second=1000, per_hour=3)
+    for _ in range(3):
+        limiter.acquire()
+
+    assert limiter._hour_tokens < 1
+
+
+def test_throttle_and_recovery():
+    limiter = RateLimiter(per_second=8, per_hour=0)
+
+    limiter.throttled()
+    assert limiter.per_second == 4
+    # Повторный ответ в том же эпизоде скорость не снижает
+    limiter.throttled()
+    assert limiter.per_second == 4
+
+    for _ in range(RateLimiter.RECOVERY_SUCCESSES - 1):
+        limiter.succeeded()
+    assert limiter.per_second == 4
+    limiter.succeeded()
+    assert limiter.per_second == 4 * RateLimiter.RECOVERY_FACTOR
+
+    for _ in range(RateLimiter.RECOVERY_SUCCESSES * 10):
+        limiter.succeeded()
+    assert limiter.per_second == 8
+
+
+def test_throttle_after_cooldown_halves_again():
+    limiter = RateLimiter(per_second=8, per_hour=0)
+    limiter.throttled()
+    limiter._throttled_at -= RateLimiter.THROTTLE_COOLDOWN
+
+    limiter.throttled()
+
+    assert limiter.per_second == 2
+
+
+def test_throttle_has_lower_bound():
+    limiter = RateLimiter(per_second=0.2, per_hour=0)
+    for _ in range(5):
+        limiter.throttled()
+        limiter._throttled_at = None
+
+    assert limiter.per_second == limiter.min_per_second == 0.1
+
+
+def test_shared_per_account():
+    first = RateLimiter.shared('a@example.com', 5, 0)
+
+    assert RateLimiter.shared('a@example.com') is first
+    assert RateLimiter.shared('b@example.com', 5, 0) is not first
+
+
+def test_backoff_delay_is_bounded():
+    for attempt in range(1, 10):
+        assert 0 <= RateLimiter.backoff_delay(attempt, base=1, maximum=4) <= min(4, 2 ** (attempt - 1))
+
+
+def test_invalid_rate():
+    with pytest.raises(ValueError):
+        RateLimiter(per_second=0)
@@ -0,0 +1,87 @@
+import json
+
+import pytest
+
+from smtp_accounts import AccountPool, SMTPAccount
+
+RECIPIENTS = [f'user{index}@example.com' for index in range(4000)]
+
+
+def account(email, weight=1):
+    return SMTPAccount(email, server='smtp.example.com', port=587, weight=weight)
+
+
+def owners(pool):
+    return {recipient: pool.ring_order(recipient)[0].email for recipient in RECIPIENTS}
+
+
+def test_distribution_follows_weight():
+    pool = AccountPool([account('a@example.com'), account('b@example.com', weight=3)])
+
+    share = list(owners(pool).values()).count('b@example.com') / len(RECIPIENTS)
+
+    assert 0.65 < share < 0.85
+
+
+def test_adding_account_moves_only_its_share():
+    before = owners(AccountPool([account('a@example.com'), account('b@example.com')]))
+    after = owners(AccountPool([account('a@example.com'), account('b@example.com'), account('c@example.com')]))
+
+    moved = [recipient for recipient in RECIPIENTS if before[recipient] != after[recipient]]
+    assert moved
+    assert all(after[recipient] == 'c@example.com' for recipient in moved)
+    assert len(moved) < len(RECIPIENTS) / 2
+
+
+def test_ring_order_is_stable_and_complete():
+    pool = AccountPool([account('a@example.com'), account('b@example.com'), account('c@example.com')])
+
+    order = pool.ring_order('Ivan@Example.com ')
+
+    assert order == pool.ring_order('ivan@example.com')
+    assert sorted(a.email for a in order) == ['a@example.com', 'b@example.com', 'c@example.com']
+
+
+def test_candidates_skip_suspended_and_disabled():
+    pool = AccountPool([account('a@example.com'), account('b@example.com'), account('c@example.com')], cooldown=60)
+    first, second, third = pool.ring_order('ivan@example.com')
+
+    pool.suspend(first)
+    assert pool.candidates('ivan@example.com') == [second, third, first]
+
+    pool.disable(second)
+    assert pool.candidates('ivan@example.com') == [third, first]
+
+
+def test_suspension_expires():
+    pool = AccountPool([account('a@example.com'), account('b@example.com')], cooldown=0)
+    order = pool.ring_order('ivan@example.com')
+
+    pool.suspend(order[0])
+
+    assert pool.candidates('ivan@example.com') == order
+
+
+def test_invalid_pools():
+    with pytest.raises(ValueError):
+        AccountPool([])
+    with pytest.raises(ValueError):
+        AccountPool([account('a@example.com'), account('a@example.com')])
+    with pytest.raises(ValueError):
+        SMTPAccount.from_dict({'password': 'secret'})
+
+
+def test_from_config(monkeypatch, workdir):
+    from config import Config
+
+    path = workdir / 'accounts.json'
+    path.write_text(json.dumps([{'email': 'a@example.com', 'port': 465, 'weight': 2}]), encoding='utf-8')
+    monkeypatch.setattr(Config, 'SMTP_ACCOUNTS', '')
+    monkeypatch.setattr(Config, 'SMTP_ACCOUNTS_FILE', str(path))
+
+    pool = AccountPool.from_config()
+
+    assert [(a.email, a.port, a.weight) for a in pool.accounts] == [('a@example.com', 465, 2)]
+
+    monkeypatch.setattr(Config, 'SMTP_ACCOUNTS_FILE', '')
+    assert AccountPool.from_config() is None
@@ -0,0 +1,298 @@
+"""Сервер проверки сертификатов по ссылкам из QR-кодов.
+
+Отвечает на запросы <base_url>/verify/<certificate_id> данными из реестра
+выданных сертификатов (certificates.db). Написан на asyncio без сторонних
+зависимостей: соединения keep-alive, горячий LRU-кэш готовых ответов,
+ETag/If-None-Match (повторное сканирование получает 304 без тела).
+
+Примеры:
+    python verification_server.py
+    python verification_server.py --host 0.0.0.0 --port 8080
+"""
+import argparse
+import asyncio
+import hashlib
+import html
+import json
+import logging
+import time
+from collections import OrderedDict
+from urllib.parse import unquote, urlsplit
+
+from config import Config
+from certificate_registry import CertificateRegistry
+from certificate_signer import CertificateSigner
+
+logger = logging.getLogger(__name__)
+
+REASONS = {
+    200: 'OK',
+    304: 'Not Modified',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    413: 'Payload Too Large',
+    501: 'Not Implemented',
+}
+
+# Наибольшее тело запроса, которое сервер прочитает и отбросит (проверке тело не нужно)
+MAX_BODY_BYTES = 64 * 1024
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1">
+    <title>Проверка сертификата</title>
+    <style>
+        body {{ font-family: Arial, sans-serif; margin: 2em auto; max-width: 36em; color: #2c3e50; }}
+        .status {{ font-size: 1.4em; font-weight: bold; color: {color}; }}
+        td {{ padding: 0.3em 1em 0.3em 0; vertical-align: top; }}
+        td:first-child {{ color: #7f8c8d; }}
+    </style>
+</head>
+<body>
+    <div class="status">{status}</div>
+    <table>{rows}</table>
+</body>
+</html>
+"""
+
+
+class VerificationServer:
+    """Асинхронный HTTP-сервер проверки сертификатов.
+
+    Готовые ответы (тело и ETag) хранятся в LRU-кэше на VERIFY_CACHE_TTL
+    секунд, поэтому всплеск сканирований одного и того же сертификата
+    обслуживается без обращений к базе. Кэшируются только найденные
+    сертификаты: сертификат, выданный во время работы сервера, сразу
+    становится доступен для проверки. Поиск в реестре идет по первичному
+    ключу и занимает микросекунды, поэтому выполняется прямо в цикле событий.
+    Если задан ключ подписи, ID с неверной подписью отклоняются без
+    обращения к реестру и не занимают место в кэше.
+    """
+
+    def __init__(self, registry: CertificateRegistry, cache_size: int = None, cache_ttl: float = None,
+                 signer: CertificateSigner = None):
+        self.registry = registry
+        if signer is None and Config.CERTIFICATE_SIGNING_KEY:
+            signer = CertificateSigner(Config.CERTIFICATE_SIGNING_KEY)
+        self.signer = signer
+        self.cache_size = cache_size if cache_size is not None else Config.VERIFY_CACHE_SIZE
+        self.cache_ttl = cache_ttl if cache_ttl is not None else Config.VERIFY_CACHE_TTL
+        self._cache = OrderedDict()
+        self.stats = {'requests': 0, 'cache_hits': 0, 'not_modified': 0, 'not_found': 0, 'forged': 0}
+
+    @staticmethod
+    def certificate_id_from_path(path: str):
+        """ID сертификата из пути .../verify/<id> (base_url может содержать свой префикс)"""
+        segments = [segment for segment in unquote(urlsplit(path).path).split('/') if segment]
+        if len(segments) >= 2 and segments[-2] == 'verify':
+            return segments[-1]
+        return None
+
+    @staticmethod
+    def render(certificate_id: str, record, as_json: bool):
+        """Тело ответа о сертификате: (статус, тип содержимого, байты)"""
+        status = 200 if record is not None else 404
+        if as_json:
+            payload = {'certificate_id': certificate_id, 'valid': record is not None}
+            if record is not None:
+                payload.update({key: record[key] for key in (
+                    'full_name', 'course_name', 'hours', 'date_completed', 'content_hash', 'issued_at'
+                )})
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            return status, 'application/json; charset=utf-8', body
+
+        if record is not None:
+            fields = [
+                ('ID сертификата', certificate_id),
+                ('Выдан', record['full_name']),
+                ('Курс', record['course_name']),
+                ('Часов', record['hours']),
+                ('Дата завершения', record['date_completed']),
+                ('SHA-256 файла', record['content_hash'] or ''),
+            ]
+            page = PAGE_TEMPLATE.format(color='#27ae60', status='✓ Сертификат подтвержден', rows=''.join(
+                f"<tr><td>{html.escape(name)}</td><td>{html.escape(str(value))}</td></tr>"
+                for name, value in fields
+            ))
+        else:
+            page = PAGE_TEMPLATE.format(
+                color='#e74c3c', status='✗ Сертификат не найден',
+                rows=f"<tr><td>ID сертификата</td><td>{html.escape(certificate_id)}</td></tr>"
+            )
+        return status, 'text/html; charset=utf-8', page.encode('utf-8')
+
+    def lookup(self, certificate_id: str, as_json: bool):
+        """Готовый ответ из кэша или из реестра: (статус, тип, тело, ETag)"""
+        key = (certificate_id, as_json)
+        now = time.monotonic()
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] > now:
+            self._cache.move_to_end(key)
+            self.stats['cache_hits'] += 1
+            return cached[1]
+
+        status, content_type, body = self.render(certificate_id, self.registry.get(certificate_id), as_json)
+        etag = f'"{hashlib.sha256(body).hexdigest()[:24]}"'
+        response = (status, content_type, body, etag)
+
+        if self.cache_size > 0 and status == 200:
+            self._cache[key] = (now + self.cache_ttl, response)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return response
+
+    @staticmethod
+    def etag_matches(if_none_match: str, etag: str) -> bool:
+        """Совпадение ETag со списком из If-None-Match (слабое сравнение, '*' — любой)"""
+        for candidate in if_none_match.split(','):
+            candidate = candidate.strip()
+            if candidate.startswith('W/'):
+                candidate = candidate[2:]
+            if candidate == '*' or candidate == etag:
+                return True
+        return False
+
+    @staticmethod
+    def build_response(status: int, headers: dict, body: bytes = b'') -> bytes:
+        """Сборка HTTP-ответа"""
+        lines = [f"HTTP/1.1 {status} {REASONS[status]}"]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body
+
+    def respond(self, method: str, target: str, headers: dict, keep_alive: bool) -> bytes:
+        """Ответ на один запрос"""
+        self.stats['requests'] += 1
+        connection = 'keep-alive' if keep_alive else 'close'
+
+        if method not in ('GET', 'HEAD'):
+            return self.build_response(405, {'Allow': 'GET, HEAD', 'Content-Length': 0, 'Connection': connection})
+
+        certificate_id = self.certificate_id_from_path(target)
+        if certificate_id is None:
+            return self.build_response(404, {'Content-Length': 0, 'Connection': connection})
+
+        as_json = 'application/json' in headers.get('accept', '') or 'format=json' in urlsplit(target).query
+        if self.signer is not None and not self.signer.verify(certificate_id):
+            # Поддельный ID: ответ без обращения к реестру и кэшу
+            self.stats['forged'] += 1
+            _, content_type, body = self.render(certificate_id, None, as_json)
+            return self.build_response(404, {
+                'Content-Type': content_type,
+                'Content-Length': len(body),
+                'Connection': connection,
+            }, body if method == 'GET' else b'')
+
+        status, content_type, body, etag = self.lookup(certificate_id, as_json)
+        if status == 404:
+            self.stats['not_found'] += 1
+
+        response_headers = {
+            'ETag': etag,
+            'Cache-Control': f"public, max-age={int(self.cache_ttl)}" if status == 200 else 'no-cache',
+            'Vary': 'Accept',
+            'Connection': connection,
+        }
+        if status == 200 and self.etag_matches(headers.get('if-none-match', ''), etag):
+            self.stats['not_modified'] += 1
+            return self.build_response(304, response_headers)
+
+        response_headers['Content-Type'] = content_type
+        response_headers['Content-Length'] = len(body)
+        return self.build_response(status, response_headers, body if method == 'GET' else b'')
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Обработка соединения (с поддержкой keep-alive)"""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+
+                lines = head.decode('latin-1').split('\r\n')
+                try:
+                    method, target, version = lines[0].split(' ', 2)
+                except ValueError:
+                    writer.write(self.build_response(400, {'Content-Length': 0, 'Connection': 'close'}))
+                    break
+
+                headers = {}
+                content_lengths = []
+                for line in lines[1:]:
+                    if ':' in line:
+                        name, value = line.split(':', 1)
+                        name = name.strip().lower()
+                        headers[name] = value.strip()
+                        if name == 'content-length':
+                            content_lengths.append(value.strip())
+
+                # Тело запроса нужно вычитать целиком, иначе на keep-alive соединении
+                # оно будет разобрано как следующий запрос
+                if 'transfer-encoding' in headers:
+                    writer.write(self.build_response(501, {'Content-Length': 0, 'Connection': 'close'}))
+                    break
+                if content_lengths:
+                    if len(set(content_lengths)) > 1 or not content_lengths[0].isdigit():
+                        writer.write(self.build_response(400, {'Content-Length': 0, 'Connection': 'close'}))
+                        break
+                    body_length = int(content_lengths[0])
+                    if body_length > MAX_BODY_BYTES:
+                        writer.write(self.build_response(413, {'Content-Length': 0, 'Connection': 'close'}))
+                        break
+                    if body_length:
+                        try:
+                            await reader.readexactly(body_length)
+                        except (asyncio.IncompleteReadError, ConnectionError):
+                            break
+
+                connection = headers.get('connection', '').lower()
+                if version == 'HTTP/1.1':
+                    keep_alive = connection != 'close'
+                else:
+                    keep_alive = connection == 'keep-alive'
+
+                writer.write(self.respond(method, target, headers, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        except Exception as e:
+            logger.error(f"Ошибка обработки запроса: {e}")
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = None, port: int = None):
+        """Запуск сервера до остановки процесса"""
+        host = host if host is not None else Config.VERIFY_HOST
+        port = port if port is not None else Config.VERIFY_PORT
+        server = await asyncio.start_server(self.handle_connection, host, port, backlog=1024)
+        logger.info(f"Сервер проверки сертификатов запущен: http://{host}:{port}/verify/<id>")
+        print(f"✓ Сервер проверки сертификатов: http://{host}:{port}/verify/<id> "
+              f"(реестр: {self.registry.path}, сертификатов: {len(self.registry)})")
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сервер проверки сертификатов")
+    parser.add_argument('--host', default=Config.VERIFY_HOST, help="адрес для прослушивания")
+    parser.add_argument('--port', type=int, default=Config.VERIFY_PORT, help="порт")
+    parser.add_argument('--registry', default=Config.REGISTRY_PATH, help="файл реестра сертификатов")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    with CertificateRegistry(args.registry) as registry:
+        try:
+            asyncio.run(VerificationServer(registry).serve(args.host, args.port))
+        except KeyboardInterrupt:
+            print("\nСервер остановлен")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Нагрузочный тест сервера проверки сертификатов.
+
+Имитирует всплеск сканирований QR-кодов: несколько keep-alive соединений
+запрашивают /verify/<id> для ID из реестра (с долей неизвестных ID и
+повторных запросов с If-None-Match). Выводит запросы в секунду и задержки
+p50/p95/p99.
+
+Примеры:
+    python verification_server.py &
+    python verify_loadtest.py --requests 50000 --connections 64
+"""
+import argparse
+import asyncio
+import random
+import sqlite3
+import statistics
+import time
+
+from config import Config
+
+
+def load_ids(registry_path, limit: int) -> list:
+    """ID сертификатов из реестра для запросов"""
+    conn = sqlite3.connect(str(registry_path))
+    try:
+        rows = conn.execute("SELECT certificate_id FROM certificates LIMIT ?", (limit,)).fetchall()
+    finally:
+        conn.close()
+    return [row[0] for row in rows]
+
+
+async def read_response(reader: asyncio.StreamReader):
+    """Чтение ответа: статус, ETag"""
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    status = int(lines[0].split(' ', 2)[1])
+    headers = {}
+    for line in lines[1:]:
+        if ':' in line:
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip()
+    length = int(headers.get('content-length', 0))
+    if length:
+        await reader.readexactly(length)
+    return status, headers.get('etag')
+
+
+async def client(host: str, port: int, ids: list, count: int, args, latencies: list, statuses: dict):
+    """Одно keep-alive соединение, выполняющее count запросов"""
+    reader, writer = await asyncio.open_connection(host, port)
+    etags = {}
+    rng = random.Random()
+    try:
+        for _ in range(count):
+            if ids and rng.random() >= args.unknown_ratio:
+                certificate_id = rng.choice(ids)
+            else:
+                certificate_id = f"{Config.CERTIFICATE_CONFIG['certificate_prefix']}-{rng.getrandbits(48):012X}"
+
+            request = f"GET /verify/verify/{certificate_id} HTTP/1.1\r\nHost: {host}\r\n"
+            if certificate_id in etags and rng.random() < args.revalidate_ratio:
+                request += f"If-None-Match: {etags[certificate_id]}\r\n"
+            request += "\r\n"
+
+            start = time.perf_counter()
+            writer.write(request.encode('latin-1'))
+            status, etag = await read_response(reader)
+            latencies.append(time.perf_counter() - start)
+
+            statuses[status] = statuses.get(status, 0) + 1
+            if etag and status == 200:
+                etags[certificate_id] = etag
+    finally:
+        writer.close()
+
+
+async def run(args) -> dict:
+    ids = load_ids(args.registry, args.ids)
+    if not ids:
+        print("⚠️  Реестр пуст — все запросы будут к неизвестным ID")
+
+    latencies = []
+    statuses = {}
+    per_connection = max(1, args.requests // args.connections)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        client(args.host, args.port, ids, per_connection, args, latencies, statuses)
+        for _ in range(args.connections)
+    ))
+    elapsed = time.perf_counter() - start
+    cuts = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+
+    return {
+        'requests': len(latencies),
+        'elapsed_s': round(elapsed, 3),
+        'requests_per_s': round(len(latencies) / elapsed, 1) if elapsed else None,
+        'p50_ms': round(cuts[49] * 1000, 3),
+        'p95_ms': round(cuts[94] * 1000, 3),
+        'p99_ms': round(cuts[98] * 1000, 3),
+        'statuses': dict(sorted(statuses.items())),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Нагрузочный тест сервера проверки сертификатов")
+    parser.add_argument('--host', default=Config.VERIFY_HOST)
+    parser.add_argument('--port', type=int, default=Config.VERIFY_PORT)
+    parser.add_argument('--registry', default=Config.REGISTRY_PATH, help="реестр, из которого берутся ID")
+    parser.add_argument('--requests', type=int, default=20000, help="всего запросов")
+    parser.add_argument('--connections', type=int, default=32, help="одновременных соединений")
+    parser.add_argument('--ids', type=int, default=10000, help="сколько ID взять из реестра")
+    parser.add_argument('--unknown-ratio', type=float, default=0.05, help="доля запросов к несуществующим ID")
+    parser.add_argument('--revalidate-ratio', type=float, default=0.3,
+                        help="доля повторных запросов с If-None-Match")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print("=" * 60)
+    print(f"Запросов: {results['requests']} за {results['elapsed_s']} с "
+          f"({args.connections} соединений)")
+    print(f"Запросов в секунду: {results['requests_per_s']}")
+    print(f"Задержка p50/p95/p99: {results['p50_ms']} / {results['p95_ms']} / {results['p99_ms']} мс")
+    print(f"Статусы: {results['statuses']}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()